@@ -1,10 +1,11 @@
+import atexit
 import os
-import logging
-import sys
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 from .handler import (
-    Encryption, DatabaseOperations, DataManipulation
+    Encryption, DatabaseOperations, DataManipulation, Expiry, Counters, Schemas, Aggregation, Columnar, Compaction, Pagination,
+    Fragments, Patching, QueryCache, ParallelCodec, MemoryMapping, Instrumentation
 )
+from .handler.logs import attach_log, database_logger, detach_log
 from .modules import (
     CSVExporter, search_data, BackupToTelegram
 )
@@ -14,25 +15,22 @@ from .utility import (
     sanitize_output, pretty_print
 )
 
+if TYPE_CHECKING:
+    from .modules.replication import ChangeFeedServer
+
 DATABASE_DIR = 'database'
-if not os.path.exists(DATABASE_DIR):
-    try:
-        os.makedirs(DATABASE_DIR)
-    except OSError as e:
-        print(f"\033[90m#bugs\033[0m Couldn't make the database dir, permissions gone? Details: {e}")
-        raise
-
-def setup_logging(enable_log):
-    if enable_log:
-        logging.basicConfig(filename=os.path.join(DATABASE_DIR, 'LiteJsonDb.log'), level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-        # Add console handler for user messages
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
-        console_formatter = logging.Formatter('%(message)s')
-        console_handler.setFormatter(console_formatter)
-        logging.getLogger().addHandler(console_handler)
-
-class JsonDB(Encryption, DatabaseOperations, DataManipulation):
+
+def make_database_dir(base_dir: str) -> None:
+    if not os.path.exists(base_dir):
+        try:
+            os.makedirs(base_dir, exist_ok=True)
+        except OSError as e:
+            print(f"\033[90m#bugs\033[0m Couldn't make the database dir, permissions gone? Details: {e}")
+            raise
+
+class JsonDB(Encryption, DatabaseOperations, DataManipulation, Expiry, Counters, Schemas, Aggregation, Columnar,
+             Compaction, Pagination, Fragments, Patching, QueryCache, ParallelCodec, MemoryMapping,
+             Instrumentation):
     """
     A lightweight JSON database with encryption, backup, and utility functions.
 
@@ -47,29 +45,135 @@ class JsonDB(Encryption, DatabaseOperations, DataManipulation):
         crypted (bool): Enables encryption for the database if set to True. Defaults to False.
         encryption_method (str): The encryption method to use ('base64' or 'fernet'). Defaults to 'base64'.
         encryption_key (Optional[str]): The encryption key to use (required for fernet). Defaults to None.
+        observer_mode (str): How observers are called: 'sync', 'thread' (worker thread) or 'asyncio'. Defaults to 'sync'.
+        observer_coalesce (Optional[float]): Coalescing window in seconds for queued notifications of the same key.
+            Only for 'thread' and 'asyncio' modes. Defaults to None (no coalescing).
+        observer_loop (Optional[asyncio.AbstractEventLoop]): The loop used when observer_mode is 'asyncio'.
+            Defaults to the running loop.
+        change_feed (int): Number of recent changes retained by the change feed, used by `changes()` and
+            replication followers to catch up. Defaults to 0 (disabled).
+        max_items (Optional[int]): Cache mode: maximum number of keys written by set_data/set_subcollection;
+            the least recently used are evicted. Defaults to None (unbounded).
+        max_bytes (Optional[int]): Cache mode: maximum total JSON size of those keys. Defaults to None (unbounded).
+        expiry_flush_interval (float): Minimum seconds between saves caused only by expirations. Defaults to 1.0.
+        fsync (bool): Flushes the database file to disk (fsync) after each save. Defaults to False.
+        metrics (bool): Collects per-operation latency histograms and save statistics, see `metrics()`.
+            Defaults to False (no overhead).
+        slow_op_threshold (Optional[float]): Operations taking at least this many seconds are recorded, with
+            their key path, payload size and per-phase timings, see `slow_ops()`. Defaults to None (disabled).
+        slow_op_log (Optional[str]): File slow operations are also appended to, one JSON object per line.
+            Defaults to None.
+        slow_op_buffer (int): Number of slow operations kept in memory. Defaults to 100.
+        compact (bool): Memory-optimized load: same-shaped records share their keys and repeated strings are
+            stored once. Records are still plain dicts; see `memory_report()`. Defaults to False.
+        counter_flush_interval (float): Seconds after which pending `incr()` increments are saved, together, by the
+            next operation (or `close()`, or at interpreter exit). 0 saves on every increment. Defaults to 1.0.
+        base_dir (str): The directory holding the database, backup, log and export files. It is created when the
+            database is opened. Defaults to "database".
+        fragment_cache (bool): Keeps the encoded text of each top level key between saves, so a save only
+            re-encodes the keys changed since the previous one. The file is unchanged. Values must then only
+            be modified through the database methods. Defaults to False.
+        query_cache (int): Number of `search_data` results kept until the data they searched changes, see
+            `query_cache_stats()`. Defaults to 0 (disabled).
+        query_cache_bytes (Optional[int]): Maximum total JSON size of the cached results. Defaults to None.
+        serialize_workers (Optional[int]): Worker processes that encode (or encrypt) large databases on save
+            and decrypt them on load; None uses every core. Encrypted databases are then written as a list of
+            tokens. Needs the "fork" start method (not available on Windows), and is skipped while other threads
+            run (enable_log, asynchronous observers, metrics or a server). Defaults to 1 (no workers).
+        read_only (bool): Refuses every write; the file must exist. Defaults to False.
+        mmap (bool): With read_only, maps the file instead of loading it and decodes only the collections or
+            items that are read. Needs a file saved by a writer opened with offset_index. Defaults to False.
+        offset_index (bool): Saves the offset index used by mmap readers next to the file ("<file>.idx"), and
+            replaces the file on save instead of rewriting it. Not available with encryption. Defaults to False.
+        remap_interval (float): In mmap mode, minimum seconds between checks for a newer file saved by the
+            writer, see `refresh()`. Defaults to 0.1.
 
     """
     def __init__(self, filename="db.json", backup_filename="db_backup.json", 
-                 enable_log=False, auto_backup=False, crypted=False, encryption_method='base64', encryption_key: Optional[str] = None):
+                 enable_log=False, auto_backup=False, crypted=False, encryption_method='base64', encryption_key: Optional[str] = None,
+                 observer_mode: str = 'sync', observer_coalesce: Optional[float] = None, observer_loop=None,
+                 change_feed: int = 0, max_items: Optional[int] = None, max_bytes: Optional[int] = None,
+                 expiry_flush_interval: float = 1.0, fsync: bool = False, metrics: bool = False,
+                 slow_op_threshold: Optional[float] = None, slow_op_log: Optional[str] = None, slow_op_buffer: int = 100,
+                 compact: bool = False, counter_flush_interval: float = 1.0, base_dir: str = DATABASE_DIR,
+                 fragment_cache: bool = False, query_cache: int = 0, query_cache_bytes: Optional[int] = None,
+                 serialize_workers: Optional[int] = 1, read_only: bool = False, mmap: bool = False,
+                 offset_index: bool = False, remap_interval: float = 0.1):
         if encryption_method not in ['base64', 'fernet']:
             raise ValueError(f"\033[90m#bugs\033[0m Unknown encryption method: '{encryption_method}'!")
 
-        self.filename = os.path.join(DATABASE_DIR, filename)
-        self.backup_filename = os.path.join(DATABASE_DIR, backup_filename)
+        make_database_dir(base_dir)
+        self.base_dir = base_dir
+        self.filename = os.path.join(base_dir, filename)
+        self.backup_filename = os.path.join(base_dir, backup_filename)
         self.enable_log = enable_log
         self.auto_backup = auto_backup
         self.crypted = crypted
         self.encryption_method = encryption_method
         self.db = {}
-        self.observers = {}
-        self.csv_exporter = CSVExporter(DATABASE_DIR)
-        setup_logging(self.enable_log)
-        self.logger = logging.getLogger('LiteJsonDb')
+        self.csv_exporter = CSVExporter(base_dir)
+        # Each database logs through its own logger; with enable_log, records are written by a background thread.
+        self.logger = database_logger(self.filename)
+        self._log_file = os.path.join(base_dir, 'LiteJsonDb.log') if enable_log else None
+        if self._log_file:
+            attach_log(self.logger, self._log_file)
         Encryption.__init__(self, encryption_method, encryption_key)
-        DatabaseOperations.__init__(self, enable_log, auto_backup)
-        DataManipulation.__init__(self)
+        DatabaseOperations.__init__(self, enable_log, auto_backup, fsync)
+        DataManipulation.__init__(self, observer_mode, observer_coalesce, observer_loop, change_feed)
+        Expiry.__init__(self, max_items, max_bytes, expiry_flush_interval)
+        Counters.__init__(self, counter_flush_interval)
+        Schemas.__init__(self)
+        Aggregation.__init__(self)
+        Columnar.__init__(self)
+        Compaction.__init__(self, compact)
+        Pagination.__init__(self)
+        Fragments.__init__(self, fragment_cache)
+        QueryCache.__init__(self, query_cache, query_cache_bytes)
+        ParallelCodec.__init__(self, serialize_workers)
+        MemoryMapping.__init__(self, read_only, mmap, offset_index, remap_interval)
+        Instrumentation.__init__(self, metrics, slow_op_threshold, slow_op_log, slow_op_buffer)
+        self._feed_servers = []
         self._load_db()
 
+    def close(self) -> None:
+        """
+        Releases background resources (observer workers, change feed and metrics servers, log writer). Queued
+        notifications and log records are delivered first, and pending increments and expirations are saved.
+        """
+        self.flush_counters()
+        atexit.unregister(self._exit_flush)
+        if self._expiry_dirty and not self.read_only:
+            self._save_db()
+        self._close_metrics()
+        for server in self._feed_servers:
+            server.close()
+        self._feed_servers = []
+        self._observer_dispatcher.close()
+        if self._log_file:
+            detach_log(self.logger, self._log_file)
+            self._log_file = None
+
+    def serve_changes(self, address: str) -> 'ChangeFeedServer':
+        """
+        Publishes the change feed on a Unix-domain socket so ReplicaFollower instances can stay in sync.
+
+        Args:
+            address (str): The Unix socket path to listen on.
+
+        Returns:
+            ChangeFeedServer: The running server. It is stopped by close().
+        """
+        from .modules.replication import ChangeFeedServer
+        server = ChangeFeedServer(self, address).start()
+        self._feed_servers.append(server)
+        return server
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def backup_to_telegram(self, token: str, chat_id: str):
         """
          Sends the database backup to a specified Telegram chat.
@@ -83,9 +187,9 @@ class JsonDB(Encryption, DatabaseOperations, DataManipulation):
         try:
             telegram_bot.backup_to_telegram(self.filename)
         except Exception as e:
-            self.logger.error(f"\033[90m#bugs\033[0m Telegram backup took a wrong turn! Error: {e}")
+            self.logger.error("\033[90m#bugs\033[0m Telegram backup took a wrong turn! Error: %s", e)
             if self.enable_log:
-                logging.error(f"Error sending backup to Telegram: {e}")
+                self.logger.error("Error sending backup to Telegram: %s", e)
 
     def export_to_csv(self, data_key: Optional[str] = None):
         """
@@ -94,27 +198,29 @@ class JsonDB(Encryption, DatabaseOperations, DataManipulation):
          Args:
               data_key (Optional[str]): If provided, exports only the data under this key. If None, exports the full database.
         """
+        self._expire_due()
         if data_key:
             if data_key in self.db:
                 data = self.db[data_key]
                 csv_path = self.csv_exporter.export(data, f"{data_key}_export.csv")
                 if csv_path:
-                    self.logger.info(f"🎉 Hooray! CSV exported to: {csv_path}")
+                    self.logger.info("🎉 Hooray! CSV exported to: %s", csv_path)
                 else:
-                    self.logger.error(f"\033[90m#bugs\033[0m Could not export '{data_key}' to CSV!")
+                    self.logger.error("\033[90m#bugs\033[0m Could not export '%s' to CSV!", data_key)
             else:
-                  self.logger.error(f"\033[90m#bugs\033[0m Key '{data_key}' not found, is it hiding? Tip: Double-check it!")
+                  self.logger.error("\033[90m#bugs\033[0m Key '%s' not found, is it hiding? Tip: Double-check it!", data_key)
         else:
             if self.db:
                 csv_path = self.csv_exporter.export(self.db, "full_database_export.csv")
                 if csv_path:
-                    self.logger.info(f"🎉 Full database exported to: {csv_path}")
+                    self.logger.info("🎉 Full database exported to: %s", csv_path)
                 else:
                     self.logger.error("\033[90m#bugs\033[0m Database export failed. It's shy!")
             else:
                 self.logger.error("\033[90m#bugs\033[0m Database is empty, ghost town vibes!")
 
-    def search_data(self, value: Any, key: Optional[str] = None, substring: bool = False, case_sensitive: bool = True) -> Optional[Dict[str, Any]]:
+    def search_data(self, value: Any, key: Optional[str] = None, substring: bool = False, case_sensitive: bool = True,
+                    limit: Optional[int] = None, workers: Optional[int] = 1) -> Optional[Dict[str, Any]]:
         """
         Searches for a value within the database.
 
@@ -123,18 +229,30 @@ class JsonDB(Encryption, DatabaseOperations, DataManipulation):
               key (Optional[str]): If provided, searches only within the values associated with this key.
               substring (bool): If True, perform substring search. Defaults to False.
               case_sensitive (bool): If False, perform case-insensitive search. Defaults to True.
+              limit (Optional[int]): Stop after this many matches. Defaults to None (all matches).
+              workers (Optional[int]): Search the collections on this many forked processes; None uses every
+                  core. Worth it for large databases only. Defaults to 1.
+
+             With query_cache enabled, repeated searches are answered from the cache until the searched key
+             (or, without a key, the database) changes.
+
              Returns:
                  Optional[Dict[str, Any]]: Returns the matching dictionary or None if not found.
         """
+        self._expire_due()
         try:
-            result = search_data(self.db, value, key, substring=substring, case_sensitive=case_sensitive)
+            # type(value) is part of the query: 1, 1.0 and True are equal dictionary keys.
+            query = ("search_data", type(value), value, key, substring, case_sensitive, limit)
+            result = self._cached_query(key, query, lambda: search_data(
+                self.db, value, key, substring=substring, case_sensitive=case_sensitive,
+                limit=limit, workers=workers, logger=self.logger))
             if result:
                 return result
             else:
                 self.logger.info("Not found! Try another quest?")
                 return None
         except Exception as e:
-            self.logger.error(f"Search party got lost! Error: {e}")
+            self.logger.error("Search party got lost! Error: %s", e)
             return None
 
     @staticmethod
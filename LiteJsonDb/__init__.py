@@ -1,8 +1,19 @@
 from .LiteJsonDb import JsonDB
-from .handler import Encryption, DatabaseOperations, DataManipulation
+from .handler import Encryption, DatabaseOperations, DataManipulation, Expiry, Counters, Schemas, Aggregation, Columnar, Compaction, Pagination, Instrumentation
 from .modules import CSVExporter, search_data, BackupToTelegram
 from .utility import (
     convert_to_datetime, get_or_default, key_exists_or_add, normalize_keys,
     flatten_json, filter_data, sort_data, hash_password, check_password,
     sanitize_output, pretty_print
-)
\ No newline at end of file
+)
+
+# Networking classes are loaded on first access, see modules/__init__.py.
+_LAZY = ('ChangeFeedServer', 'ReplicaFollower', 'JsonDBServer', 'JsonDBClient', 'ServerError')
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from . import modules
+    value = getattr(modules, name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,10 @@
+"""
+Benchmarks for LiteJsonDb hot paths.
+
+    python -m LiteJsonDb.bench run --records 100000 --output after.json
+    python -m LiteJsonDb.bench compare before.json after.json
+
+See suite.py for the list of cases; keypath.py holds traversal micro-benchmarks.
+"""
+from .suite import CASES, run_suite
+from .compare import compare
@@ -0,0 +1,100 @@
+"""
+Benchmark command line.
+
+    python -m LiteJsonDb.bench run --records 100000 --output after.json
+    python -m LiteJsonDb.bench compare before.json after.json --threshold 0.1
+    python -m LiteJsonDb.bench keypath --depth 8
+    python -m LiteJsonDb.bench search --records 500000 --workers 1,2,4,8
+    python -m LiteJsonDb.bench save --records 500000 --workers 1,2,4,8
+    python -m LiteJsonDb.bench startup --budget-ms 80
+    python -m LiteJsonDb.bench stress --threads 4 --processes 4 --target server
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from . import keypath, save, search, startup, stress
+from .compare import compare, format_rows, load_results
+from .generate import VALUE_TYPES
+from .suite import CASES, run_suite
+
+def _run(args: argparse.Namespace) -> int:
+    value_types = [t for t in args.value_types.split(',') if t]
+    print(f"Generating {args.records} records in {args.collections} collections "
+          f"(depth {args.depth}, types {','.join(value_types)})...", file=sys.stderr)
+
+    def progress(name, summary):
+        rss = summary["peak_rss_mb"]
+        print(f"{name:<26} n={summary['n']:<6} p50={summary['p50_ms']:>10.4f}ms p99={summary['p99_ms']:>10.4f}ms "
+              f"{summary['ops_per_s']:>12.1f} ops/s" + (f"  peak RSS {rss:.1f} MiB" if rss else ""), file=sys.stderr)
+
+    report = run_suite(only=args.only.split(',') if args.only else None, progress=progress,
+                       records=args.records, collections=args.collections, depth=args.depth,
+                       value_types=value_types, ops=args.ops, write_ops=args.write_ops, seed=args.seed)
+    output = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output)
+        print(f"🎉 Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+def _compare(args: argparse.Namespace) -> int:
+    rows = compare(load_results(args.baseline), load_results(args.current), args.threshold, args.metric)
+    print(format_rows(rows, args.metric))
+    regressions = [row["case"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\033[91m#bugs\033[0m {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m LiteJsonDb.bench", description="LiteJsonDb benchmark suite.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmark suite and write JSON results.")
+    run.add_argument("--records", type=int, default=10000, help="Total number of generated records.")
+    run.add_argument("--collections", type=int, default=4, help="Number of top level collections.")
+    run.add_argument("--depth", type=int, default=2, help="Nesting depth of dict fields.")
+    run.add_argument("--value-types", default=",".join(VALUE_TYPES), help=f"Comma separated subset of {','.join(VALUE_TYPES)}.")
+    run.add_argument("--ops", type=int, default=1000, help="Calls per read benchmark.")
+    run.add_argument("--write-ops", type=int, default=50, help="Calls per write benchmark (each one saves the file).")
+    run.add_argument("--seed", type=int, default=42, help="Random seed for the generated data.")
+    run.add_argument("--only", help=f"Comma separated case names or prefixes. Available: {','.join(CASES)}")
+    run.add_argument("--output", "-o", help="Write results to this file instead of stdout.")
+    run.set_defaults(handler=_run)
+
+    cmp = commands.add_parser("compare", help="Compare two result files and flag regressions.")
+    cmp.add_argument("baseline", help="Reference results file.")
+    cmp.add_argument("current", help="Results file to check.")
+    cmp.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown counted as a regression.")
+    cmp.add_argument("--metric", default="p50_ms", choices=["p50_ms", "p99_ms", "mean_ms"])
+    cmp.set_defaults(handler=_compare)
+
+    commands.add_parser("keypath", help="Key path traversal micro-benchmarks (see keypath --help).")
+    commands.add_parser("search", help="Search scaling with worker processes (see search --help).")
+    commands.add_parser("save", help="Save and load scaling with serialize_workers (see save --help).")
+    commands.add_parser("startup", help="Import time of the package, with a regression budget (see startup --help).")
+    commands.add_parser("stress", help="Concurrent workers on one database, with consistency checks (see stress --help).")
+
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["keypath"]:
+        keypath.main(argv[1:])
+        return 0
+    if argv[:1] == ["search"]:
+        search.main(argv[1:])
+        return 0
+    if argv[:1] == ["save"]:
+        save.main(argv[1:])
+        return 0
+    if argv[:1] == ["startup"]:
+        return startup.main(argv[1:])
+    if argv[:1] == ["stress"]:
+        return stress.main(argv[1:])
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
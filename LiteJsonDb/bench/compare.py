@@ -0,0 +1,47 @@
+"""
+Compares two benchmark result files and flags regressions.
+"""
+import json
+from typing import Any, Dict, List
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, 'r') as file:
+        return json.load(file)
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10,
+            metric: str = "p50_ms") -> List[Dict[str, Any]]:
+    """
+    Compares the cases present in both runs.
+
+    Args:
+        baseline (Dict[str, Any]): The reference run (output of run_suite).
+        current (Dict[str, Any]): The run to check.
+        threshold (float, optional): Relative slowdown that counts as a regression. Defaults to 0.10 (10%).
+        metric (str, optional): Latency metric to compare ("p50_ms", "p99_ms" or "mean_ms"). Defaults to "p50_ms".
+
+    Returns:
+        List[Dict[str, Any]]: One row per case with both values, the ratio and a "status" of
+            "regression", "improvement" or "ok".
+    """
+    rows = []
+    old_results, new_results = baseline["results"], current["results"]
+    for name, old in old_results.items():
+        new = new_results.get(name)
+        if new is None or not old.get(metric) or metric not in new:
+            continue
+        ratio = new[metric] / old[metric]
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({"case": name, "baseline": old[metric], "current": new[metric], "ratio": ratio, "status": status})
+    return rows
+
+def format_rows(rows: List[Dict[str, Any]], metric: str = "p50_ms") -> str:
+    lines = [f"{'case':<26} {'baseline ' + metric:>18} {'current ' + metric:>18} {'ratio':>7}  status"]
+    for row in rows:
+        marker = {"regression": "❌ regression", "improvement": "✅ improvement"}.get(row["status"], "ok")
+        lines.append(f"{row['case']:<26} {row['baseline']:>18.4f} {row['current']:>18.4f} {row['ratio']:>6.2f}x  {marker}")
+    return "\n".join(lines)
@@ -0,0 +1,79 @@
+"""
+Synthetic database generator for the benchmark suite.
+"""
+import random
+import string
+from typing import Any, Dict, List, Sequence
+
+VALUE_TYPES = ('str', 'int', 'float', 'bool', 'list', 'dict')
+
+FIRST_NAMES = ('Aliou', 'Awa', 'Coder', 'Fatou', 'Moussa', 'Khady', 'Ibrahima', 'Mariama', 'Omar', 'Ndeye')
+
+def _value(rng: random.Random, value_type: str, depth: int) -> Any:
+    if value_type == 'str':
+        return ''.join(rng.choices(string.ascii_letters, k=rng.randint(4, 16)))
+    if value_type == 'int':
+        return rng.randint(0, 1_000_000)
+    if value_type == 'float':
+        return round(rng.uniform(0, 1000), 3)
+    if value_type == 'bool':
+        return rng.random() < 0.5
+    if value_type == 'list':
+        return [rng.randint(0, 100) for _ in range(rng.randint(1, 5))]
+    return _nested(rng, depth)
+
+def _nested(rng: random.Random, depth: int) -> Dict[str, Any]:
+    node = {"level": depth, "label": rng.choice(FIRST_NAMES)}
+    if depth > 1:
+        node["child"] = _nested(rng, depth - 1)
+    return node
+
+def generate_record(rng: random.Random, index: int, value_types: Sequence[str] = VALUE_TYPES, depth: int = 2) -> Dict[str, Any]:
+    """
+    Builds one record with a stable set of searchable fields plus one field per requested value type.
+
+    Args:
+        rng (random.Random): The random source.
+        index (int): The record index, used for unique fields.
+        value_types (Sequence[str], optional): Value types to include (see VALUE_TYPES).
+        depth (int, optional): Nesting depth of 'dict' fields. Defaults to 2.
+
+    Returns:
+        Dict[str, Any]: The record.
+    """
+    record = {
+        "name": rng.choice(FIRST_NAMES),
+        "email": f"user{index}@example.com",
+        "age": rng.randint(18, 90),
+        "score": rng.randint(0, 1000),
+    }
+    for value_type in value_types:
+        record[f"{value_type}_field"] = _value(rng, value_type, depth)
+    return record
+
+def generate_database(records: int = 10000, collections: int = 4, depth: int = 2,
+                      value_types: Sequence[str] = VALUE_TYPES, seed: int = 42) -> Dict[str, Any]:
+    """
+    Builds a synthetic database: `collections` top level collections of records keyed by id.
+
+    The same arguments always produce the same database.
+
+    Args:
+        records (int, optional): Total number of records. Defaults to 10000.
+        collections (int, optional): Number of top level collections. Defaults to 4.
+        depth (int, optional): Nesting depth of 'dict' fields. Defaults to 2.
+        value_types (Sequence[str], optional): Value types to include. Defaults to all of VALUE_TYPES.
+        seed (int, optional): Random seed. Defaults to 42.
+
+    Returns:
+        Dict[str, Any]: The database.
+    """
+    unknown = set(value_types) - set(VALUE_TYPES)
+    if unknown:
+        raise ValueError(f"\033[91m#bugs\033[0m Unknown value types: {sorted(unknown)}. Pick from {VALUE_TYPES}.")
+    rng = random.Random(seed)
+    db: Dict[str, Any] = {f"col{c}": {} for c in range(max(collections, 1))}
+    names: List[str] = list(db)
+    for index in range(records):
+        db[names[index % len(names)]][str(index)] = generate_record(rng, index, value_types, depth)
+    return db
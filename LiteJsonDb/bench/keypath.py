@@ -0,0 +1,115 @@
+"""
+Micro-benchmarks for key path traversal.
+
+Compares the historical split-and-walk traversal with the compiled key path
+resolvers used by DataManipulation.
+
+    python -m LiteJsonDb.bench.keypath --depth 8 --number 200000
+"""
+import argparse
+import timeit
+from typing import Any, Dict, List, Tuple
+
+from ..handler.keypath import MISSING, compile_key, resolve, resolve_parent
+
+def build_tree(depth: int, fanout: int = 4) -> Tuple[Dict[str, Any], str]:
+    """
+    Builds a nested dictionary and returns it with the key of its deepest leaf.
+
+    Args:
+        depth (int): The nesting depth of the leaf.
+        fanout (int, optional): The number of siblings at every level. Defaults to 4.
+
+    Returns:
+        Tuple[Dict[str, Any], str]: The tree and the "/" separated leaf key.
+    """
+    root: Dict[str, Any] = {}
+    node = root
+    parts = []
+    for level in range(depth):
+        for sibling in range(fanout):
+            node.setdefault(f"k{level}_{sibling}", {})
+        name = f"k{level}_0"
+        parts.append(name)
+        if level == depth - 1:
+            node[name] = level
+        else:
+            node = node[name]
+    return root, '/'.join(parts)
+
+def _legacy_get(data: Any, key: str) -> Any:
+    for k in key.split('/'):
+        if k in data:
+            data = data[k]
+        else:
+            return None
+    return data
+
+def _legacy_edit_walk(data: Any, key: str) -> Any:
+    # key_exists() followed by a second walk to the parent, as edit_data used to do.
+    keys = key.split('/')
+    node = data
+    for k in keys:
+        if k in node:
+            node = node[k]
+        else:
+            return None
+    for k in keys[:-1]:
+        data = data.setdefault(k, {})
+    return data.get(keys[-1])
+
+def _compiled_get(data: Any, key: str) -> Any:
+    value = resolve(data, compile_key(key))
+    return None if value is MISSING else value
+
+def _compiled_edit_walk(data: Any, key: str) -> Any:
+    resolved = resolve_parent(data, compile_key(key))
+    if resolved is None or resolved[1] not in resolved[0]:
+        return None
+    parent, leaf = resolved
+    return parent[leaf]
+
+def run(depths: List[int], number: int, repeat: int = 5) -> List[Dict[str, Any]]:
+    """
+    Times legacy and compiled traversal for each depth.
+
+    Args:
+        depths (List[int]): The path depths to measure.
+        number (int): The number of calls per timing run.
+        repeat (int, optional): The number of timing runs; the best one is kept. Defaults to 5.
+
+    Returns:
+        List[Dict[str, Any]]: One row per (depth, operation) with ns/op for both variants.
+    """
+    rows = []
+    for depth in depths:
+        tree, key = build_tree(depth)
+        for name, legacy, compiled in (("get", _legacy_get, _compiled_get),
+                                       ("edit-walk", _legacy_edit_walk, _compiled_edit_walk)):
+            assert legacy(tree, key) == compiled(tree, key)
+            legacy_s = min(timeit.repeat(lambda: legacy(tree, key), number=number, repeat=repeat))
+            compiled_s = min(timeit.repeat(lambda: compiled(tree, key), number=number, repeat=repeat))
+            rows.append({
+                "depth": depth,
+                "operation": name,
+                "legacy_ns": legacy_s / number * 1e9,
+                "compiled_ns": compiled_s / number * 1e9,
+                "speedup": legacy_s / compiled_s if compiled_s else float('inf'),
+            })
+    return rows
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Key path traversal micro-benchmarks.")
+    parser.add_argument("--depth", type=int, action="append", help="Path depth to measure (repeatable).")
+    parser.add_argument("--number", type=int, default=100000, help="Calls per timing run.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per measurement.")
+    args = parser.parse_args(argv)
+
+    rows = run(args.depth or [2, 4, 8, 16], args.number, args.repeat)
+    print(f"{'depth':>5}  {'operation':<10} {'legacy ns':>10} {'compiled ns':>12} {'speedup':>8}")
+    for row in rows:
+        print(f"{row['depth']:>5}  {row['operation']:<10} {row['legacy_ns']:>10.1f} "
+              f"{row['compiled_ns']:>12.1f} {row['speedup']:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
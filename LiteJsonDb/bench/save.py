@@ -0,0 +1,95 @@
+"""
+Save and load scaling benchmark.
+
+Times saving a generated database (plain, base64 and Fernet encrypted) and
+loading the encrypted files, with an increasing number of serialize_workers.
+
+    python -m LiteJsonDb.bench.save --records 500000 --workers 1,2,4,8
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import timeit
+from typing import Any, Dict, List
+
+from ..handler.codec import can_fork
+from ..LiteJsonDb import JsonDB
+from .generate import VALUE_TYPES, generate_database
+
+MODES = (
+    ("plain", {}),
+    ("base64", {"crypted": True, "encryption_method": "base64"}),
+    ("fernet", {"crypted": True, "encryption_method": "fernet", "encryption_key": "bench-key"}),
+)
+
+def run(data: Dict[str, Any], workers: List[int], modes: List[str], repeat: int = 3) -> List[Dict[str, Any]]:
+    """
+    Times a save of each mode for each worker count, and a load of the encrypted ones.
+
+    Args:
+        data (Dict[str, Any]): The database to save.
+        workers (List[int]): The worker counts to measure.
+        modes (List[str]): The modes to measure, among plain, base64 and fernet.
+        repeat (int, optional): The number of timing runs; the best one is kept. Defaults to 3.
+
+    Returns:
+        List[Dict[str, Any]]: One row per (mode, operation, workers) with the time and the speedup over 1 worker.
+    """
+    workdir = tempfile.mkdtemp(prefix='litejsondb-bench-')
+    rows = []
+    try:
+        for mode, options in MODES:
+            if mode not in modes:
+                continue
+            single: Dict[str, float] = {}
+            for count in workers:
+                filename = f"{mode}_{count}.json"
+                db = JsonDB(filename, base_dir=workdir, serialize_workers=count, **options)
+                db.db = data
+                timings = {"save": min(timeit.repeat(db._save_db, number=1, repeat=repeat))}
+                if options:
+                    reader = JsonDB(filename, base_dir=workdir, serialize_workers=count, **options)
+                    timings["load"] = min(timeit.repeat(reader._load_db, number=1, repeat=repeat))
+                for operation, seconds in timings.items():
+                    single.setdefault(operation, seconds)
+                    rows.append({
+                        "mode": mode,
+                        "operation": operation,
+                        "workers": count,
+                        "seconds": seconds,
+                        "speedup": single[operation] / seconds if seconds else float('inf'),
+                    })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return rows
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Save and load scaling with the number of worker processes.")
+    parser.add_argument("--records", type=int, default=200000, help="Total number of generated records.")
+    parser.add_argument("--collections", type=int, default=8, help="Number of top level collections.")
+    parser.add_argument("--workers", help="Comma separated worker counts. Defaults to powers of 2 up to the core count.")
+    parser.add_argument("--modes", default=",".join(mode for mode, _ in MODES), help="Comma separated modes to measure.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per measurement.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the generated data.")
+    args = parser.parse_args(argv)
+
+    cores = os.cpu_count() or 1
+    if args.workers:
+        workers = [int(count) for count in args.workers.split(',')]
+    else:
+        workers = [1]
+        while workers[-1] * 2 <= cores:
+            workers.append(workers[-1] * 2)
+    if not can_fork():
+        print("Processes can't be forked on this platform: every save runs in one process.")
+    data = generate_database(args.records, args.collections, 2, list(VALUE_TYPES), seed=args.seed)
+    rows = run(data, workers, args.modes.split(','), args.repeat)
+    print(f"{args.records} records, {cores} cores")
+    print(f"{'mode':<7} {'operation':<10} {'workers':>8} {'seconds':>9} {'speedup':>8}")
+    for row in rows:
+        print(f"{row['mode']:<7} {row['operation']:<10} {row['workers']:>8} "
+              f"{row['seconds']:>9.4f} {row['speedup']:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
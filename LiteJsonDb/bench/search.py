@@ -0,0 +1,82 @@
+"""
+Search scaling benchmark.
+
+Times search_data on a generated database with an increasing number of worker
+processes, with and without a result limit.
+
+    python -m LiteJsonDb.bench.search --records 500000 --workers 1,2,4,8
+"""
+import argparse
+import os
+import timeit
+from typing import Any, Dict, List, Optional
+
+from ..modules.search import can_fork, search_data
+from .generate import VALUE_TYPES, generate_database
+
+QUERIES = (
+    ("exact", "Aliou", {}),
+    ("substring", "example", {"substring": True}),
+    ("case_insensitive", "aliou", {"case_sensitive": False}),
+)
+
+def run(data: Dict[str, Any], workers: List[int], limit: Optional[int] = None, repeat: int = 3) -> List[Dict[str, Any]]:
+    """
+    Times each query for each worker count.
+
+    Args:
+        data (Dict[str, Any]): The database to search.
+        workers (List[int]): The worker counts to measure.
+        limit (Optional[int], optional): Also time every query with this result limit. Defaults to None.
+        repeat (int, optional): The number of timing runs; the best one is kept. Defaults to 3.
+
+    Returns:
+        List[Dict[str, Any]]: One row per (query, limit, workers) with the time and the speedup over 1 worker.
+    """
+    rows = []
+    for name, value, options in QUERIES:
+        for query_limit in (None, limit) if limit else (None,):
+            single = None
+            for count in workers:
+                seconds = min(timeit.repeat(lambda: search_data(data, value, limit=query_limit, workers=count, **options),
+                                            number=1, repeat=repeat))
+                if single is None:
+                    single = seconds
+                rows.append({
+                    "query": name,
+                    "limit": query_limit,
+                    "workers": count,
+                    "seconds": seconds,
+                    "speedup": single / seconds if seconds else float('inf'),
+                })
+    return rows
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Search scaling with the number of worker processes.")
+    parser.add_argument("--records", type=int, default=200000, help="Total number of generated records.")
+    parser.add_argument("--collections", type=int, default=8, help="Number of top level collections.")
+    parser.add_argument("--workers", help="Comma separated worker counts. Defaults to powers of 2 up to the core count.")
+    parser.add_argument("--limit", type=int, default=100, help="Also time the queries with this result limit (0 to skip).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per measurement.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the generated data.")
+    args = parser.parse_args(argv)
+
+    cores = os.cpu_count() or 1
+    if args.workers:
+        workers = [int(count) for count in args.workers.split(',')]
+    else:
+        workers = [1]
+        while workers[-1] * 2 <= cores:
+            workers.append(workers[-1] * 2)
+    if not can_fork():
+        print("Processes can't be forked on this platform: every search runs in one process.")
+    data = generate_database(args.records, args.collections, 2, list(VALUE_TYPES), seed=args.seed)
+    rows = run(data, workers, args.limit or None, args.repeat)
+    print(f"{args.records} records, {cores} cores")
+    print(f"{'query':<17} {'limit':>6} {'workers':>8} {'seconds':>9} {'speedup':>8}")
+    for row in rows:
+        print(f"{row['query']:<17} {str(row['limit'] or '-'):>6} {row['workers']:>8} "
+              f"{row['seconds']:>9.4f} {row['speedup']:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Startup benchmark: the cost of `import LiteJsonDb`, measured with `python -X importtime`.
+
+Fails (exit code 1) when the import takes longer than the budget or loads a
+module that must stay lazy, so it can guard CI against startup regressions.
+
+    python -m LiteJsonDb.bench startup --repeat 7 --budget-ms 80
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# Loaded on first use only: importing LiteJsonDb must not pull them in.
+LAZY_MODULES = (
+    'cryptography', 'requests', 'asyncio', 'http.server', 'socket', 'socketserver',
+    'multiprocessing', 'concurrent.futures', 'cProfile', 'csv', 'hashlib', 'platform',
+)
+
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Parses `-X importtime` output.
+
+    Returns:
+        List[Tuple[str, int, int, int]]: (module, nesting depth, self us, cumulative us), in completion order:
+        a module comes after everything it imported.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+def measure_import(python: str = sys.executable) -> Tuple[List[Tuple[str, int, int, int]], List[str]]:
+    """
+    Imports LiteJsonDb in a fresh interpreter.
+
+    Returns:
+        Tuple[List[Tuple[str, int, int, int]], List[str]]: The LiteJsonDb import and everything it imported
+        (see parse_importtime), and the lazy modules that got loaded anyway.
+    """
+    code = ("import sys, LiteJsonDb; "
+            f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [_PACKAGE_ROOT, os.environ.get('PYTHONPATH')])))
+    process = subprocess.run([python, '-X', 'importtime', '-c', code], capture_output=True, text=True, env=env, check=True)
+    rows = parse_importtime(process.stderr)
+    end = max(i for i, row in enumerate(rows) if row[0] == 'LiteJsonDb' and row[1] == 0)
+    start = end
+    while start > 0 and rows[start - 1][1] > 0:
+        start -= 1
+    return rows[start:end + 1], [m for m in process.stdout.strip().split(',') if m]
+
+def run(repeat: int = 7) -> Dict[str, object]:
+    """
+    Measures the import `repeat` times and keeps the median.
+
+    Returns:
+        Dict[str, object]: {"import_ms": median, "runs_ms": [...], "slowest": [(module, self ms), ...], "eager": [...]}.
+    """
+    runs = []
+    rows: List[Tuple[str, int, int, int]] = []
+    eager: List[str] = []
+    for _ in range(repeat):
+        rows, eager = measure_import()
+        runs.append(rows[-1][3] / 1000)
+    slowest = sorted(((name, self_us / 1000) for name, _, self_us, _ in rows), key=lambda item: -item[1])[:10]
+    return {"import_ms": statistics.median(runs), "runs_ms": runs, "slowest": slowest, "eager": eager}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the cost of `import LiteJsonDb`.")
+    parser.add_argument("--repeat", type=int, default=7, help="Fresh interpreters to time; the median is kept.")
+    parser.add_argument("--budget-ms", type=float, help="Fail if the median import time exceeds this.")
+    args = parser.parse_args(argv)
+
+    result = run(args.repeat)
+    print(f"import LiteJsonDb: {result['import_ms']:.1f} ms (median of {args.repeat}, "
+          f"min {min(result['runs_ms']):.1f} ms, max {max(result['runs_ms']):.1f} ms)")
+    print("slowest modules (self time):")
+    for name, ms in result["slowest"]:
+        print(f"  {ms:>7.2f} ms  {name}")
+    status = 0
+    if result["eager"]:
+        print(f"\033[91m#bugs\033[0m These modules must load lazily but were imported: {', '.join(result['eager'])}")
+        status = 1
+    if args.budget_ms is not None and result["import_ms"] > args.budget_ms:
+        print(f"\033[91m#bugs\033[0m Import takes {result['import_ms']:.1f} ms, over the {args.budget_ms:.1f} ms budget.")
+        status = 1
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
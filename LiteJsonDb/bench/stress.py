@@ -0,0 +1,375 @@
+"""
+Concurrent stress harness: many readers and writers on one database directory.
+
+Thread and process workers run a weighted mix of operations for a fixed duration,
+as fast as possible or at a target rate. The harness records a throughput and latency
+timeline, then reloads the database file and checks for lost updates: every counter
+increment, written key and last edit acknowledged by a worker must be in the file.
+
+    python -m LiteJsonDb.bench stress --threads 8 --duration 10
+    python -m LiteJsonDb.bench stress --processes 4 --target server --rate 200
+    python -m LiteJsonDb.bench stress --processes 4 --target direct   # one JsonDB per process
+
+With --target direct, threads share one JsonDB and each process opens its own on the
+same files; with --target server, the database is hosted by a JsonDBServer and every
+worker is a JsonDBClient.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..handler.keypath import MISSING, compile_key, resolve
+from .generate import VALUE_TYPES, generate_database
+from .suite import summarize
+
+OPERATIONS = ('get', 'set', 'edit', 'incr', 'search', 'sub_get', 'sub_set')
+
+DEFAULT_MIX = "get=40,sub_get=10,search=5,set=10,sub_set=5,edit=15,incr=15"
+
+FILENAME = 'stress.json'
+
+def parse_mix(mix: str) -> List[Tuple[str, float]]:
+    """
+    Parses "get=40,set=10,..." into (operation, weight) pairs.
+
+    Raises:
+        ValueError: If an operation is unknown or no weight is positive.
+    """
+    pairs = []
+    for item in filter(None, mix.split(',')):
+        name, _, weight = item.partition('=')
+        if name not in OPERATIONS:
+            raise ValueError(f"\033[91m#bugs\033[0m Unknown operation '{name}'. Available: {', '.join(OPERATIONS)}")
+        pairs.append((name, float(weight or 1)))
+    if not any(weight > 0 for _, weight in pairs):
+        raise ValueError("\033[91m#bugs\033[0m The operation mix needs at least one positive weight.")
+    return pairs
+
+class _Worker:
+    """
+    One load generator. Keeps what it wrote, so the final state can be checked.
+    """
+    def __init__(self, spec: Dict[str, Any], db):
+        self.id = spec["id"]
+        self.db = db
+        self.rng = random.Random(spec["seed"])
+        self.ids = spec["ids"]
+        self.search_key = spec["search_key"]
+        self.counters = spec["counters"]
+        self.n = 0
+        self.incrs = 0
+        self.written: List[str] = []
+        self.last_edit: Optional[int] = None
+
+    def get(self) -> None:
+        collection, item_id = self.rng.choice(self.ids)
+        self.db.get_data(f"{collection}/{item_id}")
+
+    def set(self) -> None:
+        key = f"stress_items/w{self.id}_{self.n}"
+        self.db.set_data(key, {"worker": self.id, "n": self.n})
+        self.written.append(key)
+
+    def edit(self) -> None:
+        self.db.edit_data(f"stress_edits/w{self.id}", {"seq": self.n})
+        self.last_edit = self.n
+
+    def incr(self) -> None:
+        if self.db.incr(f"stress_counters/c{self.rng.randrange(self.counters)}", "n") is not None:
+            self.incrs += 1
+
+    def search(self) -> None:
+        self.db.search_data("Aliou", key=self.search_key, limit=10)
+
+    def sub_get(self) -> None:
+        collection, item_id = self.rng.choice(self.ids)
+        self.db.get_subcollection(collection, item_id)
+
+    def sub_set(self) -> None:
+        item_id = f"w{self.id}_{self.n}"
+        self.db.set_subcollection("stress_sub", item_id, {"worker": self.id, "n": self.n})
+        self.written.append(f"stress_sub/{item_id}")
+
+def _open(spec: Dict[str, Any]):
+    if spec["target"] == "server":
+        from ..modules.server import JsonDBClient
+        return JsonDBClient(spec["address"], pool_size=1)
+    from ..LiteJsonDb import JsonDB
+    return JsonDB(filename=FILENAME, base_dir=spec["base_dir"])
+
+def run_worker(spec: Dict[str, Any], db=None) -> Dict[str, Any]:
+    """
+    Runs one worker until the deadline.
+
+    Args:
+        spec (Dict[str, Any]): The worker settings (see run()); picklable, for process workers.
+        db (optional): A shared database for thread workers. Defaults to None (open one from the spec).
+
+    Returns:
+        Dict[str, Any]: {"id", "kind", "samples": [[seconds since start, operation, latency ns, ok], ...],
+            "incrs", "written", "last_edit", "errors", "first_error"}.
+    """
+    own = db is None
+    if own:
+        db = _open(spec)
+    worker = _Worker(spec, db)
+    names = [name for name, _ in spec["mix"]]
+    weights = [weight for _, weight in spec["mix"]]
+    start_at, deadline = spec["start_at"], spec["start_at"] + spec["duration"]
+    interval = 1.0 / spec["rate"] if spec["rate"] else 0.0
+    samples: List[List[Any]] = []
+    errors, first_error = 0, None
+    clock = time.perf_counter_ns
+    delay = start_at - time.time()
+    if delay > 0:
+        time.sleep(delay)
+    try:
+        while True:
+            now = time.time()
+            scheduled = start_at + worker.n * interval if interval else now
+            if scheduled >= deadline or now >= deadline:
+                break
+            if scheduled > now:
+                time.sleep(scheduled - now)
+                now = scheduled
+            name = worker.rng.choices(names, weights)[0]
+            begin = clock()
+            ok = True
+            try:
+                getattr(worker, name)()
+            except Exception as e:
+                ok = False
+                errors += 1
+                first_error = first_error or f"{name}: {type(e).__name__}: {e}"
+            # At a target rate, latency counts from the scheduled time: a stalled worker can't hide its backlog.
+            latency = clock() - begin + int(max(0.0, now - scheduled) * 1e9)
+            samples.append([now - start_at, name, latency, ok])
+            worker.n += 1
+    finally:
+        if own:
+            db.close()
+    return {
+        "id": spec["id"], "kind": spec["kind"], "samples": samples, "incrs": worker.incrs,
+        "written": worker.written, "last_edit": worker.last_edit, "errors": errors, "first_error": first_error,
+    }
+
+def timeline(results: Sequence[Dict[str, Any]], interval: float = 1.0) -> List[Dict[str, Any]]:
+    """
+    Buckets every sample by time: throughput, errors and latency percentiles per interval.
+    """
+    buckets: Dict[int, List[List[Any]]] = {}
+    for result in results:
+        for sample in result["samples"]:
+            buckets.setdefault(int(sample[0] // interval), []).append(sample)
+    rows = []
+    for index in sorted(buckets):
+        bucket = buckets[index]
+        summary = summarize([sample[2] for sample in bucket])
+        rows.append({
+            "t": index * interval,
+            "ops": len(bucket),
+            "ops_per_s": len(bucket) / interval,
+            "errors": sum(1 for sample in bucket if not sample[3]),
+            "p50_ms": summary["p50_ms"],
+            "p99_ms": summary["p99_ms"],
+            "max_ms": summary["max_ms"],
+        })
+    return rows
+
+def check_consistency(path: str, results: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reloads the database file and compares it with what the workers were told succeeded.
+
+    Returns:
+        Dict[str, Any]: {"ok", "file_parses", "counter_expected", "counter_actual", "written", "missing"
+            (lost keys, up to 10), "missing_count", "stale_edits" (workers whose last edit was lost)}.
+    """
+    try:
+        with open(path) as file:
+            data = json.load(file)
+    except (OSError, ValueError) as e:
+        return {"ok": False, "file_parses": False, "file_error": str(e)}
+    expected = sum(result["incrs"] for result in results)
+    counters = data.get("stress_counters", {})
+    actual = sum(record.get("n", 0) for record in counters.values() if isinstance(record, dict))
+    written = [key for result in results for key in result["written"]]
+    missing = [key for key in written if resolve(data, compile_key(key)) is MISSING]
+    edits = data.get("stress_edits", {})
+    stale = [f"w{result['id']}" for result in results if result["last_edit"] is not None
+             and edits.get(f"w{result['id']}", {}).get("seq") != result["last_edit"]]
+    return {
+        "ok": expected == actual and not missing and not stale,
+        "file_parses": True,
+        "counter_expected": expected,
+        "counter_actual": actual,
+        "written": len(written),
+        "missing": missing[:10],
+        "missing_count": len(missing),
+        "stale_edits": stale,
+    }
+
+def run(threads: int = 4, processes: int = 0, target: str = "direct", mix: str = DEFAULT_MIX,
+        duration: float = 5.0, rate: float = 0.0, records: int = 2000, collections: int = 4, counters: int = 8,
+        interval: float = 1.0, seed: int = 42, base_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Runs a stress test and checks the database afterwards.
+
+    Args:
+        threads (int, optional): Thread workers. Defaults to 4.
+        processes (int, optional): Process workers. Defaults to 0.
+        target (str, optional): "direct" (JsonDB in the workers) or "server" (JsonDBClient to a JsonDBServer).
+            Defaults to "direct".
+        mix (str, optional): Operation weights, e.g. "get=40,set=10". Defaults to DEFAULT_MIX.
+        duration (float, optional): Seconds of load. Defaults to 5.0.
+        rate (float, optional): Target operations per second per worker; 0 runs flat out. Defaults to 0.
+        records (int, optional): Records generated before the run. Defaults to 2000.
+        collections (int, optional): Collections the records are spread over. Defaults to 4.
+        counters (int, optional): Distinct counters hit by "incr". Defaults to 8.
+        interval (float, optional): Timeline bucket width in seconds. Defaults to 1.0.
+        seed (int, optional): Random seed. Defaults to 42.
+        base_dir (Optional[str], optional): The database directory; a temporary one is used and removed
+            if None. Defaults to None.
+
+    Returns:
+        Dict[str, Any]: {"config", "totals", "operations": {name: summary}, "timeline", "consistency", "workers"}.
+    """
+    if target not in ("direct", "server"):
+        raise ValueError(f"\033[91m#bugs\033[0m Unknown target '{target}': use 'direct' or 'server'.")
+    if threads + processes < 1:
+        raise ValueError("\033[91m#bugs\033[0m At least one thread or process worker is needed.")
+    parsed_mix = parse_mix(mix)
+    config = {"threads": threads, "processes": processes, "target": target, "mix": mix, "duration": duration,
+              "rate": rate, "records": records, "collections": collections, "counters": counters, "seed": seed}
+    workdir = base_dir or tempfile.mkdtemp(prefix='litejsondb-stress-')
+    os.makedirs(workdir, exist_ok=True)
+    total = threads + processes
+    data = generate_database(records, collections, 2, VALUE_TYPES, seed)
+    ids = [(collection, item_id) for collection, items in data.items() for item_id in items]
+    data["stress_edits"] = {f"w{n}": {"seq": -1} for n in range(total)}
+    data["stress_counters"] = {}
+    with open(os.path.join(workdir, FILENAME), 'w') as file:
+        json.dump(data, file, indent=4)
+
+    rng = random.Random(seed)
+    sample_ids = rng.sample(ids, min(len(ids), 1000))
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+        warmup = 0.5
+    else:
+        context = multiprocessing.get_context('spawn')
+        warmup = 3.0
+    start_at = time.time() + warmup
+    specs = [{
+        "id": n, "kind": "process" if n < processes else "thread", "target": target, "base_dir": workdir,
+        "address": os.path.join(workdir, 'stress.sock'), "mix": parsed_mix, "duration": duration, "rate": rate,
+        "start_at": start_at, "seed": seed + n, "ids": sample_ids, "search_key": ids[0][0], "counters": counters,
+    } for n in range(total)]
+
+    shared = server = pool = None
+    try:
+        if target == "server" or threads:
+            from ..LiteJsonDb import JsonDB
+            shared = JsonDB(filename=FILENAME, base_dir=workdir)
+        if target == "server":
+            from ..modules.server import JsonDBServer
+            server = JsonDBServer(shared, specs[0]["address"]).start()
+        # Processes are started before any worker thread, so a fork doesn't copy a thread mid-operation.
+        pending = None
+        if processes:
+            pool = context.Pool(processes)
+            pending = pool.map_async(run_worker, specs[:processes])
+        thread_results: List[Dict[str, Any]] = []
+        if threads:
+            with ThreadPoolExecutor(threads, thread_name_prefix='LiteJsonDb-stress') as executor:
+                thread_db = shared if target == "direct" else None
+                futures = [executor.submit(run_worker, spec, thread_db) for spec in specs[processes:]]
+                thread_results = [future.result() for future in futures]
+        results = (pending.get() if pending is not None else []) + thread_results
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        if shared is not None:
+            shared.close()
+
+    consistency = check_consistency(os.path.join(workdir, FILENAME), results)
+    if base_dir is None:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    by_operation: Dict[str, List[int]] = {}
+    for result in results:
+        for _, name, latency, _ in result["samples"]:
+            by_operation.setdefault(name, []).append(latency)
+    ops = sum(len(result["samples"]) for result in results)
+    return {
+        "config": config,
+        "totals": {"ops": ops, "ops_per_s": ops / duration, "errors": sum(result["errors"] for result in results)},
+        "operations": {name: summarize(samples) for name, samples in sorted(by_operation.items())},
+        "timeline": timeline(results, interval),
+        "consistency": consistency,
+        "workers": [dict({key: result[key] for key in ("id", "kind", "errors", "first_error")},
+                         ops=len(result["samples"])) for result in results],
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent readers and writers on one database, with consistency checks.")
+    parser.add_argument("--threads", type=int, default=4, help="Thread workers.")
+    parser.add_argument("--processes", type=int, default=0, help="Process workers.")
+    parser.add_argument("--target", default="direct", choices=["direct", "server"],
+                        help="Workers use JsonDB directly, or a JsonDBServer through JsonDBClient.")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Operation weights. Operations: {','.join(OPERATIONS)}.")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds of load.")
+    parser.add_argument("--rate", type=float, default=0.0, help="Target ops/s per worker (0: as fast as possible).")
+    parser.add_argument("--records", type=int, default=2000, help="Records generated before the run.")
+    parser.add_argument("--collections", type=int, default=4, help="Number of top level collections.")
+    parser.add_argument("--counters", type=int, default=8, help="Distinct counters hit by incr.")
+    parser.add_argument("--interval", type=float, default=1.0, help="Timeline bucket width in seconds.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed.")
+    parser.add_argument("--base-dir", help="Keep the database in this directory (default: a temporary one).")
+    parser.add_argument("--output", "-o", help="Also write the full report as JSON to this file.")
+    args = parser.parse_args(argv)
+
+    report = run(args.threads, args.processes, args.target, args.mix, args.duration, args.rate, args.records,
+                 args.collections, args.counters, args.interval, args.seed, args.base_dir)
+    totals = report["totals"]
+    print(f"{args.threads} threads, {args.processes} processes, target {args.target}: "
+          f"{totals['ops']} ops, {totals['ops_per_s']:.1f} ops/s, {totals['errors']} errors")
+    print(f"{'t (s)':>7} {'ops/s':>9} {'errors':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for row in report["timeline"]:
+        print(f"{row['t']:>7.1f} {row['ops_per_s']:>9.1f} {row['errors']:>7} "
+              f"{row['p50_ms']:>9.3f} {row['p99_ms']:>9.3f} {row['max_ms']:>9.3f}")
+    print(f"{'operation':<9} {'n':>8} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, summary in report["operations"].items():
+        print(f"{name:<9} {summary['n']:>8} {summary['p50_ms']:>9.3f} {summary['p99_ms']:>9.3f}")
+    for worker in report["workers"]:
+        if worker["first_error"]:
+            print(f"worker {worker['id']} ({worker['kind']}): {worker['errors']} errors, first: {worker['first_error']}")
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=4)
+
+    consistency = report["consistency"]
+    if consistency["ok"]:
+        print(f"✅ Consistent: {consistency['counter_actual']} increments, {consistency['written']} written keys, last edits kept.")
+        return 0
+    if not consistency["file_parses"]:
+        print(f"\033[91m#bugs\033[0m The database file doesn't parse: {consistency['file_error']}")
+    else:
+        print(f"\033[91m#bugs\033[0m Lost updates: counters {consistency['counter_actual']}/{consistency['counter_expected']}, "
+              f"{consistency['missing_count']}/{consistency['written']} written keys missing "
+              f"(e.g. {consistency['missing'][:3]}), stale last edits: {consistency['stale_edits'] or 'none'}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
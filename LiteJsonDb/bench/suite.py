@@ -0,0 +1,542 @@
+"""
+Benchmark cases for every JsonDB hot path, and the runner that times them.
+
+Cases are registered with @case and run in registration order against one
+generated database, so write cases (set -> edit -> remove) see each other's data.
+"""
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from ..handler.pagination import encode_cursor
+from ..handler.schema import TYPE_NAMES
+from .generate import VALUE_TYPES, generate_database
+
+CASES: "OrderedDict[str, Callable]" = OrderedDict()
+
+def case(name: str) -> Callable:
+    """
+    Registers a benchmark case. The function takes a BenchContext and returns a list of samples in nanoseconds.
+    """
+    def register(func: Callable) -> Callable:
+        CASES[name] = func
+        return func
+    return register
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Returns the peak resident set size of this process in MiB, or None where unsupported.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def package_version() -> Optional[str]:
+    """
+    Returns the installed LiteJsonDb version, or None when running from a source tree.
+    """
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:  # Python 3.7
+        return None
+    try:
+        return version("LiteJsonDb")
+    except PackageNotFoundError:
+        return None
+
+def measure(func: Callable, calls: Iterable[tuple]) -> List[int]:
+    """
+    Times func(*args) once per argument tuple.
+
+    Returns:
+        List[int]: One duration per call, in nanoseconds.
+    """
+    samples = []
+    clock = time.perf_counter_ns
+    for args in calls:
+        start = clock()
+        func(*args)
+        samples.append(clock() - start)
+    return samples
+
+def summarize(samples: Sequence[int]) -> Dict[str, Any]:
+    """
+    Reduces raw samples to count, p50/p99/mean/max latency (ms) and throughput (ops/s).
+    """
+    ordered = sorted(samples)
+    n = len(ordered)
+    if not n:
+        return {"n": 0}
+    total = sum(ordered)
+    def pct(p: float) -> float:
+        return ordered[min(int(p * n), n - 1)] / 1e6
+    return {
+        "n": n,
+        "p50_ms": pct(0.50),
+        "p99_ms": pct(0.99),
+        "mean_ms": total / n / 1e6,
+        "max_ms": ordered[-1] / 1e6,
+        "ops_per_s": n / (total / 1e9) if total else float('inf'),
+    }
+
+class BenchContext:
+    """
+    Holds the generated database, a working directory and the databases opened by the cases.
+    """
+    def __init__(self, records: int = 10000, collections: int = 4, depth: int = 2,
+                 value_types: Sequence[str] = VALUE_TYPES, ops: int = 1000, write_ops: int = 50,
+                 seed: int = 42, fernet_key: str = "litejsondb-bench"):
+        self.config = {
+            "records": records, "collections": collections, "depth": depth,
+            "value_types": list(value_types), "ops": ops, "write_ops": write_ops, "seed": seed,
+        }
+        self.ops = ops
+        self.write_ops = write_ops
+        self.fernet_key = fernet_key
+        self.rng = random.Random(seed)
+        self.data = generate_database(records, collections, depth, value_types, seed)
+        self.ids = [(collection, item_id) for collection, items in self.data.items() for item_id in items]
+        self.workdir = tempfile.mkdtemp(prefix='litejsondb-bench-')
+        self._cwd = os.getcwd()
+        self._db = None
+
+    def __enter__(self) -> "BenchContext":
+        os.chdir(self.workdir)
+        os.makedirs('database', exist_ok=True)
+        with open(os.path.join('database', 'bench.json'), 'w') as file:
+            json.dump(self.data, file, indent=4)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._db is not None:
+            self._db.close()
+        os.chdir(self._cwd)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def open_db(self, **kwargs):
+        """
+        Opens a JsonDB on the benchmark file.
+        """
+        from ..LiteJsonDb import JsonDB
+        return JsonDB(filename='bench.json', **kwargs)
+
+    @property
+    def db(self):
+        """
+        The shared database used by the data operation cases.
+        """
+        if self._db is None:
+            self._db = self.open_db()
+        return self._db
+
+    def sample_ids(self, count: int) -> List[tuple]:
+        return [self.rng.choice(self.ids) for _ in range(count)]
+
+# --------------------------------------------------
+#                 LOAD / SAVE
+# --------------------------------------------------
+
+@case("load")
+def bench_load(ctx: BenchContext) -> List[int]:
+    def load():
+        ctx.open_db().close()
+    return measure(load, [()] * max(3, ctx.write_ops // 10))
+
+@case("load_compact")
+def bench_load_compact(ctx: BenchContext) -> List[int]:
+    def load():
+        ctx.open_db(compact=True).close()
+    return measure(load, [()] * max(3, ctx.write_ops // 10))
+
+def _mapped_reader(ctx: BenchContext):
+    # Writes the offset index once (the file itself is unchanged), then maps the file.
+    writer = ctx.open_db(offset_index=True)
+    writer._save_db()
+    writer.close()
+    return ctx.open_db(read_only=True, mmap=True)
+
+@case("load_mmap")
+def bench_load_mmap(ctx: BenchContext) -> List[int]:
+    _mapped_reader(ctx).close()
+    def load():
+        ctx.open_db(read_only=True, mmap=True).close()
+    return measure(load, [()] * max(3, ctx.write_ops // 10))
+
+@case("get_data_mmap")
+def bench_get_data_mmap(ctx: BenchContext) -> List[int]:
+    # Same reads as get_data, each item decoded from the mapping on first access.
+    db = _mapped_reader(ctx)
+    try:
+        return measure(db.get_data, [(f"{c}/{i}",) for c, i in ctx.sample_ids(ctx.ops)])
+    finally:
+        db.close()
+
+@case("save")
+def bench_save(ctx: BenchContext) -> List[int]:
+    return measure(ctx.db._save_db, [()] * max(3, ctx.write_ops // 2))
+
+# --------------------------------------------------
+#                 DATA OPERATIONS
+# --------------------------------------------------
+
+@case("get_data")
+def bench_get_data(ctx: BenchContext) -> List[int]:
+    return measure(ctx.db.get_data, [(f"{c}/{i}",) for c, i in ctx.sample_ids(ctx.ops)])
+
+@case("get_data_deep")
+def bench_get_data_deep(ctx: BenchContext) -> List[int]:
+    if "dict" not in ctx.config["value_types"] or ctx.config["depth"] < 2:
+        return []
+    return measure(ctx.db.get_data, [(f"{c}/{i}/dict_field/child/label",) for c, i in ctx.sample_ids(ctx.ops)])
+
+@case("key_exists")
+def bench_key_exists(ctx: BenchContext) -> List[int]:
+    return measure(ctx.db.key_exists, [(f"{c}/{i}",) for c, i in ctx.sample_ids(ctx.ops)])
+
+@case("set_data")
+def bench_set_data(ctx: BenchContext) -> List[int]:
+    return measure(ctx.db.set_data, [(f"bench_new/{n}", {"name": "Bench", "n": n}) for n in range(ctx.write_ops)])
+
+@case("edit_data")
+def bench_edit_data(ctx: BenchContext) -> List[int]:
+    return measure(ctx.db.edit_data, [(f"{c}/{i}", {"name": "Edited"}) for c, i in ctx.sample_ids(ctx.write_ops)])
+
+@case("edit_data_fragments")
+def bench_edit_data_fragments(ctx: BenchContext) -> List[int]:
+    # Same as edit_data: each save only re-encodes the edited collection.
+    db = ctx.open_db(fragment_cache=True)
+    try:
+        return measure(db.edit_data, [(f"{c}/{i}", {"name": "Edited"}) for c, i in ctx.sample_ids(ctx.write_ops)])
+    finally:
+        db.close()
+
+@case("patch")
+def bench_patch(ctx: BenchContext) -> List[int]:
+    # Same change as edit_data, as a JSON patch guarded by a test.
+    calls = [(f"{c}/{i}", [{"op": "test", "path": "/email", "value": ctx.data[c][i]["email"]},
+                           {"op": "replace", "path": "/name", "value": "Patched"}])
+             for c, i in ctx.sample_ids(ctx.write_ops)]
+    return measure(ctx.db.patch, calls)
+
+@case("edit_data_increment")
+def bench_edit_data_increment(ctx: BenchContext) -> List[int]:
+    return measure(ctx.db.edit_data, [(f"{c}/{i}", {"increment": {"score": 1}}) for c, i in ctx.sample_ids(ctx.write_ops)])
+
+@case("incr")
+def bench_incr(ctx: BenchContext) -> List[int]:
+    # Same work as edit_data_increment, through the write-combining counter path.
+    samples = measure(ctx.db.incr, [(f"{c}/{i}", "score", 1) for c, i in ctx.sample_ids(ctx.ops)])
+    ctx.db.flush_counters()
+    return samples
+
+@contextlib.contextmanager
+def _logged_db(ctx: BenchContext):
+    # The console handler writes to the stdout of the moment: keep log lines out of the results.
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(devnull):
+            db = ctx.open_db(enable_log=True)
+        try:
+            yield db
+        finally:
+            db.close()
+
+@case("get_data_logged")
+def bench_get_data_logged(ctx: BenchContext) -> List[int]:
+    with _logged_db(ctx) as db:
+        return measure(db.get_data, [(f"{c}/{i}",) for c, i in ctx.sample_ids(ctx.ops)])
+
+@case("edit_data_logged")
+def bench_edit_data_logged(ctx: BenchContext) -> List[int]:
+    # Same as edit_data, with logging on: every save logs a line, written by the background thread.
+    with _logged_db(ctx) as db:
+        return measure(db.edit_data, [(f"{c}/{i}", {"name": "Edited"}) for c, i in ctx.sample_ids(ctx.write_ops)])
+
+@case("remove_data")
+def bench_remove_data(ctx: BenchContext) -> List[int]:
+    return measure(ctx.db.remove_data, [(f"bench_new/{n}",) for n in range(ctx.write_ops)])
+
+# --------------------------------------------------
+#                 SUBCOLLECTIONS
+# --------------------------------------------------
+
+@case("set_subcollection")
+def bench_set_subcollection(ctx: BenchContext) -> List[int]:
+    return measure(ctx.db.set_subcollection, [("bench_sub", str(n), {"name": "Bench", "n": n}) for n in range(ctx.write_ops)])
+
+@case("get_subcollection")
+def bench_get_subcollection(ctx: BenchContext) -> List[int]:
+    return measure(ctx.db.get_subcollection, [(c, i) for c, i in ctx.sample_ids(ctx.ops)])
+
+@case("edit_subcollection")
+def bench_edit_subcollection(ctx: BenchContext) -> List[int]:
+    return measure(ctx.db.edit_subcollection, [("bench_sub", str(n), {"n": -n}) for n in range(ctx.write_ops)])
+
+@case("remove_subcollection")
+def bench_remove_subcollection(ctx: BenchContext) -> List[int]:
+    return measure(ctx.db.remove_subcollection, [("bench_sub", str(n)) for n in range(ctx.write_ops)])
+
+def _page_cursors(ctx: BenchContext) -> List[tuple]:
+    # Pages starting at random depths of the collection, as a client walking it would request them.
+    return [(c, 50, encode_cursor(c, i)) for c, i in ctx.sample_ids(_search_calls(ctx))]
+
+@case("page")
+def bench_page(ctx: BenchContext) -> List[int]:
+    return measure(ctx.db.get_subcollection_page, _page_cursors(ctx))
+
+@case("page_projected")
+def bench_page_projected(ctx: BenchContext) -> List[int]:
+    fields = ["name", "score"]
+    return measure(lambda c, n, cursor: ctx.db.get_subcollection_page(c, n, cursor, fields), _page_cursors(ctx))
+
+# --------------------------------------------------
+#                 VALIDATION
+# --------------------------------------------------
+
+BENCH_SCHEMA = {"name": str, "email": str, "age": int, "score": int, "str_field?": str, "int_field?": int,
+                "float_field?": float, "bool_field?": bool, "list_field?": [int],
+                "dict_field?": {"level": int, "label": str, "child?": "dict"}}
+
+def _validation_records(ctx: BenchContext) -> List[tuple]:
+    return [(ctx.data[c][i],) for c, i in ctx.sample_ids(ctx.ops)]
+
+def _interpret_schema(spec: Any, value: Any, path: str, errors: List[str]) -> None:
+    """
+    Checks a value against a schema spec by walking the spec on every call: the reference the
+    compiled validators are measured against (same checks, no compilation).
+    """
+    if isinstance(spec, dict):
+        if type(value) is not dict:
+            errors.append(f"{path}: expected dict")
+            return
+        for key, field_spec in spec.items():
+            name = key[:-1] if key.endswith('?') else key
+            if name in value:
+                _interpret_schema(field_spec, value[name], f"{path}/{name}", errors)
+            elif not key.endswith('?'):
+                errors.append(f"{path}/{name}: missing required field")
+    elif isinstance(spec, list):
+        if type(value) is not list:
+            errors.append(f"{path}: expected list")
+            return
+        for i, item in enumerate(value):
+            _interpret_schema(spec[0], item, f"{path}/{i}", errors)
+    else:
+        accepted = TYPE_NAMES[spec] if isinstance(spec, str) else ((int, float) if spec is float else (spec,))
+        if accepted is not None and (not isinstance(value, accepted) or (bool not in accepted and type(value) is bool)):
+            errors.append(f"{path}: expected {spec}")
+
+@case("validate_data")
+def bench_validate_data(ctx: BenchContext) -> List[int]:
+    # Top level only: nested values are not checked.
+    return measure(ctx.db.validate_data, _validation_records(ctx))
+
+@case("validate_schema")
+def bench_validate_schema(ctx: BenchContext) -> List[int]:
+    # Nested checks included, unlike validate_data: compare with validate_schema_uncompiled.
+    ctx.db.set_schema("col0", BENCH_SCHEMA)
+    try:
+        return measure(lambda record: ctx.db._validate_write(("col0", "0"), record), _validation_records(ctx))
+    finally:
+        ctx.db.remove_schema("col0")
+
+@case("validate_schema_uncompiled")
+def bench_validate_schema_uncompiled(ctx: BenchContext) -> List[int]:
+    # The checks of validate_schema without compiling the schema first.
+    return measure(lambda record: _interpret_schema(BENCH_SCHEMA, record, "0", []), _validation_records(ctx))
+
+def _bulk_items(ctx: BenchContext, prefix: str, n: int) -> Dict[str, Any]:
+    return {f"{prefix}{n}_{i}": ctx.data[c][item_id] for i, (c, item_id) in enumerate(ctx.sample_ids(ctx.write_ops * 10))}
+
+@contextlib.contextmanager
+def _saves_skipped(db):
+    # The save costs the same with or without validation and would hide it: the timed calls skip it.
+    db._save_db = db._backup_db = lambda: None
+    try:
+        yield
+    finally:
+        del db._save_db, db._backup_db
+
+def _bulk_load(ctx: BenchContext, trusted: bool) -> List[int]:
+    # The collection is removed after each sample (untimed), so every load inserts into an empty collection.
+    samples = []
+    for n in range(3):
+        items = _bulk_items(ctx, "t" if trusted else "v", n)
+        with _saves_skipped(ctx.db):
+            samples.extend(measure(lambda: ctx.db.bulk_set_subcollection("bench_bulk", items, trusted=trusted), [()]))
+        ctx.db.remove_subcollection("bench_bulk")
+    return samples
+
+@case("bulk_load")
+def bench_bulk_load(ctx: BenchContext) -> List[int]:
+    # Validated with the compiled schema, save excluded.
+    ctx.db.set_schema("bench_bulk", BENCH_SCHEMA)
+    return _bulk_load(ctx, trusted=False)
+
+@case("bulk_load_trusted")
+def bench_bulk_load_trusted(ctx: BenchContext) -> List[int]:
+    # Same items without validation, save excluded.
+    return _bulk_load(ctx, trusted=True)
+
+# --------------------------------------------------
+#                 SEARCH / EXPORT
+# --------------------------------------------------
+
+def _search_calls(ctx: BenchContext) -> int:
+    return max(3, ctx.write_ops // 5)
+
+@case("search_exact")
+def bench_search_exact(ctx: BenchContext) -> List[int]:
+    return measure(ctx.db.search_data, [("Aliou",)] * _search_calls(ctx))
+
+@case("search_substring")
+def bench_search_substring(ctx: BenchContext) -> List[int]:
+    return measure(lambda: ctx.db.search_data("example", substring=True), [()] * _search_calls(ctx))
+
+@case("search_case_insensitive")
+def bench_search_case_insensitive(ctx: BenchContext) -> List[int]:
+    return measure(lambda: ctx.db.search_data("aliou", case_sensitive=False), [()] * _search_calls(ctx))
+
+@case("search_key")
+def bench_search_key(ctx: BenchContext) -> List[int]:
+    return measure(lambda: ctx.db.search_data("Aliou", key="col0"), [()] * _search_calls(ctx))
+
+@case("search_key_cached")
+def bench_search_key_cached(ctx: BenchContext) -> List[int]:
+    # Same query as search_key with the query cache: the first call scans, the others are hits
+    # (writes to other collections in between don't invalidate them).
+    db = ctx.open_db(query_cache=64)
+    try:
+        def search():
+            db.search_data("Aliou", key="col0")
+            db.incr("bench_counters/hits", "n")
+        return measure(search, [()] * _search_calls(ctx))
+    finally:
+        db.close()
+
+@case("export_csv")
+def bench_export_csv(ctx: BenchContext) -> List[int]:
+    return measure(ctx.db.export_to_csv, [("col0",)] * max(3, ctx.write_ops // 10))
+
+# --------------------------------------------------
+#                 AGGREGATION
+# --------------------------------------------------
+
+_AGGREGATE_METRICS = {"count": "count", "score": ("sum", "score"), "oldest": ("max", "age")}
+
+@case("aggregate")
+def bench_aggregate(ctx: BenchContext) -> List[int]:
+    return measure(lambda: ctx.db.aggregate("col0", group_by="name", metrics=_AGGREGATE_METRICS),
+                   [()] * _search_calls(ctx))
+
+@case("aggregate_cached")
+def bench_aggregate_cached(ctx: BenchContext) -> List[int]:
+    # The dashboard pattern: an item changes, then the cached query runs again. Items are edited in
+    # memory through the change hook (skipping the save) and only the query is timed.
+    query = lambda: ctx.db.aggregate("col0", group_by="name", metrics=_AGGREGATE_METRICS, cache=True)
+    query()
+    samples = []
+    for n, (collection, item_id) in enumerate(ctx.sample_ids(ctx.ops)):
+        if n < ctx.write_ops and collection == "col0":
+            ctx.db.db[collection][item_id]["score"] = n
+            ctx.db._notify_change("edit_subcollection", (collection, item_id), ctx.db.db[collection][item_id])
+        samples.extend(measure(query, [()]))
+    return samples
+
+@case("column_select")
+def bench_column_select(ctx: BenchContext) -> List[int]:
+    ctx.db.add_columns("col0", ["age", "score"])
+    return measure(lambda: ctx.db.column_select("col0", {"age": (18, 30), "score": (">", 500)}), [()] * _search_calls(ctx))
+
+@case("column_aggregate")
+def bench_column_aggregate(ctx: BenchContext) -> List[int]:
+    ctx.db.add_columns("col0", ["age", "score"])
+    return measure(lambda: ctx.db.column_aggregate("col0", "score", "avg", where={"age": (">=", 65)}), [()] * _search_calls(ctx))
+
+# --------------------------------------------------
+#                 ENCRYPTION
+# --------------------------------------------------
+
+def _encryption_cases(ctx: BenchContext, method: str) -> Tuple[List[int], List[int]]:
+    from ..handler.encrypt import Encryption
+    crypto = Encryption(method, ctx.fernet_key if method == 'fernet' else None)
+    crypto.logger = ctx.db.logger
+    calls = max(3, ctx.write_ops // 10)
+    token = crypto._encrypt(ctx.data)
+    return measure(crypto._encrypt, [(ctx.data,)] * calls), measure(crypto._decrypt, [(token,)] * calls)
+
+@case("base64_encrypt")
+def bench_base64_encrypt(ctx: BenchContext) -> List[int]:
+    ctx.base64_samples = _encryption_cases(ctx, 'base64')
+    return ctx.base64_samples[0]
+
+@case("base64_decrypt")
+def bench_base64_decrypt(ctx: BenchContext) -> List[int]:
+    return ctx.base64_samples[1] if hasattr(ctx, 'base64_samples') else _encryption_cases(ctx, 'base64')[1]
+
+@case("fernet_encrypt")
+def bench_fernet_encrypt(ctx: BenchContext) -> List[int]:
+    ctx.fernet_samples = _encryption_cases(ctx, 'fernet')
+    return ctx.fernet_samples[0]
+
+@case("fernet_decrypt")
+def bench_fernet_decrypt(ctx: BenchContext) -> List[int]:
+    return ctx.fernet_samples[1] if hasattr(ctx, 'fernet_samples') else _encryption_cases(ctx, 'fernet')[1]
+
+# --------------------------------------------------
+#                 RUNNER
+# --------------------------------------------------
+
+def run_suite(only: Optional[Sequence[str]] = None, progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+              **config) -> Dict[str, Any]:
+    """
+    Generates a database and runs the selected cases against it.
+
+    Args:
+        only (Optional[Sequence[str]], optional): Case names (or name prefixes) to run. Defaults to all.
+        progress (Optional[Callable], optional): Called with (case name, summary) after each case.
+        **config: BenchContext options (records, collections, depth, value_types, ops, write_ops, seed).
+
+    Returns:
+        Dict[str, Any]: {"meta": {...}, "results": {case name: summary}}.
+    """
+    selected = [name for name in CASES if not only or any(name.startswith(prefix) for prefix in only)]
+    unknown = [prefix for prefix in (only or []) if not any(name.startswith(prefix) for name in CASES)]
+    if unknown:
+        raise ValueError(f"\033[91m#bugs\033[0m Unknown benchmark cases: {unknown}. Available: {list(CASES)}")
+
+    results = {}
+    with BenchContext(**config) as ctx:
+        for name in selected:
+            samples = CASES[name](ctx)
+            if not samples:
+                continue
+            summary = summarize(samples)
+            summary["peak_rss_mb"] = peak_rss_mb()
+            results[name] = summary
+            if progress:
+                progress(name, summary)
+        meta = {
+            "version": package_version(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "config": ctx.config,
+        }
+    return {"meta": meta, "results": results}
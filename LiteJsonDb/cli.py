@@ -0,0 +1,62 @@
+"""
+Command line entry point: `litejsondb serve` (or `python -m LiteJsonDb serve`).
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+from typing import List, Optional
+
+from .LiteJsonDb import JsonDB
+from .modules.server import JsonDBServer
+
+def _add_db_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--base-dir", default="database", help="Directory of the database files.")
+    parser.add_argument("--filename", default="db.json", help="Database file name (inside the database directory).")
+    parser.add_argument("--backup-filename", default="db_backup.json", help="Backup file name.")
+    parser.add_argument("--enable-log", action="store_true", help="Enable logging.")
+    parser.add_argument("--auto-backup", action="store_true", help="Back up the database before each write.")
+    parser.add_argument("--crypted", action="store_true", help="Encrypt the database file.")
+    parser.add_argument("--encryption-method", default="base64", choices=["base64", "fernet"])
+    parser.add_argument("--encryption-key", default=os.environ.get("LITEJSONDB_KEY"),
+                        help="Fernet key (defaults to the LITEJSONDB_KEY environment variable).")
+
+def _serve(args: argparse.Namespace) -> int:
+    db = JsonDB(filename=args.filename, backup_filename=args.backup_filename, enable_log=args.enable_log,
+                auto_backup=args.auto_backup, crypted=args.crypted, encryption_method=args.encryption_method,
+                encryption_key=args.encryption_key, change_feed=args.change_feed, base_dir=args.base_dir)
+    address = args.socket or os.path.join(args.base_dir, "litejsondb.sock")
+    server = JsonDBServer(db, address)
+    if args.feed_socket:
+        db.serve_changes(args.feed_socket)
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"🚀 LiteJsonDb serving '{db.filename}' on {address}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        db.close()
+    return 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="litejsondb", description="LiteJsonDb command line tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Host one database for many client processes over a Unix socket.")
+    serve.add_argument("--socket", help="Unix socket path to listen on. Defaults to litejsondb.sock in the database directory.")
+    serve.add_argument("--change-feed", type=int, default=0, help="Changes kept for replication followers (0 disables).")
+    serve.add_argument("--feed-socket", help="Also publish the change feed on this Unix socket (needs --change-feed).")
+    _add_db_arguments(serve)
+    serve.set_defaults(handler=_serve)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
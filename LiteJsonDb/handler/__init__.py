@@ -1,3 +1,18 @@
 from .encrypt import Encryption
 from .db_operations import DatabaseOperations
 from .method import DataManipulation
+
+from .expiry import Expiry
+from .counters import Counters
+from .schema import Schemas
+from .aggregate import Aggregation
+from .columnar import Columnar
+from .compact import Compaction
+from .pagination import Pagination
+from .fragments import Fragments
+from .patch import Patching
+from .querycache import QueryCache
+from .codec import ParallelCodec
+from .mapped import MemoryMapping
+from .metrics import Instrumentation, MetricsRegistry
+from .profiling import SampledProfiler
@@ -0,0 +1,295 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .keypath import MISSING, compile_key, resolve
+
+FUNCTIONS = ('count', 'sum', 'avg', 'min', 'max')
+
+MetricSpec = Union[str, Tuple[str, str], List[str]]
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return None
+
+def _group_key(value: Any) -> Any:
+    if value is MISSING:
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True)
+    return value
+
+class _Group:
+    """
+    Running accumulators of one group: one slot per metric.
+    """
+    __slots__ = ('count', 'members', 'n', 'sum', 'min', 'max', 'stale')
+
+    def __init__(self, width: int):
+        self.count = 0
+        self.members = set()
+        self.n = [0] * width
+        self.sum = [0] * width
+        self.min: List[Optional[float]] = [None] * width
+        self.max: List[Optional[float]] = [None] * width
+        self.stale = False
+
+    def add(self, inputs: Tuple[Optional[float], ...]) -> None:
+        self.count += 1
+        for i, value in enumerate(inputs):
+            if value is None:
+                continue
+            self.n[i] += 1
+            self.sum[i] += value
+            if self.min[i] is None or value < self.min[i]:
+                self.min[i] = value
+            if self.max[i] is None or value > self.max[i]:
+                self.max[i] = value
+
+    def discard(self, inputs: Tuple[Optional[float], ...]) -> None:
+        self.count -= 1
+        for i, value in enumerate(inputs):
+            if value is None:
+                continue
+            self.n[i] -= 1
+            self.sum[i] -= value
+            # The extremum left the group: it is recomputed from the members when next read.
+            if value == self.min[i] or value == self.max[i]:
+                self.stale = True
+
+class AggregateView:
+    """
+    count/sum/avg/min/max of some fields of a collection's items, per group.
+
+    A tracked view remembers what every item contributed (its group and metric inputs),
+    so a changed item is applied as "remove the old contribution, add the new one"
+    without rescanning the collection or needing the item's previous value.
+    """
+    def __init__(self, collection: str, group_by: Optional[str], metrics: List[Tuple[str, str, Optional[Tuple[str, ...]]]],
+                 track: bool = False):
+        """
+        Args:
+            collection (str): The collection name.
+            group_by (Optional[str]): The field (path separated by "/") items are grouped by.
+            metrics (List[Tuple]): Normalized metrics: (output name, function, field path or None).
+            track (bool, optional): Keeps per-item contributions for incremental updates. Defaults to False.
+        """
+        self.collection = collection
+        self.group_by = group_by
+        self._group_parts = compile_key(group_by) if group_by else None
+        self.metrics = metrics
+        self.track = track
+        self.groups: Dict[Any, _Group] = {}
+        self.items: Dict[str, Tuple[Any, Tuple[Optional[float], ...]]] = {}
+        self.built = False
+        self._result = None
+
+    def _contribution(self, item: Any) -> Tuple[Any, Tuple[Optional[float], ...]]:
+        is_dict = isinstance(item, dict)
+        group = _group_key(resolve(item, self._group_parts)) if self._group_parts and is_dict else None
+        inputs = []
+        for _, function, parts in self.metrics:
+            if parts is None:
+                inputs.append(None)
+            elif not is_dict:
+                inputs.append(None)
+            else:
+                value = resolve(item, parts)
+                if function == 'count':
+                    inputs.append(None if value is MISSING or value is None else 1)
+                else:
+                    inputs.append(_number(value))
+        return group, tuple(inputs)
+
+    def _add(self, item_id: str, item: Any) -> None:
+        group_key, inputs = self._contribution(item)
+        group = self.groups.get(group_key)
+        if group is None:
+            group = self.groups[group_key] = _Group(len(self.metrics))
+        group.add(inputs)
+        if self.track:
+            group.members.add(item_id)
+            self.items[item_id] = (group_key, inputs)
+
+    def _discard(self, item_id: str) -> None:
+        contribution = self.items.pop(item_id, None)
+        if contribution is None:
+            return
+        group_key, inputs = contribution
+        group = self.groups[group_key]
+        group.discard(inputs)
+        group.members.discard(item_id)
+        if not group.count:
+            del self.groups[group_key]
+
+    def build(self, items: Any) -> None:
+        """
+        Computes the accumulators with one pass over the collection's items.
+        """
+        self.groups = {}
+        self.items = {}
+        self._result = None
+        if isinstance(items, dict):
+            for item_id, item in items.items():
+                self._add(item_id, item)
+        self.built = True
+
+    def update(self, item_id: str, item: Any) -> None:
+        """
+        Applies the new value of one item (MISSING if it was removed).
+        """
+        self._discard(item_id)
+        if item is not MISSING:
+            self._add(item_id, item)
+        self._result = None
+
+    def invalidate(self) -> None:
+        """
+        Forgets everything; the view is rebuilt on its next read.
+        """
+        self.built = False
+        self.groups = {}
+        self.items = {}
+        self._result = None
+
+    def _refresh(self, group: _Group) -> None:
+        width = len(self.metrics)
+        group.min = [None] * width
+        group.max = [None] * width
+        for item_id in group.members:
+            for i, value in enumerate(self.items[item_id][1]):
+                if value is None:
+                    continue
+                if group.min[i] is None or value < group.min[i]:
+                    group.min[i] = value
+                if group.max[i] is None or value > group.max[i]:
+                    group.max[i] = value
+        group.stale = False
+
+    def result(self) -> Dict[str, Any]:
+        """
+        Returns {group: {metric: value}}, or {metric: value} when there is no group_by.
+        """
+        if self._result is not None:
+            return self._result
+        rendered = {}
+        for group_key, group in self.groups.items():
+            if group.stale:
+                self._refresh(group)
+            values = {}
+            for i, (name, function, parts) in enumerate(self.metrics):
+                if function == 'count':
+                    values[name] = group.count if parts is None else group.n[i]
+                elif function == 'sum':
+                    values[name] = group.sum[i]
+                elif function == 'avg':
+                    values[name] = group.sum[i] / group.n[i] if group.n[i] else None
+                else:
+                    values[name] = group.min[i] if function == 'min' else group.max[i]
+            rendered[group_key] = values
+        if not self.group_by:
+            empty = {name: (0 if function in ('count', 'sum') else None) for name, function, _ in self.metrics}
+            rendered = rendered.get(None, empty)
+        self._result = rendered
+        return rendered
+
+def normalize_metrics(metrics: Optional[Dict[str, MetricSpec]]) -> List[Tuple[str, str, Optional[Tuple[str, ...]]]]:
+    """
+    Turns {"total": ("sum", "amount"), "n": "count"} into [(name, function, field parts)].
+
+    Raises:
+        ValueError: If a function is unknown or a field is missing.
+    """
+    if not metrics:
+        metrics = {"count": "count"}
+    normalized = []
+    for name, spec in metrics.items():
+        if isinstance(spec, str):
+            function, field = spec, None
+        else:
+            function, field = spec
+        if function not in FUNCTIONS:
+            raise ValueError(f"\033[91m#bugs\033[0m Unknown aggregate function '{function}' for '{name}'. Use one of {list(FUNCTIONS)}.")
+        if field is None and function != 'count':
+            raise ValueError(f"\033[91m#bugs\033[0m Aggregate '{name}' needs a field, e.g. ('{function}', 'amount').")
+        normalized.append((name, function, compile_key(field) if field else None))
+    return normalized
+
+class Aggregation:
+    """
+    Grouped aggregates over the items of a collection, with optional incremental caching.
+
+    Cached views are kept up to date from the change notifications: a changed item only
+    moves its own contribution, so repeated queries cost O(number of groups).
+    """
+    def __init__(self):
+        """
+        Initializes the aggregate cache.
+        """
+        self._aggregates: Dict[Tuple, AggregateView] = {}
+
+    def aggregate(self, collection: str, group_by: Optional[str] = None,
+                  metrics: Optional[Dict[str, MetricSpec]] = None, cache: bool = False) -> Dict[str, Any]:
+        """
+        Computes aggregates over the items of a collection in a single pass.
+
+        Example:
+            db.aggregate("orders", group_by="status",
+                         metrics={"orders": "count", "revenue": ("sum", "total"), "biggest": ("max", "total")})
+            # {"paid": {"orders": 12, "revenue": 840.5, "biggest": 199.0}, "refunded": {...}}
+
+        Args:
+            collection (str): The collection whose items are aggregated.
+            group_by (Optional[str], optional): The field (path separated by "/") to group items by. Items
+                without it fall in the None group. Defaults to None (one group).
+            metrics (Optional[Dict[str, MetricSpec]], optional): Output name -> "count", or (function, field)
+                with function in count/sum/avg/min/max. sum/avg/min/max ignore non-numeric values and
+                ("count", field) counts the items where the field is set. Defaults to {"count": "count"}.
+            cache (bool, optional): Keeps the result and updates it incrementally as items change.
+                Defaults to False.
+
+        Returns:
+            Dict[str, Any]: {group value: {name: value}} with group_by, otherwise {name: value}.
+            Do not modify it: cached results are shared.
+        """
+        self._expire_due()
+        normalized = normalize_metrics(metrics)
+        if not cache:
+            view = AggregateView(collection, group_by, normalized)
+            view.build(self.db.get(collection))
+            return view.result()
+        cache_key = (collection, group_by, tuple(normalized))
+        view = self._aggregates.get(cache_key)
+        if view is None:
+            view = self._aggregates[cache_key] = AggregateView(collection, group_by, normalized, track=True)
+        if not view.built:
+            view.build(self.db.get(collection))
+        return view.result()
+
+    def clear_aggregate_cache(self, collection: Optional[str] = None) -> None:
+        """
+        Drops the cached aggregates (of one collection, or all of them).
+
+        Args:
+            collection (Optional[str], optional): The collection. Defaults to None (all).
+        """
+        if collection is None:
+            self._aggregates = {}
+        else:
+            self._aggregates = {k: v for k, v in self._aggregates.items() if v.collection != collection}
+
+    def _update_aggregates(self, parts: Tuple[str, ...]) -> None:
+        """
+        Applies a change to the cached aggregates. Called by _notify_change.
+        """
+        for view in self._aggregates.values():
+            if not view.built:
+                continue
+            if not parts:
+                view.invalidate()
+            elif parts[0] == view.collection:
+                items = self.db.get(view.collection)
+                if len(parts) == 1 or not isinstance(items, dict):
+                    view.invalidate()
+                else:
+                    view.update(parts[1], items.get(parts[1], MISSING))
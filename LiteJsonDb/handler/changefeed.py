@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+
+# Actions that delete their path; every other action carries the resulting value.
+REMOVE_ACTIONS = frozenset(("remove_data", "remove_subcollection", "expire_data", "evict_data"))
+
+class ChangeFeed:
+    """
+    An ordered, bounded log of database mutations.
+
+    Every change gets a sequence number and is stored as a ready-to-send JSON line:
+    {"type": "change", "seq": 12, "op": "set_data", "path": ["users", "1"], "value": {...}, "ts": ...}
+
+    Entries carry the value of the path *after* the change (None for removals), so
+    applying an entry twice gives the same result. Followers rely on that when they
+    catch up from a snapshot that may already include some of the changes they replay.
+    """
+    def __init__(self, capacity: int = 10000):
+        """
+        Initializes the feed.
+
+        Args:
+            capacity (int, optional): How many recent changes are retained for catch-up. Defaults to 10000.
+        """
+        self.capacity = capacity
+        self._entries = deque(maxlen=capacity)
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    @property
+    def seq(self) -> int:
+        """The sequence number of the latest change (0 if nothing changed yet)."""
+        return self._seq
+
+    @property
+    def first_seq(self) -> int:
+        """The oldest sequence number still retained, or seq + 1 when the feed is empty."""
+        with self._cond:
+            return self._entries[0][0] if self._entries else self._seq + 1
+
+    def append(self, op: str, parts: Tuple[str, ...], value: Any) -> int:
+        """
+        Records one change.
+
+        Args:
+            op (str): The action name ("set_data", "remove_subcollection", ...).
+            parts (Tuple[str, ...]): The changed path, split into segments.
+            value (Any): The value of the path after the change.
+
+        Returns:
+            int: The sequence number assigned to the change.
+        """
+        with self._cond:
+            self._seq += 1
+            line = json.dumps({"type": "change", "seq": self._seq, "op": op, "path": list(parts),
+                               "value": None if op in REMOVE_ACTIONS else value, "ts": time.time()})
+            self._entries.append((self._seq, line))
+            self._cond.notify_all()
+            return self._seq
+
+    def read_after(self, seq: int, timeout: Optional[float] = None) -> Tuple[List[str], bool]:
+        """
+        Returns the encoded changes that follow a sequence number, waiting for new ones if needed.
+
+        Args:
+            seq (int): The last sequence number the reader has applied.
+            timeout (Optional[float], optional): How long to wait when nothing is new. Defaults to None.
+
+        Returns:
+            Tuple[List[str], bool]: The JSON lines, and True if changes after seq were
+                already dropped from the buffer (the reader needs a snapshot).
+        """
+        with self._cond:
+            if self._seq <= seq:
+                self._cond.wait_for(lambda: self._seq > seq, timeout)
+            if not self._entries:
+                return [], self._seq > seq
+            first = self._entries[0][0]
+            if first > seq + 1:
+                return [], True
+            return [line for _, line in islice(self._entries, seq + 1 - first, None)], False
+
+    def changes(self, since: int = 0) -> List[Dict[str, Any]]:
+        """
+        Returns the retained changes after a sequence number, decoded.
+
+        Args:
+            since (int, optional): Only changes with a greater sequence number are returned. Defaults to 0.
+
+        Returns:
+            List[Dict[str, Any]]: The changes, oldest first.
+        """
+        with self._cond:
+            first = self._entries[0][0] if self._entries else self._seq + 1
+            lines = [line for _, line in islice(self._entries, max(since + 1 - first, 0), None)]
+        return [json.loads(line) for line in lines]
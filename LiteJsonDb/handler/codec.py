@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .fragments import INDENT, encode_fragment
+
+# One slice of the database: (top level key, None for its whole value or the item keys of a slice of it).
+Entry = Tuple[str, Optional[List[str]]]
+
+# Below this many items per task, a worker costs more than it saves.
+MIN_CHUNK = 1000
+
+def can_fork() -> bool:
+    import multiprocessing
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+def fork_is_safe() -> bool:
+    """
+    Whether the workers can be forked now: not while another thread runs (the log listener, the
+    observer dispatcher, a server), whose locks would stay held in the workers.
+    """
+    return can_fork() and threading.active_count() == 1
+
+def plan_tasks(db: Dict[str, Any], chunk: int) -> List[List[Entry]]:
+    """
+    Splits the database into tasks of about `chunk` items, in database order.
+
+    Large collections are cut into slices of items; small top level keys are grouped.
+    """
+    tasks: List[List[Entry]] = []
+    current: List[Entry] = []
+    size = 0
+    for key, value in db.items():
+        if isinstance(value, dict) and len(value) > chunk:
+            if current:
+                tasks.append(current)
+                current, size = [], 0
+            item_keys = list(value)
+            for start in range(0, len(item_keys), chunk):
+                tasks.append([(key, item_keys[start:start + chunk])])
+            continue
+        current.append((key, None))
+        size += len(value) if isinstance(value, (dict, list)) else 1
+        if size >= chunk:
+            tasks.append(current)
+            current, size = [], 0
+    if current:
+        tasks.append(current)
+    return tasks
+
+def encode_items(items: Dict[str, Any], item_keys: List[str]) -> str:
+    """
+    Encodes items of a collection exactly as json.dumps(db, indent=4) lays them out (two levels deep).
+    """
+    indent = INDENT * 2
+    newline = '\n' + indent
+    return ',\n'.join(indent + json.dumps(item_key) + ': ' + json.dumps(items[item_key], indent=4).replace('\n', newline)
+                      for item_key in item_keys)
+
+# The database being encoded or decoded, inherited by the forked workers; see _run_pool.
+_shared: Optional[Tuple[Any, Any]] = None
+_shared_lock = threading.Lock()
+
+def _encode_task(index: int) -> List[str]:
+    db, tasks = _shared
+    return [encode_fragment(key, db.db[key]) if item_keys is None else encode_items(db.db[key], item_keys)
+            for key, item_keys in tasks[index]]
+
+def _encrypt_task(index: int) -> str:
+    db, tasks = _shared
+    part: Dict[str, Any] = {}
+    for key, item_keys in tasks[index]:
+        if item_keys is None:
+            part[key] = db.db[key]
+        else:
+            items = db.db[key]
+            part[key] = {item_key: items[item_key] for item_key in item_keys}
+    # The class method: metrics wrap the instance one, and its lock may be held by a thread that wasn't forked.
+    return type(db)._encrypt(db, part)
+
+def _decrypt_task(index: int) -> str:
+    db, tokens = _shared
+    return type(db)._decrypt_text(db, tokens[index])
+
+class ParallelCodec:
+    """
+    Encodes, encrypts and decrypts large databases on several cores.
+
+    The database is split into tasks (whole top level keys, or slices of large collections)
+    handled by forked worker processes, which read the database from memory without copying
+    it and send back text only. The parent stitches the results in database order, so a
+    plain save is byte-for-byte what a single json.dumps writes.
+
+    Forking while other threads run could deadlock the workers (and Python 3.12+ warns about it),
+    so the work is done in this process whenever another thread is alive: with enable_log,
+    asynchronous observers, metrics or a server running, saves and loads use one process.
+
+    Encrypted databases are written as a JSON list of tokens, one per task, so they can be
+    encrypted and decrypted in parallel. Single-token files (and plain files, which are
+    encrypted on their next save) are still read.
+    """
+    def __init__(self, serialize_workers: Optional[int] = 1):
+        """
+        Initializes parallel serialization.
+
+        Args:
+            serialize_workers (Optional[int], optional): Worker processes used on save and load; None uses
+                every core. Defaults to 1 (no workers).
+        """
+        if serialize_workers is not None and serialize_workers < 1:
+            raise ValueError(f"\033[91m#bugs\033[0m serialize_workers must be at least 1, got {serialize_workers}.")
+        self.serialize_workers = serialize_workers if serialize_workers is not None else os.cpu_count() or 1
+
+    def _use_workers(self) -> bool:
+        return self.serialize_workers > 1 and fork_is_safe()
+
+    def _run_pool(self, shared: Any, function, count: int) -> List[Any]:
+        """
+        Runs function(0 .. count-1) on forked workers, or in this process when there's a single task.
+        """
+        global _shared
+        with _shared_lock:
+            _shared = (self, shared)
+            try:
+                if count < 2 or not self._use_workers():
+                    return [function(index) for index in range(count)]
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                context = multiprocessing.get_context('fork')
+                with ProcessPoolExecutor(min(self.serialize_workers, count), mp_context=context) as pool:
+                    return list(pool.map(function, range(count)))
+            finally:
+                _shared = None
+
+    def _tasks(self) -> List[List[Entry]]:
+        total = sum(len(value) if isinstance(value, (dict, list)) else 1 for value in self.db.values())
+        return plan_tasks(self.db, max(MIN_CHUNK, total // (self.serialize_workers * 4)))
+
+    def _encode_parallel(self) -> str:
+        """
+        Encodes self.db like json.dumps(self.db, indent=4), on the worker pool.
+        """
+        if not self.db:
+            return '{}'
+        tasks = self._tasks()
+        results = self._run_pool(tasks, _encode_task, len(tasks))
+        fragments: List[str] = []
+        slices: List[str] = []
+        sliced = 0
+        for task, encoded in zip(tasks, results):
+            for (key, item_keys), text in zip(task, encoded):
+                if item_keys is None:
+                    fragments.append(text)
+                    continue
+                slices.append(text)
+                sliced += len(item_keys)
+                if sliced == len(self.db[key]):
+                    fragments.append(INDENT + json.dumps(key) + ': {\n' + ',\n'.join(slices) + '\n' + INDENT + '}')
+                    slices, sliced = [], 0
+        return '{\n' + ',\n'.join(fragments) + '\n}'
+
+    def _encrypt_chunks(self) -> List[str]:
+        """
+        Encrypts self.db as a list of tokens, one per task, on the worker pool.
+        """
+        tasks = self._tasks()
+        return self._run_pool(tasks, _encrypt_task, len(tasks))
+
+    def _decrypt_chunks(self, tokens: List[str]) -> Dict[str, Any]:
+        """
+        Decrypts a list of tokens written by _encrypt_chunks; the workers decrypt, this process parses.
+        """
+        db: Dict[str, Any] = {}
+        for text in self._run_pool(tokens, _decrypt_task, len(tokens)):
+            for key, value in json.loads(text).items():
+                if key in db and isinstance(db[key], dict) and isinstance(value, dict):
+                    db[key].update(value)  # Another slice of a large collection.
+                else:
+                    db[key] = value
+        return db
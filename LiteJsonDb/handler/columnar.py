@@ -0,0 +1,335 @@
+import math
+import operator
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .keypath import MISSING, compile_key, resolve
+
+NAN = float('nan')
+
+COMPARATORS = {
+    '==': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+}
+
+COLUMN_FUNCTIONS = ('count', 'sum', 'avg', 'min', 'max')
+
+Condition = Union[float, Tuple[Any, Any]]
+
+_numpy = None
+
+def load_numpy():
+    """
+    Imports NumPy on first use. Returns the module, or False when it isn't installed.
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy
+
+def _cell(value: Any) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return NAN
+
+def _normalize(condition: Condition) -> List[Tuple[str, float]]:
+    """
+    Turns a condition into (operator, bound) pairs: 5 -> ==, (1, 10) -> inclusive range
+    (None for an open end), ("<", 5) -> one comparison.
+    """
+    if isinstance(condition, (tuple, list)):
+        first, second = condition
+        if isinstance(first, str):
+            if first not in COMPARATORS:
+                raise ValueError(f"\033[91m#bugs\033[0m Unknown operator '{first}'. Use one of {list(COMPARATORS)}.")
+            return [(first, second)]
+        bounds = []
+        if first is not None:
+            bounds.append(('>=', first))
+        if second is not None:
+            bounds.append(('<=', second))
+        return bounds
+    return [('==', condition)]
+
+class ColumnStore:
+    """
+    A columnar copy of some numeric fields of a collection's items.
+
+    Each field is an array.array of doubles (8 bytes per value, NaN when the item has no
+    numeric value) and row i of every column belongs to item ids[i]. Removing an item
+    moves the last row into its place, so every write is O(1).
+    """
+    def __init__(self, collection: str, fields: Iterable[str], use_numpy: Optional[bool] = None):
+        """
+        Args:
+            collection (str): The collection name.
+            fields (Iterable[str]): The projected fields (paths separated by "/").
+            use_numpy (Optional[bool], optional): Vectorizes queries with NumPy. Defaults to None
+                (when installed).
+        """
+        self.collection = collection
+        self.fields: Dict[str, Tuple[str, ...]] = {field: compile_key(field) for field in fields}
+        self.use_numpy = use_numpy
+        self.columns: Dict[str, array] = {}
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.built = False
+
+    @property
+    def numpy(self):
+        if self.use_numpy is False:
+            return False
+        np = load_numpy()
+        if self.use_numpy and not np:
+            raise ImportError("\033[91m#bugs\033[0m NumPy is not installed. Install it or use use_numpy=None.")
+        return np
+
+    def build(self, items: Any) -> None:
+        """
+        Projects every item of the collection with one pass.
+        """
+        self.columns = {field: array('d') for field in self.fields}
+        self.ids = []
+        self.rows = {}
+        if isinstance(items, dict):
+            for item_id, item in items.items():
+                self.upsert(item_id, item)
+        self.built = True
+
+    def invalidate(self) -> None:
+        """
+        Frees the columns; they are rebuilt on the next query.
+        """
+        self.built = False
+        self.columns = {}
+        self.ids = []
+        self.rows = {}
+
+    def upsert(self, item_id: str, item: Any) -> None:
+        is_dict = isinstance(item, dict)
+        row = self.rows.get(item_id)
+        for field, parts in self.fields.items():
+            value = _cell(resolve(item, parts)) if is_dict else NAN
+            if row is None:
+                self.columns[field].append(value)
+            else:
+                self.columns[field][row] = value
+        if row is None:
+            self.rows[item_id] = len(self.ids)
+            self.ids.append(item_id)
+
+    def delete(self, item_id: str) -> None:
+        row = self.rows.pop(item_id, None)
+        if row is None:
+            return
+        last = len(self.ids) - 1
+        if row != last:
+            moved = self.ids[last]
+            self.ids[row] = moved
+            self.rows[moved] = row
+            for column in self.columns.values():
+                column[row] = column[last]
+        self.ids.pop()
+        for column in self.columns.values():
+            column.pop()
+
+    def update(self, item_id: str, item: Any) -> None:
+        """
+        Applies the new value of one item (MISSING if it was removed).
+        """
+        if item is MISSING:
+            self.delete(item_id)
+        else:
+            self.upsert(item_id, item)
+
+    def _column(self, field: str) -> array:
+        column = self.columns.get(field)
+        if column is None:
+            raise KeyError(f"\033[91m#bugs\033[0m Field '{field}' has no column in '{self.collection}'. Add it with add_columns().")
+        return column
+
+    # --------------------------------------------------
+    #                 QUERIES
+    # --------------------------------------------------
+
+    def _mask(self, np, where: Dict[str, Condition]):
+        mask = np.ones(len(self.ids), dtype=bool)
+        for field, condition in where.items():
+            # A zero-copy view of the array's buffer; it must not outlive the query.
+            values = np.frombuffer(self._column(field), dtype=np.float64)
+            for op, bound in _normalize(condition):
+                mask &= COMPARATORS[op](values, bound)
+        return mask
+
+    def _matching_rows(self, where: Dict[str, Condition]) -> Sequence[int]:
+        checks = [(self._column(field), COMPARATORS[op], bound)
+                  for field, condition in where.items() for op, bound in _normalize(condition)]
+        # NaN compares False with everything, so missing values never match.
+        return [row for row in range(len(self.ids)) if all(cmp(column[row], bound) for column, cmp, bound in checks)]
+
+    def select(self, where: Dict[str, Condition]) -> List[str]:
+        """
+        Returns the ids of the items matching every condition.
+        """
+        if not self.ids:
+            return []
+        ids = self.ids
+        np = self.numpy
+        if np:
+            return [ids[row] for row in np.flatnonzero(self._mask(np, where)).tolist()]
+        return [ids[row] for row in self._matching_rows(where)]
+
+    def aggregate(self, field: str, function: str, where: Optional[Dict[str, Condition]] = None) -> Optional[float]:
+        """
+        Computes count/sum/avg/min/max of a column, over the rows matching `where`. Missing values are skipped.
+        """
+        if function not in COLUMN_FUNCTIONS:
+            raise ValueError(f"\033[91m#bugs\033[0m Unknown column function '{function}'. Use one of {list(COLUMN_FUNCTIONS)}.")
+        column = self._column(field)
+        empty = 0 if function in ('count', 'sum') else None
+        if not self.ids:
+            return empty
+        np = self.numpy
+        if np:
+            values = np.frombuffer(column, dtype=np.float64)
+            if where:
+                values = values[self._mask(np, where)]
+            values = values[~np.isnan(values)]
+            if not values.size:
+                return empty
+            if function == 'count':
+                return int(values.size)
+            reduce = {'sum': np.sum, 'avg': np.mean, 'min': np.min, 'max': np.max}[function]
+            return float(reduce(values))
+        rows = self._matching_rows(where) if where else range(len(self.ids))
+        values = [v for v in (column[row] for row in rows) if not math.isnan(v)]
+        if not values:
+            return empty
+        if function == 'count':
+            return len(values)
+        if function == 'sum':
+            return math.fsum(values)
+        if function == 'avg':
+            return math.fsum(values) / len(values)
+        return min(values) if function == 'min' else max(values)
+
+class Columnar:
+    """
+    Opt-in columnar projections of numeric subcollection fields, for filters, range scans
+    and aggregates that don't walk the item dictionaries.
+
+    Projections are kept in sync by the change notifications, and queries are vectorized
+    with NumPy when it is installed (pure Python otherwise).
+    """
+    def __init__(self):
+        """
+        Initializes the column stores.
+        """
+        self._columns: Dict[str, ColumnStore] = {}
+
+    def add_columns(self, collection: str, fields: Iterable[str], use_numpy: Optional[bool] = None) -> None:
+        """
+        Projects numeric fields of a collection's items into columns.
+
+        Values are stored as 64-bit floats; non-numeric or missing values are stored as
+        NaN and never match a condition.
+
+        Args:
+            collection (str): The collection name.
+            fields (Iterable[str]): The fields to project (paths separated by "/", e.g. "stats/score").
+            use_numpy (Optional[bool], optional): True requires NumPy, False never uses it. Defaults to None
+                (used when installed).
+        """
+        self._expire_due()
+        if isinstance(fields, str):
+            fields = [fields]
+        current = self._columns.get(collection)
+        if current is not None:
+            fields = list(current.fields) + [field for field in fields if field not in current.fields]
+            if use_numpy is None:
+                use_numpy = current.use_numpy
+        store = ColumnStore(collection, fields, use_numpy)
+        store.build(self.db.get(collection))
+        self._columns[collection] = store
+
+    def drop_columns(self, collection: str) -> None:
+        """
+        Removes the columnar projection of a collection.
+
+        Args:
+            collection (str): The collection name.
+        """
+        self._columns.pop(collection, None)
+
+    def _column_store(self, collection: str, fields: Iterable[str]) -> Optional[ColumnStore]:
+        self._expire_due()
+        store = self._columns.get(collection)
+        if store is None:
+            self.logger.error("\033[91m#bugs\033[0m Collection '%s' has no columns. Use db.add_columns('%s', ['field']) first.", collection, collection)
+            return None
+        missing = [field for field in fields if field not in store.fields]
+        if missing:
+            self.logger.error("\033[91m#bugs\033[0m Fields %s have no column in '%s'. Use db.add_columns('%s', %s) first.", missing, collection, collection, missing)
+            return None
+        if not store.built:
+            store.build(self.db.get(collection))
+        return store
+
+    def column_select(self, collection: str, where: Dict[str, Condition]) -> List[str]:
+        """
+        Returns the ids of the items whose projected fields match every condition.
+
+        Example:
+            db.column_select("users", {"age": (18, 30), "score": (">", 500)})
+
+        Args:
+            collection (str): The collection name.
+            where (Dict[str, Condition]): Field -> condition. A number means equality, (low, high) an
+                inclusive range (None for an open end) and (operator, value) a comparison with one of
+                ==, !=, <, <=, >, >=.
+
+        Returns:
+            List[str]: The matching item ids, in no particular order: removing an item moves the last row
+            into its place. Sort them if the order matters.
+        """
+        store = self._column_store(collection, where)
+        return store.select(where) if store is not None else []
+
+    def column_aggregate(self, collection: str, field: str, function: str = 'sum',
+                         where: Optional[Dict[str, Condition]] = None) -> Optional[float]:
+        """
+        Computes an aggregate of a projected field.
+
+        Args:
+            collection (str): The collection name.
+            field (str): The projected field.
+            function (str, optional): count, sum, avg, min or max. Defaults to 'sum'.
+            where (Optional[Dict[str, Condition]], optional): Only rows matching these conditions (see
+                column_select). Defaults to None (all rows).
+
+        Returns:
+            Optional[float]: The result (0 for count/sum and None for avg/min/max when no value matches).
+        """
+        store = self._column_store(collection, [field] + list(where or ()))
+        return store.aggregate(field, function, where) if store is not None else None
+
+    def _update_columns(self, parts: Tuple[str, ...]) -> None:
+        """
+        Applies a change to the column stores. Called by _notify_change.
+        """
+        if not parts:
+            for store in self._columns.values():
+                store.invalidate()
+            return
+        store = self._columns.get(parts[0])
+        if store is None or not store.built:
+            return
+        items = self.db.get(parts[0])
+        if len(parts) == 1 or not isinstance(items, dict):
+            store.invalidate()
+        else:
+            store.update(parts[1], items.get(parts[1], MISSING))
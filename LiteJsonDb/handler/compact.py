@@ -0,0 +1,165 @@
+import sys
+from typing import Any, Dict, Set, Tuple
+
+from .locking import synchronized
+from .metrics import deep_sizeof
+
+# CPython only shares the keys of instance dictionaries up to this many keys.
+MAX_SHARED_KEYS = 30
+# Longer strings rarely repeat, so they are not worth a lookup in the intern pool.
+MAX_INTERNED_LENGTH = 64
+
+_SMALL_INTS = range(-5, 257)
+
+class Shapes:
+    """
+    Rebuilds same-shaped dictionaries as key-sharing dictionaries.
+
+    CPython stores the __dict__ of instances of one class as "split" dictionaries: the
+    keys and their hashes live once in a table shared by the class, and each dictionary
+    only holds an array of values. Every shape (tuple of keys, in order) seen more than
+    once gets a class, and a record is rebuilt as the __dict__ of a throwaway instance. The result is a
+    plain dict in every respect (type, JSON encoding, equality); adding a key to it later
+    simply turns it back into a regular dictionary.
+
+    Repeated keys and short string values are interned through a pool, so equal strings
+    are stored once.
+    """
+    def __init__(self):
+        self.classes: Dict[Tuple[str, ...], type] = {}
+        self.seen: Set[Tuple[str, ...]] = set()
+        self.pool: Dict[str, str] = {}
+
+    def compact(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compacts everything below the root dictionary, in place, and returns it.
+        """
+        for key, value in data.items():
+            data[key] = self._rebuild(value)
+        self.pool = {}
+        self.seen = set()
+        return data
+
+    def _intern(self, value: str) -> str:
+        return self.pool.setdefault(value, value) if len(value) <= MAX_INTERNED_LENGTH else value
+
+    def _rebuild(self, value: Any) -> Any:
+        kind = type(value)
+        if kind is str:
+            return self._intern(value)
+        if kind is list:
+            for i, item in enumerate(value):
+                value[i] = self._rebuild(item)
+            return value
+        if kind is not dict:
+            return value
+        rebuilt = {}
+        if 0 < len(value) <= MAX_SHARED_KEYS:
+            shape = tuple(value)
+            cls = self.classes.get(shape)
+            if cls is not None:
+                rebuilt = cls().__dict__
+            elif shape in self.seen:
+                # Only shapes seen twice get a class: unique shapes (e.g. maps of ids) aren't worth one.
+                cls = self.classes[shape] = type('Record', (), {})
+                rebuilt = cls().__dict__
+            else:
+                self.seen.add(shape)
+        intern = self._intern
+        rebuild = self._rebuild
+        for key, item in value.items():
+            rebuilt[intern(key)] = rebuild(item)
+        return rebuilt
+
+def loaded_size(value: Any) -> int:
+    """
+    Estimates the memory the value would use as freshly parsed JSON: one regular dictionary
+    per object and one string/number object per value (only small integers, booleans and
+    None are shared).
+    """
+    getsizeof = sys.getsizeof
+    size = 0
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        kind = type(node)
+        if kind is dict:
+            size += _dict_size(len(node))
+            stack.extend(node.values())
+        elif kind is list:
+            size += getsizeof(node)
+            stack.extend(node)
+        elif kind is int and node in _SMALL_INTS:
+            continue
+        elif node is not None and kind is not bool:
+            size += getsizeof(node)
+    return size
+
+_DICT_SIZES: Dict[int, int] = {}
+
+def _dict_size(length: int) -> int:
+    size = _DICT_SIZES.get(length)
+    if size is None:
+        sample = {}
+        for i in range(length):
+            sample[str(i)] = None
+        size = _DICT_SIZES[length] = sys.getsizeof(sample)
+    return size
+
+class Compaction:
+    """
+    Memory-optimized mode: same-shaped records share their keys and repeated strings are interned.
+    """
+    def __init__(self, compact: bool = False):
+        """
+        Initializes compaction.
+
+        Args:
+            compact (bool, optional): Compacts the database when it is loaded. Defaults to False.
+        """
+        self.compact = compact
+        self._shapes = Shapes()
+
+    def _compact_db(self) -> None:
+        self._shapes.compact(self.db)
+
+    @synchronized
+    def compact_memory(self) -> None:
+        """
+        Compacts the in-memory database now, e.g. after a bulk import.
+
+        Records are replaced by compact copies: references to them obtained before the
+        call no longer point into the database.
+        """
+        if self.mmap:
+            # A read only database that was loaded can still be compacted; a mapped one holds no records.
+            return self._refuse_write("compact_memory")
+        self._expire_due()
+        self._compact_db()
+
+    def memory_report(self) -> Dict[str, Any]:
+        """
+        Reports the memory used by each top level key.
+
+        "bytes" is the current approximate size and "loaded_bytes" an estimate of the same
+        data as plain parsed JSON, i.e. without compaction.
+
+        Returns:
+            Dict[str, Any]: {"collections": {name: {"items", "bytes", "loaded_bytes"}}, "total_bytes",
+                "loaded_total_bytes", "compact", "shapes"}.
+        """
+        self._expire_due()
+        collections = {}
+        for name, value in self.db.items():
+            collections[name] = {
+                "items": len(value) if isinstance(value, (dict, list)) else 1,
+                "bytes": deep_sizeof(value),
+                "loaded_bytes": loaded_size(value),
+            }
+        return {
+            "collections": collections,
+            "total_bytes": sum(c["bytes"] for c in collections.values()),
+            "loaded_total_bytes": sum(c["loaded_bytes"] for c in collections.values()),
+            "compact": self.compact,
+            "shapes": len(self._shapes.classes),
+        }
@@ -0,0 +1,149 @@
+import atexit
+import functools
+import time
+import weakref
+from typing import Any, Dict, Optional, Union
+
+from .keypath import compile_key, resolve_parent
+
+Number = Union[int, float]
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _flush_at_exit(ref: "weakref.ReferenceType") -> None:
+    db = ref()
+    if db is not None:
+        db.flush_counters()
+
+class Counters:
+    """
+    Write-combining counters: increments are applied in memory at once and persisted in batches.
+
+    edit_data(key, {"increment": ...}) saves the whole database for every call. incr()
+    applies the delta under a lock (so concurrent increments are never lost, and reads
+    see the new value right away) and only marks the database dirty: all the increments made
+    within `counter_flush_interval` seconds are written by a single save.
+
+    The save runs on the caller's thread, at the start of the first operation after the
+    interval (like the saves of expirations), never on a background thread. What is still
+    pending is saved by close(), or when the interpreter exits if close() was never called.
+    """
+    def __init__(self, counter_flush_interval: float = 1.0):
+        """
+        Initializes the counters.
+
+        Args:
+            counter_flush_interval (float, optional): Seconds after which pending increments are saved by the
+                next operation. 0 saves on every increment. Defaults to 1.0.
+        """
+        self.counter_flush_interval = counter_flush_interval
+        self._counters_dirty = False
+        self._counter_flush_at: Optional[float] = None
+        # Saves the increments still pending when the process exits; a weak reference, so an unused
+        # database can still be garbage collected. Unregistered by close().
+        self._exit_flush = functools.partial(_flush_at_exit, weakref.ref(self))
+        atexit.register(self._exit_flush)
+
+    def _add(self, key: str, field: str, n: Number) -> Optional[Number]:
+        parts = compile_key(key)
+        parent, leaf = resolve_parent(self.db, parts, create=True)
+        record = parent.get(leaf)
+        if record is None:
+            record = parent[leaf] = {}
+        if not isinstance(record, dict):
+            self.logger.error("\033[91m#bugs\033[0m Key '%s' is not a dictionary, cannot increment '%s'.", key, field)
+            return None
+        current = record.get(field, 0)
+        if not _is_number(current):
+            self.logger.error("\033[91m#bugs\033[0m Field '%s' of '%s' is not a number. Ensure it is a number before incrementing.", field, key)
+            return None
+        record[field] = current + n
+        self._notify_change("edit_data", parts + (field,), record[field])
+        if self._lru:
+            self._track_touch(parts)
+        return record[field]
+
+    def incr(self, key: str, field: str, n: Number = 1) -> Optional[Number]:
+        """
+        Increments a numeric field; missing records and fields start at 0.
+
+        Args:
+            key (str): The record (path separated by "/"), e.g. "pages/home".
+            field (str): The counter field, e.g. "views".
+            n (Number, optional): The delta (negative to decrement). Defaults to 1.
+
+        Returns:
+            Optional[Number]: The new value, or None if the increment was rejected.
+        """
+        if self.read_only:
+            return self._refuse_write("incr")
+        if not _is_number(n):
+            self.logger.error("\033[91m#bugs\033[0m Increment value for '%s' is not a number. Provide a numeric value (e.g., db.incr('pages/home', 'views', 1)).", field)
+            return None
+        self._expire_due()
+        with self._lock:
+            value = self._add(key, field, n)
+            if value is not None:
+                self._counter_written()
+            return value
+
+    def incr_many(self, increments: Dict[str, Dict[str, Number]]) -> Optional[Dict[str, Dict[str, Number]]]:
+        """
+        Applies several increments under the database lock, with one save.
+
+        No other write or save runs in between, so a save holds all of them or none. Reads don't
+        take the lock: a read on another thread may see some of them applied and not the others.
+
+        Args:
+            increments (Dict[str, Dict[str, Number]]): Record key -> {field: delta}, e.g.
+                {"pages/home": {"views": 1}, "stats/daily": {"views": 1, "visitors": 1}}.
+
+        Returns:
+            Optional[Dict[str, Dict[str, Number]]]: The new values, with the same layout (fields that can't
+            be incremented are logged and left out), or None if a delta is not a number (nothing is applied then).
+        """
+        if self.read_only:
+            return self._refuse_write("incr_many")
+        for key, fields in increments.items():
+            for field, n in fields.items():
+                if not _is_number(n):
+                    self.logger.error("\033[91m#bugs\033[0m Increment value for '%s/%s' is not a number. Nothing was incremented.", key, field)
+                    return None
+        self._expire_due()
+        results: Dict[str, Dict[str, Number]] = {}
+        with self._lock:
+            for key, fields in increments.items():
+                results[key] = {}
+                for field, n in fields.items():
+                    value = self._add(key, field, n)
+                    if value is not None:
+                        results[key][field] = value
+            self._counter_written()
+        return results
+
+    def _counter_written(self) -> None:
+        self._counters_dirty = True
+        if self.counter_flush_interval <= 0:
+            self.flush_counters()
+        elif self._counter_flush_at is None:
+            self._counter_flush_at = time.monotonic() + self.counter_flush_interval
+
+    def _flush_counters_due(self) -> None:
+        """
+        Saves the pending increments once counter_flush_interval has passed. Called by _expire_due.
+        """
+        if self._counter_flush_at is not None and time.monotonic() >= self._counter_flush_at:
+            self.flush_counters()
+
+    def flush_counters(self) -> None:
+        """
+        Saves the pending increments now (they are saved automatically by the first operation after
+        counter_flush_interval, and by close()).
+        """
+        with self._lock:
+            if self._counters_dirty:
+                self._backup_db()
+                self._save_db()
+            if not self._counters_dirty:
+                self._counter_flush_at = None
@@ -1,9 +1,13 @@
 import os
 import json
 import shutil
-import logging
+import threading
+import time
 from typing import Any, Dict, Optional
 
+from .locking import synchronized
+from .mapped import file_identity
+
 class DatabaseOperations:
     """
     Handles database operations such as loading, saving, backing up, and restoring.
@@ -11,57 +15,136 @@ class DatabaseOperations:
     This class provides methods to manage the database file, including loading data from the file,
     saving data to the file, creating backups, and restoring from backups.
     """
-    def __init__(self, enable_log: bool = False, auto_backup: bool = False):
+    def __init__(self, enable_log: bool = False, auto_backup: bool = False, fsync: bool = False):
         """
         Initializes the DatabaseOperations class.
 
         Args:
             enable_log (bool, optional): Whether to enable logging. Defaults to False.
             auto_backup (bool, optional): Whether to enable automatic backups. Defaults to False.
+            fsync (bool, optional): Whether to fsync the database file after each save. Defaults to False.
         """
         self.enable_log = enable_log
         self.auto_backup = auto_backup
+        self.fsync = fsync
+        # Taken by every method that modifies self.db and by every save (see locking.synchronized).
+        self._lock = threading.RLock()
 
     def _load_db(self) -> None:
         """
         Loads the database from the JSON file, or creates a new one if it doesn't exist.
         """
         if not os.path.exists(self.filename):
+            if self.read_only:
+                self.logger.error("\033[91m#bugs\033[0m Database file not found: %s", self.filename)
+                raise FileNotFoundError(self.filename)
             try:
                 with open(self.filename, 'w') as file:
                     json.dump({}, file)
                 if self.enable_log:
-                    logging.info(f"Database file created: {self.filename}")
+                    self.logger.info("Database file created: %s", self.filename)
             except OSError as e:
-                self.logger.error(f"\033[91m#bugs\033[0m Unable to create database file: {e}")
+                self.logger.error("\033[91m#bugs\033[0m Unable to create database file: %s", e)
                 raise
+        if self.mmap and self._open_mapped():
+            if self.enable_log:
+                self.logger.info("Database mapped from: %s", self.filename)
+            return
         try:
             with open(self.filename, 'r') as file:
+                if self.mmap:
+                    self._file_identity = file_identity(os.fstat(file.fileno()))
                 data = json.load(file)
-                if self.crypted and data:
+                if self.crypted and isinstance(data, list):
+                    self.db = self._decrypt_chunks(data)
+                elif self.crypted and isinstance(data, str):
                     self.db = self._decrypt(data)
                 else:
+                    # Also a database saved before encryption was enabled: it is encrypted on the next save.
                     self.db = data
+            if self.compact:
+                self._compact_db()
             if self.enable_log:
-                logging.info(f"Database loaded from: {self.filename}")
+                self.logger.info("Database loaded from: %s", self.filename)
         except (OSError, json.JSONDecodeError) as e:
-            self.logger.error(f"\033[91m#bugs\033[0m Unable to load database file: {e}")
+            self.logger.error("\033[91m#bugs\033[0m Unable to load database file: %s", e)
             raise
+        self._load_expirations()
 
+    @synchronized
     def _save_db(self) -> None:
         """
         Saves the database to the JSON file.
         """
+        if self.read_only:
+            self.logger.error("\033[91m#bugs\033[0m The database is opened read only, it can't be saved.")
+            return
         try:
-            data = self.db if not self.crypted else self._encrypt(self.db)
-            with open(self.filename, 'w') as file:
-                json.dump(data, file, indent=4)
+            if not self.crypted:
+                data = self.db
+            elif self._use_workers():
+                data = self._encrypt_chunks()
+            else:
+                data = self._encrypt(self.db)
+            written = self._write_db_file(self._serialize_db(data))
+            # Only once written: increments and expirations of a failed save stay pending.
+            self._counters_dirty = False
+            self._counter_flush_at = None
+            self._expiry_dirty = False
+            self._last_expiry_flush = time.time()
+            if self._metrics is not None:
+                self._metrics.record_save(written)
+            self._save_expirations()
             if self.enable_log:
-                logging.info(f"Database saved to {self.filename}")
+                self.logger.info("Database saved to %s", self.filename)
         except OSError as e:
-            self.logger.error(f"\033[91m#bugs\033[0m Could not save database: {e}")
+            self.logger.error("\033[91m#bugs\033[0m Could not save database: %s", e)
             raise
     
+    def _serialize_db(self, data: Any) -> str:
+        """
+        Encodes the (possibly encrypted) database for the file.
+
+        Args:
+            data (Any): The database, or its encrypted form.
+
+        Returns:
+            str: The file contents.
+        """
+        if data is self.db:
+            if self.offset_index:
+                return self._serialize_indexed()
+            if self._fragments is not None:
+                return self._serialize_fragments()
+            if self._use_workers():
+                return self._encode_parallel()
+        return json.dumps(data, indent=4)
+
+    def _write_db_file(self, payload: str) -> int:
+        """
+        Writes the encoded database to the file, and fsyncs it if enabled.
+
+        Args:
+            payload (str): The file contents.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        if self.offset_index:
+            return self._write_indexed(payload)
+        with open(self.filename, 'w') as file:
+            file.write(payload)
+            if self.fsync:
+                file.flush()
+                self._fsync(file.fileno())
+        return len(payload)
+
+    def _fsync(self, fd: int) -> None:
+        """
+        Flushes a file descriptor to disk.
+        """
+        os.fsync(fd)
+
     def _backup_db(self) -> None:
         """
         Creates a backup of the database.
@@ -70,25 +153,34 @@ class DatabaseOperations:
             try:
                 shutil.copy(self.filename, self.backup_filename)
                 if self.enable_log:
-                    logging.info(f"Backup created: {self.backup_filename}")
+                    self.logger.info("Backup created: %s", self.backup_filename)
             except OSError as e:
-                self.logger.error(f"\033[91m#bugs\033[0m Unable to create backup: {e}")
+                self.logger.error("\033[91m#bugs\033[0m Unable to create backup: %s", e)
                 raise
 
+    @synchronized
     def _restore_db(self) -> None:
         """
         Restores the database from backup.
         """
         if os.path.exists(self.backup_filename):
             try:
-                shutil.copy(self.backup_filename, self.filename)
-                self._load_db()
+                if self.offset_index:
+                    # Readers may have the file mapped: replace it rather than overwrite it, then index it.
+                    shutil.copy(self.backup_filename, self.filename + '.tmp')
+                    os.replace(self.filename + '.tmp', self.filename)
+                    self._load_db()
+                    self._save_db()
+                else:
+                    shutil.copy(self.backup_filename, self.filename)
+                    self._load_db()
+                self._notify_change("restore_db", (), self.db)
                 if self.enable_log:
-                    logging.info(f"Database restored from backup: {self.backup_filename}")
+                    self.logger.info("Database restored from backup: %s", self.backup_filename)
             except OSError as e:
-                self.logger.error(f"\033[91m#bugs\033[0m Unable to restore database: {e}")
+                self.logger.error("\033[91m#bugs\033[0m Unable to restore database: %s", e)
                 raise
         else:
             self.logger.error("\033[91m#bugs\033[0m No backup file found.")
             if self.enable_log:
-                logging.error("No backup file found to restore.")
\ No newline at end of file
+                self.logger.error("No backup file found to restore.")
\ No newline at end of file
@@ -2,9 +2,6 @@ import base64
 import json
 import logging
 from typing import Any, Dict, Optional
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
 class Encryption:
     """
@@ -34,6 +31,11 @@ class Encryption:
             if not self.encryption_key:
                 raise ValueError("\033[91m#bugs\033[0m Encryption key required for 'fernet'.")
 
+            # cryptography is only loaded by databases that use Fernet.
+            from cryptography.fernet import Fernet
+            from cryptography.hazmat.primitives import hashes
+            from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
             salt = b"ThisIsASalt"
             kdf = PBKDF2HMAC(
                 algorithm=hashes.SHA256(),
@@ -84,6 +86,29 @@ class Encryption:
         else:
             raise ValueError("\033[91m#bugs\033[0m Unsupported encryption method.")
 
+    def _decrypt_text(self, encoded_data: str) -> str:
+        """
+        Decrypts the given encoded data to its JSON text, without parsing it.
+
+        Args:
+            encoded_data (str): The data to decrypt.
+
+        Returns:
+            str: The JSON text.
+
+        Raises:
+            ValueError: If an unsupported encryption method is specified, or if Fernet decryption fails.
+        """
+        if self.encryption_method == 'base64':
+            return base64.b64decode(encoded_data.encode('utf-8')).decode('utf-8')
+        elif self.encryption_method == 'fernet':
+            try:
+                return self.fernet.decrypt(encoded_data.encode('utf-8')).decode('utf-8')
+            except Exception:
+                raise ValueError("\033[91m#bugs\033[0m Decryption failed: invalid key or data.")
+        else:
+            raise ValueError("\033[91m#bugs\033[0m Unsupported encryption method.")
+
     def _base64_encrypt(self, data: Dict[str, Any]) -> str:
         """
         Encrypts the given data using base64 encoding.
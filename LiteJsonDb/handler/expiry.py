@@ -0,0 +1,306 @@
+import heapq
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .keypath import MISSING, compile_key, resolve, resolve_parent
+from .locking import synchronized
+
+class Expiry:
+    """
+    Per-key time-to-live and a memory-bounded cache mode with LRU eviction.
+
+    Expiration times live in a min-heap, so finding what is due costs O(1) and each
+    expiration costs O(log n). Heap entries are never updated in place: when a TTL
+    changes or a key is removed, the heap entry goes stale and is skipped when popped.
+
+    In cache mode (max_items and/or max_bytes), every key written by set_data or
+    set_subcollection is an entry in an LRU list; reads and edits move it to the
+    most-recently-used end, and the least recently used entries are evicted when a
+    limit is exceeded.
+
+    Expirations found during reads are not saved one by one: they are persisted with
+    the next write, or at most every `expiry_flush_interval` seconds, or on close().
+    TTLs are kept in a sidecar file next to the database ("<filename>.ttl").
+    """
+    def __init__(self, max_items: Optional[int] = None, max_bytes: Optional[int] = None,
+                 expiry_flush_interval: float = 1.0):
+        """
+        Initializes expiry tracking.
+
+        Args:
+            max_items (Optional[int], optional): Maximum number of entries in cache mode. Defaults to None.
+            max_bytes (Optional[int], optional): Maximum total JSON size of the entries in cache mode. Defaults to None.
+            expiry_flush_interval (float, optional): Minimum seconds between saves caused only by
+                expirations. Defaults to 1.0.
+        """
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.expiry_flush_interval = expiry_flush_interval
+        self._expiry_heap = []
+        self._expires: Dict[Tuple[str, ...], float] = {}
+        self._lru: "OrderedDict[Tuple[str, ...], int]" = OrderedDict()
+        self._lru_bytes = 0
+        self._tracked_prefixes: Dict[Tuple[str, ...], int] = {}
+        self._expiry_dirty = False
+        self._last_expiry_flush = time.time()
+        self._has_ttl_file = False
+
+    @property
+    def _cache_mode(self) -> bool:
+        return self.max_items is not None or self.max_bytes is not None
+
+    @property
+    def _ttl_filename(self) -> str:
+        return self.filename + '.ttl'
+
+    # --------------------------------------------------
+    #                 BOOKKEEPING
+    # --------------------------------------------------
+
+    def _is_tracked(self, parts: Tuple[str, ...]) -> bool:
+        return parts in self._expires or parts in self._lru
+
+    def _start_tracking(self, parts: Tuple[str, ...]) -> None:
+        for i in range(1, len(parts)):
+            prefix = parts[:i]
+            self._tracked_prefixes[prefix] = self._tracked_prefixes.get(prefix, 0) + 1
+
+    def _stop_tracking(self, parts: Tuple[str, ...]) -> None:
+        for i in range(1, len(parts)):
+            prefix = parts[:i]
+            count = self._tracked_prefixes[prefix] - 1
+            if count:
+                self._tracked_prefixes[prefix] = count
+            else:
+                del self._tracked_prefixes[prefix]
+
+    def _set_expiration(self, parts: Tuple[str, ...], expire_at: Optional[float]) -> None:
+        was_tracked = self._is_tracked(parts)
+        if expire_at is None:
+            self._expires.pop(parts, None)
+        else:
+            self._expires[parts] = expire_at
+            heapq.heappush(self._expiry_heap, (expire_at, parts))
+        if was_tracked and not self._is_tracked(parts):
+            self._stop_tracking(parts)
+        elif not was_tracked and self._is_tracked(parts):
+            self._start_tracking(parts)
+
+    def _entry_size(self, parts: Tuple[str, ...]) -> int:
+        if self.max_bytes is None:
+            return 0
+        value = resolve(self.db, parts)
+        return 0 if value is MISSING else len(json.dumps(value))
+
+    def _drop(self, parts: Tuple[str, ...]) -> None:
+        if not self._is_tracked(parts):
+            return
+        self._expires.pop(parts, None)
+        size = self._lru.pop(parts, None)
+        if size:
+            self._lru_bytes -= size
+        self._stop_tracking(parts)
+
+    def _track_write(self, parts: Tuple[str, ...], ttl: Optional[float]) -> None:
+        """
+        Registers a key just created by set_data or set_subcollection, then enforces cache limits.
+        """
+        if ttl is not None:
+            self._set_expiration(parts, time.time() + ttl)
+        if self._cache_mode:
+            if not self._is_tracked(parts):
+                self._start_tracking(parts)
+            size = self._entry_size(parts)
+            self._lru_bytes += size - self._lru.get(parts, 0)
+            self._lru[parts] = size
+            self._lru.move_to_end(parts)
+            self._evict_overflow(keep=parts)
+
+    def _track_touch(self, parts: Tuple[str, ...], resized: bool = False) -> None:
+        """
+        Marks the entry owning a path as recently used (and re-measures it after an edit).
+        """
+        if not self._lru:
+            return
+        for i in range(len(parts), 0, -1):
+            owner = parts[:i]
+            if owner in self._lru:
+                self._lru.move_to_end(owner)
+                if resized and self.max_bytes is not None:
+                    size = self._entry_size(owner)
+                    self._lru_bytes += size - self._lru[owner]
+                    self._lru[owner] = size
+                    self._evict_overflow(keep=owner)
+                return
+
+    def _track_remove(self, parts: Tuple[str, ...]) -> None:
+        """
+        Forgets a removed path and every tracked key below it.
+        """
+        if not (self._expires or self._lru):
+            return
+        if self._tracked_prefixes.get(parts):
+            depth = len(parts)
+            below = [p for p in list(self._expires) + list(self._lru) if len(p) > depth and p[:depth] == parts]
+            for p in below:
+                self._drop(p)
+        self._drop(parts)
+        self._track_touch(parts[:-1], resized=True)
+
+    def _remove_path(self, parts: Tuple[str, ...], action: str) -> None:
+        resolved = resolve_parent(self.db, parts)
+        if resolved is not None and isinstance(resolved[0], dict) and resolved[1] in resolved[0]:
+            del resolved[0][resolved[1]]
+            self._notify_change(action, parts, None)
+        self._track_remove(parts)
+        self._expiry_dirty = True
+
+    def _evict_overflow(self, keep: Optional[Tuple[str, ...]] = None) -> None:
+        while self._lru and ((self.max_items is not None and len(self._lru) > self.max_items) or
+                             (self.max_bytes is not None and self._lru_bytes > self.max_bytes)):
+            oldest = next(iter(self._lru))
+            if oldest == keep and len(self._lru) == 1:
+                break
+            self._remove_path(oldest, "evict_data")
+
+    # --------------------------------------------------
+    #                 EXPIRATION
+    # --------------------------------------------------
+
+    def _expire_due(self) -> None:
+        """
+        Removes the keys whose TTL has passed, and saves the pending increments that are due.
+        Called at the start of every data operation; in mmap mode, checks for a newer file instead
+        (expired keys are removed by the writer).
+        """
+        if self.mmap:
+            self._check_remap()
+            return
+        if self._counter_flush_at is not None:
+            self._flush_counters_due()
+        heap = self._expiry_heap
+        if not heap or heap[0][0] > time.time():
+            return
+        with self._lock:
+            now = time.time()
+            while heap and heap[0][0] <= now:
+                expire_at, parts = heapq.heappop(heap)
+                if self._expires.get(parts) == expire_at:
+                    self._remove_path(parts, "expire_data")
+            if self._expiry_dirty and not self.read_only and now - self._last_expiry_flush >= self.expiry_flush_interval:
+                self._save_db()
+
+    @synchronized
+    def purge_expired(self) -> None:
+        """
+        Removes every expired key now and persists the result.
+        """
+        if self.read_only:
+            return self._refuse_write("purge_expired")
+        self._expire_due()
+        if self._expiry_dirty:
+            self._save_db()
+
+    @synchronized
+    def set_ttl(self, key: str, ttl: Optional[float]) -> None:
+        """
+        Sets, replaces or clears the time-to-live of an existing key.
+
+        Args:
+            key (str): The key (path separated by "/").
+            ttl (Optional[float]): Seconds from now until the key expires. None makes the key persistent.
+        """
+        if self.read_only:
+            return self._refuse_write("set_ttl")
+        self._expire_due()
+        parts = compile_key(key)
+        if resolve(self.db, parts) is MISSING:
+            self.logger.error("\033[91m#bugs\033[0m Key '%s' doesn't exist, cannot set its TTL. Use 'set_data' with ttl= to create it.", key)
+            return
+        self._set_expiration(parts, None if ttl is None else time.time() + ttl)
+        if self._expiry_dirty:
+            # Keys expired by _expire_due above are only removed in memory: save the database too.
+            self._save_db()
+        else:
+            self._save_expirations()
+
+    def get_ttl(self, key: str) -> Optional[float]:
+        """
+        Returns the remaining time-to-live of a key.
+
+        Args:
+            key (str): The key (path separated by "/").
+
+        Returns:
+            Optional[float]: Seconds until the key expires, or None if it has no TTL or doesn't exist.
+        """
+        self._expire_due()
+        expire_at = self._expires.get(compile_key(key))
+        return None if expire_at is None else max(expire_at - time.time(), 0.0)
+
+    # --------------------------------------------------
+    #                 PERSISTENCE
+    # --------------------------------------------------
+
+    def _save_expirations(self) -> None:
+        """
+        Writes the TTL sidecar file (expiration times and LRU order). Called by _save_db, which
+        clears _expiry_dirty: the removals of expired keys are only persisted with the database.
+        """
+        if not self._expires and not self._lru:
+            if self._has_ttl_file:
+                os.remove(self._ttl_filename)
+                self._has_ttl_file = False
+            return
+        data = {
+            "expires": [[list(parts), expire_at] for parts, expire_at in self._expires.items()],
+            "lru": [list(parts) for parts in self._lru],
+        }
+        try:
+            with open(self._ttl_filename, 'w') as file:
+                json.dump(self._encrypt(data) if self.crypted else data, file)
+            self._has_ttl_file = True
+        except OSError as e:
+            self.logger.error("\033[91m#bugs\033[0m Could not save TTLs: %s", e)
+            raise
+
+    def _load_expirations(self) -> None:
+        """
+        Reads the TTL sidecar file and rebuilds the heap and the LRU list. Called by _load_db.
+        """
+        self._expiry_heap = []
+        self._expires = {}
+        self._lru = OrderedDict()
+        self._lru_bytes = 0
+        self._tracked_prefixes = {}
+        self._has_ttl_file = os.path.exists(self._ttl_filename)
+        data = {}
+        if self._has_ttl_file:
+            try:
+                with open(self._ttl_filename, 'r') as file:
+                    data = json.load(file)
+                if self.crypted and isinstance(data, str):
+                    data = self._decrypt(data)
+            except (OSError, ValueError) as e:
+                self.logger.error("\033[91m#bugs\033[0m Unable to load TTLs, keys won't expire: %s", e)
+                data = {}
+        for parts, expire_at in data.get("expires", []):
+            self._set_expiration(tuple(parts), expire_at)
+        if self._cache_mode:
+            if "lru" in data:
+                entries = [tuple(parts) for parts in data["lru"]]
+            else:
+                # No cache index yet: treat every collection item (or top level key) as an entry.
+                entries = []
+                for collection, items in self.db.items():
+                    if isinstance(items, dict) and items:
+                        entries.extend((collection, item_id) for item_id in items)
+                    else:
+                        entries.append((collection,))
+            for parts in entries:
+                if resolve(self.db, parts) is not MISSING:
+                    self._track_write(parts, None)
+        self._expire_due()
@@ -0,0 +1,63 @@
+import json
+from typing import Dict, Optional, Tuple
+
+INDENT = '    '
+
+def encode_fragment(key: str, value: object) -> str:
+    """
+    Encodes one top level entry exactly as json.dumps(db, indent=4) lays it out inside the root object.
+
+    Newlines only occur between tokens of indented JSON (those in strings are escaped), so
+    indenting every line once more gives the nested layout.
+    """
+    return INDENT + json.dumps(key) + ': ' + json.dumps(value, indent=4).replace('\n', '\n' + INDENT)
+
+class Fragments:
+    """
+    Serialized fragment cache: saves reuse the encoded text of unchanged top level collections.
+
+    The file layout is unchanged; it is rebuilt from one fragment per top level key, and only
+    the keys touched since the previous save (as reported by the change notifications) are
+    encoded again. Values must therefore only be modified through the database methods.
+    """
+    def __init__(self, fragment_cache: bool = False):
+        """
+        Initializes the fragment cache.
+
+        Args:
+            fragment_cache (bool, optional): Caches the encoded top level collections between saves. Defaults to False.
+        """
+        self._fragments: Optional[Dict[str, str]] = {} if fragment_cache else None
+        self._fragment_stats = {"reused": 0, "encoded": 0}
+
+    def _serialize_fragments(self) -> str:
+        """
+        Encodes self.db like json.dumps(self.db, indent=4), from the cached fragments.
+        """
+        fragments = self._fragments
+        parts = []
+        encoded = 0
+        for key, value in self.db.items():
+            fragment = fragments.get(key)
+            if fragment is None:
+                fragment = fragments[key] = encode_fragment(key, value)
+                encoded += 1
+            parts.append(fragment)
+        if len(fragments) > len(parts):
+            # Keys removed from the database.
+            for key in [key for key in fragments if key not in self.db]:
+                del fragments[key]
+        self._fragment_stats["encoded"] += encoded
+        self._fragment_stats["reused"] += len(parts) - encoded
+        if not parts:
+            return '{}'
+        return '{\n' + ',\n'.join(parts) + '\n}'
+
+    def _invalidate_fragments(self, parts: Tuple[str, ...]) -> None:
+        """
+        Drops the fragment of a changed top level key (all of them for a change of the root). Called by _notify_change.
+        """
+        if parts:
+            self._fragments.pop(parts[0], None)
+        else:
+            self._fragments.clear()
@@ -0,0 +1,65 @@
+from functools import lru_cache
+from typing import Any, Optional, Tuple
+
+# Number of distinct key paths kept in the compiled path cache.
+KEY_CACHE_SIZE = 8192
+
+# Returned by resolve() when a path doesn't exist (None is a valid stored value).
+MISSING = object()
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def compile_key(key: str) -> Tuple[str, ...]:
+    """
+    Parses a "/" separated key path into a tuple of path segments.
+
+    Results are cached, so hot keys are only split once.
+
+    Args:
+        key (str): The key path (e.g. "users/1/name").
+
+    Returns:
+        Tuple[str, ...]: The path segments.
+    """
+    return tuple(key.split('/'))
+
+def resolve(data: Any, parts: Tuple[str, ...]) -> Any:
+    """
+    Walks a compiled path from the root and returns the value it points to.
+
+    Args:
+        data (Any): The root container.
+        parts (Tuple[str, ...]): The compiled path.
+
+    Returns:
+        Any: The value, or MISSING if the path doesn't exist.
+    """
+    for k in parts:
+        if k in data:
+            data = data[k]
+        else:
+            return MISSING
+    return data
+
+def resolve_parent(data: Any, parts: Tuple[str, ...], create: bool = False) -> Optional[Tuple[Any, str]]:
+    """
+    Walks a compiled path once and returns the container holding its last segment.
+
+    Args:
+        data (Any): The root container.
+        parts (Tuple[str, ...]): The compiled path.
+        create (bool, optional): Creates missing intermediate dictionaries if True. Defaults to False.
+
+    Returns:
+        Optional[Tuple[Any, str]]: The (parent, leaf key) pair, or None if an intermediate
+            segment is missing and create is False.
+    """
+    if create:
+        for k in parts[:-1]:
+            data = data.setdefault(k, {})
+    else:
+        for k in parts[:-1]:
+            if k in data:
+                data = data[k]
+            else:
+                return None
+    return data, parts[-1]
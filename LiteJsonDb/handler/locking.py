@@ -0,0 +1,15 @@
+import functools
+from typing import Callable
+
+def synchronized(method: Callable) -> Callable:
+    """
+    Runs a method under the database lock (self._lock, reentrant).
+
+    Every method that modifies self.db takes it, and so does every save: a save never
+    encodes the database while another thread modifies it. Reads don't take it.
+    """
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return locked
@@ -0,0 +1,105 @@
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+from typing import Dict
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+
+class _DeferredQueueHandler(logging.Handler):
+    """
+    Enqueues records as they are: unlike logging.handlers.QueueHandler, it doesn't format the
+    message, so formatting happens on the listener thread, not in the caller.
+    """
+    def __init__(self, records: "queue.SimpleQueue[logging.LogRecord]"):
+        super().__init__()
+        self.queue = records
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.queue.put_nowait(record)
+
+class _LogPipeline:
+    """
+    The file and console handlers of one log file, fed through a queue by a background thread.
+    """
+    def __init__(self, path: str):
+        # logging.handlers imports socket and pickle: only loaded when a database logs.
+        from logging.handlers import QueueListener
+
+        file_handler = logging.FileHandler(path)
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter('%(message)s'))
+        self.queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self.handler = _DeferredQueueHandler(self.queue)
+        self.listener = QueueListener(self.queue, file_handler, console_handler)
+        self.listener.start()
+        self.handlers = (file_handler, console_handler)
+        self.users: Dict[str, int] = {}
+
+    def stop(self) -> None:
+        # Delivers what is still queued, then stops the thread.
+        self.listener.stop()
+        for handler in self.handlers:
+            handler.close()
+
+_pipelines: Dict[str, _LogPipeline] = {}
+_pipelines_lock = threading.Lock()
+
+def database_logger(filename: str) -> logging.Logger:
+    """
+    Returns the logger of one database file: a child of the 'LiteJsonDb' logger named after the file.
+    """
+    name = os.path.normpath(filename).replace('.', '_')
+    return logging.getLogger('LiteJsonDb').getChild(name)
+
+def attach_log(logger: logging.Logger, path: str) -> None:
+    """
+    Sends the records of `logger` to the log file at `path` (and stdout) through a queue.
+
+    The handlers of a file are created once per process, whatever the number of databases
+    logging to it; logging calls only enqueue the record.
+
+    Args:
+        logger (logging.Logger): The database logger.
+        path (str): The log file.
+    """
+    path = os.path.abspath(path)
+    with _pipelines_lock:
+        pipeline = _pipelines.get(path)
+        if pipeline is None:
+            pipeline = _pipelines[path] = _LogPipeline(path)
+        pipeline.users[logger.name] = pipeline.users.get(logger.name, 0) + 1
+        if pipeline.handler not in logger.handlers:
+            logger.addHandler(pipeline.handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+def detach_log(logger: logging.Logger, path: str) -> None:
+    """
+    Undoes attach_log. The pipeline of a file stops, after writing the queued records, when its last database detaches.
+    """
+    path = os.path.abspath(path)
+    with _pipelines_lock:
+        pipeline = _pipelines.get(path)
+        if pipeline is None or logger.name not in pipeline.users:
+            return
+        pipeline.users[logger.name] -= 1
+        if pipeline.users[logger.name] == 0:
+            del pipeline.users[logger.name]
+            logger.removeHandler(pipeline.handler)
+            logger.setLevel(logging.NOTSET)
+            logger.propagate = True
+        if not pipeline.users:
+            del _pipelines[path]
+            pipeline.stop()
+
+@atexit.register
+def _stop_pipelines() -> None:
+    with _pipelines_lock:
+        pipelines = list(_pipelines.values())
+        _pipelines.clear()
+    for pipeline in pipelines:
+        pipeline.stop()
@@ -0,0 +1,329 @@
+import json
+import os
+import time
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .fragments import INDENT
+from .keypath import MISSING, resolve
+
+INDEX_SUFFIX = '.idx'
+INDEX_VERSION = 1
+
+# Collections with at least this many items also get an offset per item, so one item can be decoded alone.
+MIN_INDEXED_ITEMS = 64
+
+# Attempts at mapping the file on open: a writer replaces the index and then the file, so a reader
+# opening in between finds an index for a file that isn't there yet.
+MAP_ATTEMPTS = 3
+MAP_RETRY_DELAY = 0.01
+
+# (inode, size, modification time in ns) of a database file: changes with every save.
+Identity = Tuple[int, int, int]
+
+class StaleIndex(ValueError):
+    """
+    Raised when the offset index doesn't describe the current database file.
+    """
+
+def file_identity(stat: os.stat_result) -> Identity:
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+def encode_indexed(db: Dict[str, Any]) -> Tuple[str, Dict[str, List[int]], Dict[str, Dict[str, List[int]]]]:
+    """
+    Encodes db exactly as json.dumps(db, indent=4), with the offsets of every top level value and of
+    every item of the large collections.
+
+    Offsets count characters, which are also bytes: json.dumps escapes non-ASCII characters.
+
+    Returns:
+        Tuple: The text, {key: [start, end]} and {collection: {item key: [start, end]}}.
+    """
+    if not db:
+        return '{}', {}, {}
+    parts: List[str] = ['{\n']
+    position = 2
+    keys: Dict[str, List[int]] = {}
+    tables: Dict[str, Dict[str, List[int]]] = {}
+    item_indent = INDENT * 2
+    for number, (key, value) in enumerate(db.items()):
+        head = (',\n' if number else '') + INDENT + json.dumps(key) + ': '
+        parts.append(head)
+        position += len(head)
+        start = position
+        if isinstance(value, dict) and len(value) >= MIN_INDEXED_ITEMS:
+            table = tables[key] = {}
+            parts.append('{\n')
+            position += 2
+            for item_number, (item_key, item) in enumerate(value.items()):
+                head = (',\n' if item_number else '') + item_indent + json.dumps(item_key) + ': '
+                text = json.dumps(item, indent=4).replace('\n', '\n' + item_indent)
+                parts.append(head)
+                parts.append(text)
+                position += len(head)
+                table[item_key] = [position, position + len(text)]
+                position += len(text)
+            text = '\n' + INDENT + '}'
+        else:
+            text = json.dumps(value, indent=4).replace('\n', '\n' + INDENT)
+        parts.append(text)
+        position += len(text)
+        keys[key] = [start, position]
+    parts.append('\n}')
+    return ''.join(parts), keys, tables
+
+def encode_index(identity: Identity, keys: Dict[str, List[int]], tables: Dict[str, Dict[str, List[int]]]) -> str:
+    """
+    Encodes the offset index: a header line, then the item tables, which readers only parse when they
+    first read an item of their collection.
+
+    The header holds the identity of the database file it describes, and {key: [start, end]}, or
+    [start, end, table start, table end] for the collections with an item table (table offsets count
+    from the end of the header line).
+    """
+    entries: Dict[str, List[int]] = {}
+    body: List[str] = []
+    position = 0
+    for key, (start, end) in keys.items():
+        table = tables.get(key)
+        if table is None:
+            entries[key] = [start, end]
+            continue
+        text = json.dumps(table, separators=(',', ':'))
+        entries[key] = [start, end, position, position + len(text)]
+        body.append(text)
+        position += len(text)
+    header = json.dumps({"version": INDEX_VERSION, "file": list(identity), "keys": entries}, separators=(',', ':'))
+    return header + '\n' + ''.join(body)
+
+class MappedDatabase(Mapping):
+    """
+    A read only view of a memory-mapped database file: values are decoded from the mapping on first access.
+
+    The pages of the file live in the OS page cache, shared by every process mapping it, and a
+    process only decodes the collections (or items of large collections) it reads.
+    """
+    def __init__(self, filename: str):
+        """
+        Maps a database file and its offset index.
+
+        Raises:
+            OSError: If a file can't be opened.
+            StaleIndex: If the index is missing, unreadable or describes another version of the file.
+        """
+        import mmap
+        try:
+            with open(filename, 'rb') as file:
+                self.identity = file_identity(os.fstat(file.fileno()))
+                self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            with open(filename + INDEX_SUFFIX, 'rb') as file:
+                header = json.loads(file.readline())
+                self._tables_start = file.tell()
+                self._index = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError as e:
+            raise StaleIndex(f"no offset index: {e}")
+        except ValueError as e:
+            raise StaleIndex(f"unreadable offset index: {e}")
+        if not isinstance(header, dict) or header.get("version") != INDEX_VERSION:
+            raise StaleIndex("unknown offset index version")
+        if tuple(header["file"]) != self.identity:
+            raise StaleIndex("the offset index describes another version of the file")
+        self._keys: Dict[str, List[int]] = header["keys"]
+        self._values: Dict[str, Any] = {}
+        self._tables: Dict[str, Dict[str, List[int]]] = {}
+        self._items: Dict[str, Dict[str, Any]] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._values.get(key, MISSING)
+        if value is MISSING:
+            start, end = self._keys[key][:2]
+            value = self._values[key] = json.loads(self._data[start:end])
+            self._items.pop(key, None)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def item(self, key: str, item_key: str) -> Any:
+        """
+        Returns self[key][item_key], decoding only that item if the collection has an item table.
+
+        Returns:
+            Any: The item, or MISSING.
+        """
+        entry = self._keys.get(key)
+        if entry is None:
+            return MISSING
+        if len(entry) == 2 or key in self._values:
+            return resolve(self[key], (item_key,))
+        items = self._items.get(key)
+        if items is None:
+            items = self._items[key] = {}
+        value = items.get(item_key, MISSING)
+        if value is MISSING:
+            table = self._tables.get(key)
+            if table is None:
+                start = self._tables_start + entry[2]
+                table = self._tables[key] = json.loads(self._index[start:self._tables_start + entry[3]])
+            offsets = table.get(item_key)
+            if offsets is None:
+                return MISSING
+            value = items[item_key] = json.loads(self._data[offsets[0]:offsets[1]])
+        return value
+
+class MemoryMapping:
+    """
+    Read only mode, and memory-mapped reads through an offset index.
+
+    A writer opened with offset_index=True saves an index next to the file (file + ".idx") with
+    the offsets of every top level value and of every item of large collections, and replaces
+    both files atomically instead of rewriting them in place. Readers opened with
+    read_only=True, mmap=True map the file and decode only what they access, so processes that
+    only read share the file through the page cache instead of each holding a parsed copy.
+
+    A reader checks for a newer version of the file at most every remap_interval seconds (and on
+    refresh()); the old mapping stays valid until then, as a replaced file lives on while mapped.
+    """
+    def __init__(self, read_only: bool = False, mmap: bool = False, offset_index: bool = False,
+                 remap_interval: float = 0.1):
+        """
+        Initializes read only and memory-mapped modes.
+
+        Args:
+            read_only (bool, optional): Refuses every write. Defaults to False.
+            mmap (bool, optional): Maps the file instead of loading it; needs read_only. Defaults to False.
+            offset_index (bool, optional): Writes the offset index used by mmap readers on every save. Defaults to False.
+            remap_interval (float, optional): Minimum seconds between checks for a newer file in mmap mode.
+                Defaults to 0.1.
+
+        Raises:
+            ValueError: If mmap is set without read_only, or mmap or offset_index with encryption.
+        """
+        if mmap and not read_only:
+            raise ValueError("\033[91m#bugs\033[0m mmap=True needs read_only=True: a mapped database can't be modified.")
+        if (mmap or offset_index) and self.crypted:
+            raise ValueError("\033[91m#bugs\033[0m Encrypted databases can't be memory-mapped (mmap, offset_index).")
+        self.read_only = read_only
+        self.mmap = mmap
+        self.offset_index = offset_index
+        self.remap_interval = remap_interval
+        self._file_identity: Optional[Identity] = None
+        self._next_remap_check = 0.0
+        self._pending_index: Optional[Tuple[Dict[str, List[int]], Dict[str, Dict[str, List[int]]]]] = None
+
+    def _refuse_write(self, name: str) -> None:
+        """
+        Reports a write attempted on a read only database. Called by every write method.
+        """
+        self.logger.error("\033[91m#bugs\033[0m The database is opened read only, cannot %s.", name)
+
+    # ==================================================
+    #                     WRITER
+    # --------------------------------------------------
+
+    def _serialize_indexed(self) -> str:
+        """
+        Encodes self.db like json.dumps(self.db, indent=4) and keeps its offsets for _write_indexed.
+        """
+        text, keys, tables = encode_indexed(self.db)
+        self._pending_index = (keys, tables)
+        return text
+
+    def _write_indexed(self, payload: str) -> int:
+        """
+        Writes the database file and its offset index. Both are written to temporary files and renamed
+        over the old ones, index first: readers never see a partly written file, and a reader that finds
+        an index for a file not renamed yet keeps its current mapping.
+        """
+        keys, tables = self._pending_index
+        self._pending_index = None
+        temp = self.filename + '.tmp'
+        index_file = self.filename + INDEX_SUFFIX
+        # No newline translation: the offsets count '\n' as one byte.
+        with open(temp, 'w', newline='') as file:
+            file.write(payload)
+            if self.fsync:
+                file.flush()
+                self._fsync(file.fileno())
+        with open(index_file + '.tmp', 'w', newline='') as file:
+            file.write(encode_index(file_identity(os.stat(temp)), keys, tables))
+            if self.fsync:
+                file.flush()
+                self._fsync(file.fileno())
+        os.replace(index_file + '.tmp', index_file)
+        os.replace(temp, self.filename)
+        return len(payload)
+
+    # ==================================================
+    #                     READERS
+    # --------------------------------------------------
+
+    def _map_db(self) -> bool:
+        """
+        Maps the current database file, if its offset index is up to date.
+
+        Returns:
+            bool: True if self.db is now the mapped file.
+        """
+        try:
+            mapped = MappedDatabase(self.filename)
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        self.db = mapped
+        self._file_identity = mapped.identity
+        return True
+
+    def _open_mapped(self) -> bool:
+        """
+        Maps the database file on open, retrying briefly while a writer is replacing it.
+        """
+        for attempt in range(MAP_ATTEMPTS):
+            if attempt:
+                time.sleep(MAP_RETRY_DELAY)
+            if self._map_db():
+                return True
+        self.logger.error("\033[91m#bugs\033[0m No up to date offset index for %s (save it with offset_index=True); "
+                          "loading the whole file.", self.filename)
+        return False
+
+    def refresh(self) -> bool:
+        """
+        Maps the database file again if the writer saved a newer version. Called by every operation
+        in mmap mode, at most every remap_interval seconds.
+
+        Returns:
+            bool: True if a newer version was mapped.
+        """
+        if not self.mmap:
+            return False
+        try:
+            identity = file_identity(os.stat(self.filename))
+        except OSError:
+            return False
+        if identity == self._file_identity or not self._map_db():
+            return False
+        self._notify_change("reload_db", (), self.db)
+        return True
+
+    def _check_remap(self) -> None:
+        now = time.monotonic()
+        if now >= self._next_remap_check:
+            self._next_remap_check = now + self.remap_interval
+            self.refresh()
+
+    def _mapped_resolve(self, parts: Tuple[str, ...]) -> Any:
+        """
+        resolve(self.db, parts) for mmap mode, decoding only the item a path goes through when its
+        collection has an item table. Called by get_data, key_exists and get_subcollection.
+        """
+        db = self.db
+        if len(parts) > 1 and isinstance(db, MappedDatabase):
+            value = db.item(parts[0], parts[1])
+            return value if value is MISSING else resolve(value, parts[2:])
+        return resolve(db, parts)
@@ -1,4 +1,11 @@
-from typing import Any, Dict, Optional, Union
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from .changefeed import ChangeFeed
+from .keypath import MISSING, compile_key, resolve, resolve_parent
+from .locking import synchronized
+from .observers import ObserverDispatcher, ObserverRegistry
+
+JSON_TYPES = (str, int, float, list, dict, bool, type(None))
 
 class DataManipulation:
     """
@@ -6,19 +13,32 @@ class DataManipulation:
 
     The database (db) is treated as an instance variable of this class.
     """
-    def __init__(self):
+    def __init__(self, observer_mode: str = 'sync', observer_coalesce: Optional[float] = None, observer_loop=None,
+                 change_feed: int = 0):
         """
-        Initialization method.  No specific initialization is done.
+        Initialization method.
+
+        Args:
+            observer_mode (str, optional): How observers are called: 'sync', 'thread' or 'asyncio'. Defaults to 'sync'.
+            observer_coalesce (Optional[float], optional): Coalescing window for pending notifications
+                of the same key, in seconds. Defaults to None (every change is delivered).
+            observer_loop (optional): The asyncio loop used when observer_mode is 'asyncio'.
+            change_feed (int, optional): Number of recent changes kept in the change feed. Defaults to 0 (disabled).
         """
         self.db = {}  # Initialize the database
-        self.observers = {}  # Initialize observers
-        self.crypted = False # Initialize crypted flag
+        self.observers: Dict[str, List[Callable]] = {}  # Initialize observers: {key: [observer_func]}
+        self._observer_registry = ObserverRegistry()  # The same observers, in a trie matched per path segment
+        self._observer_dispatcher = ObserverDispatcher(observer_mode, observer_coalesce, observer_loop, self.logger)
+        self._change_feed = ChangeFeed(change_feed) if change_feed else None
+        self.change_epoch = os.urandom(16).hex()  # Lets followers notice that the feed restarted
         # self._load_db()  # Load the database (commented out)
         # self._load_config() # Load config (commented out)
 
     def validate_data(self, data: Any) -> bool:
         """
-        Validates data, ensuring it's a dictionary and that keys/values have consistent and allowed types.
+        Validates data, ensuring it's a dictionary with string keys and JSON-compatible values.
+
+        Only the top level is checked; declare a schema with set_schema() to validate nested values.
 
         Args:
             data (Any): The data to validate.
@@ -27,18 +47,15 @@ class DataManipulation:
             bool: True if the data is valid, False otherwise.
         """
         if isinstance(data, dict):
-            types = {}
             for key, value in data.items():
                 if not isinstance(key, str):
-                    self.logger.error(f"\033[91m#bugs\033[0m Key '{key}' must be a string. Did we stumble upon a non-string key?")
+                    self.logger.error("\033[91m#bugs\033[0m Key '%s' must be a string. Did we stumble upon a non-string key?", key)
                     return False
-                if key in types and types[key] != type(value):
-                    self.logger.error(f"\033[91m#bugs\033[0m Conflicting types for key '{key}'.")
+                if not isinstance(value, JSON_TYPES):
+                    self.logger.error("\033[91m#bugs\033[0m Value of '%s' has type %s, which can't be stored in JSON.", key, type(value).__name__)
                     return False
-            return all(isinstance(value, (str, int, float, list, dict, bool, None)) for value in data.values())
-        self.logger.error(f"\033[91m#bugs\033[0m Data must be a dictionary.")
-        return False
-        print(f"\033[91m#bugs\033[0m Data must be a dictionary.")
+            return True
+        self.logger.error("\033[91m#bugs\033[0m Data must be a dictionary.")
         return False
 
     def _set_child(self, parent: Dict[str, Any], child_key: str, value: Any) -> None:
@@ -50,10 +67,8 @@ class DataManipulation:
             child_key (str): The key to set (path separated by "/").
             value (Any): The value to set.
         """
-        keys = child_key.split('/')
-        for key in keys[:-1]:
-            parent = parent.setdefault(key, {})
-        parent[keys[-1]] = value
+        parent, leaf = resolve_parent(parent, compile_key(child_key), create=True)
+        parent[leaf] = value
 
     def _merge_dicts(self, dict1, dict2):
         """
@@ -83,14 +98,9 @@ class DataManipulation:
         Returns:
             bool: True if the key exists, False otherwise.
         """
-        keys = key.split('/')
-        data = self.db
-        for k in keys:
-            if k in data:
-                data = data[k]
-            else:
-                return False
-        return True
+        self._expire_due()
+        parts = compile_key(key)
+        return (self._mapped_resolve(parts) if self.mmap else resolve(self.db, parts)) is not MISSING
 
     def get_data(self, key: str) -> Optional[Any]:
         """
@@ -102,40 +112,49 @@ class DataManipulation:
         Returns:
             Optional[Any]: The data if it exists, None otherwise.
         """
-        keys = key.split('/')
-        data = self.db
-        for k in keys:
-            if k in data:
-                data = data[k]
-            else:
-                self.logger.error(f"\033[91m#bugs\033[0m No data found at key '{key}'. Double-check the key or try a different path.")
-                return None
+        self._expire_due()
+        parts = compile_key(key)
+        data = self._mapped_resolve(parts) if self.mmap else resolve(self.db, parts)
+        if data is MISSING:
+            self.logger.error("\033[91m#bugs\033[0m No data found at key '%s'. Double-check the key or try a different path.", key)
+            return None
+        if self._lru:
+            self._track_touch(parts)
         return data
 
-    def set_data(self, key: str, value: Optional[Any] = None) -> None:
+    @synchronized
+    def set_data(self, key: str, value: Optional[Any] = None, ttl: Optional[float] = None) -> None:
         """
         Sets data in the database.  Raises an error if the key already exists.
 
         Args:
             key (str): The key to set (path separated by "/").
             value (Optional[Any], optional): The value to set. Defaults to None, initializing with an empty dictionary.
+            ttl (Optional[float], optional): Seconds until the key expires. Defaults to None (never).
         """
+        if self.read_only:
+            return self._refuse_write("set_data")
+        self._expire_due()
         if value is None:
             value = {}
 
-        if not self.validate_data(value):
-            self.logger.error(f"\033[91m#bugs\033[0m Invalid data format. Ensure your data is a dictionary with consistent types.")
+        parts = compile_key(key)
+        if not self._validate_write(parts, value):
+            self.logger.error("\033[91m#bugs\033[0m Invalid data format. Ensure your data is a dictionary with consistent types.")
             return
 
-        if self.key_exists(key):
-            self.logger.error(f"\033[91m#bugs\033[0m Key '{key}' already exists.  Use db.edit_data('{key}', new_value) to update or add new data.")
+        if resolve(self.db, parts) is not MISSING:
+            self.logger.error("\033[91m#bugs\033[0m Key '%s' already exists.  Use db.edit_data('%s', new_value) to update or add new data.", key, key)
             return
 
-        self._set_child(self.db, key, value)
-        self.notify_observers("set_data", key, value)
+        parent, leaf = resolve_parent(self.db, parts, create=True)
+        parent[leaf] = value
+        self._notify_change("set_data", parts, value)
+        self._track_write(parts, ttl)
         self._backup_db()  # Backup (mock implementation)
         self._save_db()  # Save (mock implementation)
 
+    @synchronized
     def edit_data(self, key: str, value: Any) -> None:
         """
         Edits data in the database.  Raises an error if the key doesn't exist.
@@ -144,20 +163,21 @@ class DataManipulation:
             key (str): The key to edit (path separated by "/").
             value (Any): The new value.
         """
-        if not self.key_exists(key):
-            self.logger.error(f"\033[91m#bugs\033[0m Key '{key}' doesn't exist, cannot edit. Use 'set_data' to add new data.")
+        if self.read_only:
+            return self._refuse_write("edit_data")
+        self._expire_due()
+        parts = compile_key(key)
+        resolved = resolve_parent(self.db, parts)
+        if resolved is None or resolved[1] not in resolved[0]:
+            self.logger.error("\033[91m#bugs\033[0m Key '%s' doesn't exist, cannot edit. Use 'set_data' to add new data.", key)
             return
 
-        if not self.validate_data(value):
-            self.logger.error(f"\033[91m#bugs\033[0m Invalid data format. Ensure your data is a dictionary with consistent types.")
+        if not self._validate_write(parts, value, partial=True):
+            self.logger.error("\033[91m#bugs\033[0m Invalid data format. Ensure your data is a dictionary with consistent types.")
             return
 
-        keys = key.split('/')
-        data = self.db
-        for k in keys[:-1]:
-            data = data.setdefault(k, {})
-
-        current_data = data.get(keys[-1], {})
+        data, leaf = resolved
+        current_data = data[leaf]
 
         if isinstance(value, dict) and "increment" in value:
             for field, increment_value in value["increment"].items():
@@ -166,19 +186,22 @@ class DataManipulation:
                         if isinstance(increment_value, (int, float)):
                             current_data[field] += increment_value
                         else:
-                            self.logger.error(f"\033[91m#bugs\033[0m Increment value for '{field}' is not a number. Provide a numeric value for incrementing (e.g., db.edit_data('users/1', {{'increment': {{'score': 5}}}})).")
+                            self.logger.error("\033[91m#bugs\033[0m Increment value for '%s' is not a number. Provide a numeric value for incrementing (e.g., db.edit_data('users/1', {'increment': {'score': 5}})).", field)
                             return
                     else:
-                        self.logger.error(f"\033[91m#bugs\033[0m Field '{field}' is not a number. Ensure the field exists and is a number before incrementing.")
+                        self.logger.error("\033[91m#bugs\033[0m Field '%s' is not a number. Ensure the field exists and is a number before incrementing.", field)
                         return
                 else:
-                    self.logger.error(f"\033[91m#bugs\033[0m Field '{field}' doesn't exist. Make sure the field exists in the data structure; use db.edit_data to set initial values.")
+                    self.logger.error("\033[91m#bugs\033[0m Field '%s' doesn't exist. Make sure the field exists in the data structure; use db.edit_data to set initial values.", field)
                     return
         else:
             if isinstance(current_data, dict):
                 value = self._merge_dicts(current_data, value)
-            data[keys[-1]] = value
+            data[leaf] = value
 
+        self._notify_change("edit_data", parts, data[leaf])
+        if self._lru:
+            self._track_touch(parts, resized=True)
         self._backup_db()
         self._save_db()
 
@@ -191,13 +214,15 @@ class DataManipulation:
         """
         Adds an observer for a specific key.
 
+        The observer is called as observer_func(action, key, value) for every change to
+        the key or anything below it ("users" observes "users/1/name").
+
         Args:
             key (str): The key to observe (path separated by "/").
             observer_func: The observer function.
         """
-        if key not in self.observers:
-            self.observers[key] = []
-        self.observers[key].append(observer_func)
+        # Both hold the same list, so observers appended to db.observers[key] are notified too.
+        self.observers[key] = self._observer_registry.add(key, observer_func)
 
     def remove_observer(self, key: str, observer_func) -> None:
         """
@@ -206,11 +231,14 @@ class DataManipulation:
         Args:
             key (str): The key being observed (path separated by "/").
             observer_func: The observer function to remove.
+
+        Raises:
+            ValueError: If observers are registered for the key, but not this one.
         """
-        if key in self.observers:
-            self.observers[key].remove(observer_func)
-            if not self.observers[key]:
-                del self.observers[key]
+        if not self._observer_registry.remove(key, observer_func) and key in self._observer_registry:
+            raise ValueError(f"\033[91m#bugs\033[0m {observer_func!r} doesn't observe '{key}'.")
+        if key in self.observers and not self.observers[key]:
+            del self.observers[key]
 
     def notify_observers(self, action: str, key: str, value: Any) -> None:
         """
@@ -221,11 +249,78 @@ class DataManipulation:
             key (str): The key that was changed (path separated by "/").
             value (Any): The new value.
         """
-        for observer_key, observers in self.observers.items():
-            if key.startswith(observer_key):
-                for observer in observers:
-                    observer(action, key, value)
+        self._notify_change(action, compile_key(key), value)
+
+    def flush_observers(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until queued notifications have been delivered (thread and asyncio modes).
+
+        Args:
+            timeout (Optional[float], optional): Maximum time to wait in seconds. Defaults to None.
+
+        Returns:
+            bool: True if every notification was delivered, False on timeout.
+        """
+        return self._observer_dispatcher.flush(timeout)
+
+    def _notify_change(self, action: str, parts: Tuple[str, ...], value: Any) -> None:
+        """
+        Single entry point for change notifications; every mutation goes through here.
+
+        Args:
+            action (str): The type of action ("set_data", "edit_data", etc.).
+            parts (Tuple[str, ...]): The changed path, split into segments.
+            value (Any): The new value (None for removals).
+        """
+        if self._change_feed is not None:
+            self._change_feed.append(action, parts, value)
+        if self._aggregates:
+            self._update_aggregates(parts)
+        if self._columns:
+            self._update_columns(parts)
+        if self._id_indexes:
+            self._update_id_indexes(parts)
+        if self._fragments is not None:
+            self._invalidate_fragments(parts)
+        if self._query_cache is not None:
+            self._bump_generation(parts)
+        if not self.observers:
+            return
+        observers = self._observer_registry.match(parts)
+        if observers:
+            self._observer_dispatcher.dispatch(observers, action, '/'.join(parts), value)
+
+    # ==================================================
+    #                 CHANGE FEED
+    # --------------------------------------------------
+    # ==================================================
+
+    @property
+    def change_seq(self) -> int:
+        """
+        The sequence number of the latest change in the change feed (0 when disabled or unchanged).
+        """
+        return self._change_feed.seq if self._change_feed is not None else 0
+
+    def changes(self, since: int = 0) -> List[Dict[str, Any]]:
+        """
+        Returns the retained changes after a sequence number.
+
+        Each change is a dictionary with "seq", "op", "path" (list of segments), "value"
+        (the value of the path after the change, None for removals) and "ts".
+
+        Args:
+            since (int, optional): Only changes with a greater sequence number are returned. Defaults to 0.
+
+        Returns:
+            List[Dict[str, Any]]: The changes, oldest first. Empty if the change feed is disabled.
+        """
+        if self._change_feed is None:
+            self.logger.error("\033[91m#bugs\033[0m Change feed is disabled. Create the database with change_feed=<buffer size>.")
+            return []
+        return self._change_feed.changes(since)
 
+    @synchronized
     def remove_data(self, key: str) -> None:
         """
         Removes data from the database by key.
@@ -233,20 +328,23 @@ class DataManipulation:
         Args:
             key (str): The key to remove (path separated by "/").
         """
-        keys = key.split('/')
-        data = self.db
-        for k in keys[:-1]:
-            if k in data:
-                data = data[k]
-            else:
-                self.logger.error(f"\033[91m#bugs\033[0m Key '{key}' doesn't exist, cannot remove. Make sure the key path is correct.")
-                return
-        if keys[-1] in data:
-            del data[keys[-1]]
+        if self.read_only:
+            return self._refuse_write("remove_data")
+        self._expire_due()
+        parts = compile_key(key)
+        resolved = resolve_parent(self.db, parts)
+        if resolved is None:
+            self.logger.error("\033[91m#bugs\033[0m Key '%s' doesn't exist, cannot remove. Make sure the key path is correct.", key)
+            return
+        data, leaf = resolved
+        if leaf in data:
+            del data[leaf]
+            self._notify_change("remove_data", parts, None)
+            self._track_remove(parts)
             self._backup_db()
             self._save_db()
         else:
-            self.logger.error(f"\033[91m#bugs\033[0m Key '{key}' doesn't exist, cannot remove. Make sure the key path is correct.")
+            self.logger.error("\033[91m#bugs\033[0m Key '%s' doesn't exist, cannot remove. Make sure the key path is correct.", key)
 
     # ==================================================
     #                WHOLE DATABASE
@@ -261,10 +359,14 @@ class DataManipulation:
             raw (bool, optional):  Whether to get the raw data. Defaults to False.
 
         Returns:
-            Union[Dict[str, Any], str]: The entire database.
+            Union[Dict[str, Any], str]: The entire database. In mmap mode, raw returns the read only mapped
+            view (values are decoded when read) and otherwise a dict of every decoded collection.
         """
+        self._expire_due()
         if raw:
             return self.db
+        if self.mmap:
+            return dict(self.db)
         if self.crypted:
             return self._decrypt(self._encrypt(self.db))
         return self.db
@@ -285,16 +387,25 @@ class DataManipulation:
         Returns:
             Optional[Any]: The subcollection, or the item. None if it doesn't exist.
         """
-        collection = self.db.get(collection_name, {})
+        self._expire_due()
+        if self.mmap and item_id is not None:
+            # Only decodes the item, not the whole collection.
+            item = self._mapped_resolve((collection_name, item_id))
+            collection = {} if item is MISSING else {item_id: item}
+        else:
+            collection = self.db.get(collection_name, {})
         if item_id is not None:
             if item_id in collection:
+                if self._lru:
+                    self._track_touch((collection_name, item_id))
                 return collection[item_id]
             else:
-                self.logger.error(f"\033[91m#bugs\033[0m ID '{item_id}' not found in collection '{collection_name}'. Check if the ID is correct; use get_subcollection('{collection_name}') to see all items.")
+                self.logger.error("\033[91m#bugs\033[0m ID '%s' not found in collection '%s'. Check if the ID is correct; use get_subcollection('%s') to see all items.", item_id, collection_name, collection_name)
                 return None
         return collection
 
-    def set_subcollection(self, collection_name: str, item_id: str, value: Any) -> None:
+    @synchronized
+    def set_subcollection(self, collection_name: str, item_id: str, value: Any, ttl: Optional[float] = None) -> None:
         """
         Sets an item in a specific subcollection.
 
@@ -302,22 +413,71 @@ class DataManipulation:
             collection_name (str): The subcollection name.
             item_id (str): The item ID.
             value (Any): The value to set.
+            ttl (Optional[float], optional): Seconds until the item expires. Defaults to None (never).
         """
-        if not self.validate_data(value):
-            self.logger.error(f"\033[91m#bugs\033[0m Invalid data format.  Your data should look like this: {{'name': 'Aliou', 'age': 30}}.")
+        if self.read_only:
+            return self._refuse_write("set_subcollection")
+        self._expire_due()
+        if not self._validate_write((collection_name, item_id), value):
+            self.logger.error("\033[91m#bugs\033[0m Invalid data format.  Your data should look like this: {'name': 'Aliou', 'age': 30}.")
             return
 
         if collection_name not in self.db:
             self.db[collection_name] = {}
 
         if item_id in self.db[collection_name]:
-            self.logger.error(f"\033[91m#bugs\033[0m ID '{item_id}' already exists in collection '{collection_name}'. Use db.edit_subcollection('{collection_name}', '{item_id}', new_value) to update or add new data.")
+            self.logger.error("\033[91m#bugs\033[0m ID '%s' already exists in collection '%s'. Use db.edit_subcollection('%s', '%s', new_value) to update or add new data.", item_id, collection_name, collection_name, item_id)
             return
 
         self.db[collection_name][item_id] = value
+        self._notify_change("set_subcollection", (collection_name, item_id), value)
+        self._track_write((collection_name, item_id), ttl)
         self._backup_db()
         self._save_db()
 
+    @synchronized
+    def bulk_set_subcollection(self, collection_name: str, items: Dict[str, Any], trusted: bool = False) -> int:
+        """
+        Sets many items of a subcollection, with a single save at the end.
+
+        Args:
+            collection_name (str): The subcollection name.
+            items (Dict[str, Any]): Item ID -> value. IDs that already exist are skipped.
+            trusted (bool, optional): Skips validation, for data known to be valid (e.g. a re-import
+                of an export). Defaults to False.
+
+        Returns:
+            int: The number of items written.
+        """
+        if self.read_only:
+            self._refuse_write("bulk_set_subcollection")
+            return 0
+        self._expire_due()
+        if collection_name not in self.db:
+            self.db[collection_name] = {}
+        collection = self.db[collection_name]
+        existing, invalid = [], []
+        for item_id, value in items.items():
+            if item_id in collection:
+                existing.append(item_id)
+                continue
+            if not trusted and not self._validate_write((collection_name, item_id), value):
+                invalid.append(item_id)
+                continue
+            collection[item_id] = value
+            self._notify_change("set_subcollection", (collection_name, item_id), value)
+            self._track_write((collection_name, item_id), None)
+        if existing:
+            self.logger.error("\033[91m#bugs\033[0m %s IDs already exist in collection '%s' and were skipped (e.g. '%s'). Use db.edit_subcollection to update them.", len(existing), collection_name, existing[0])
+        if invalid:
+            self.logger.error("\033[91m#bugs\033[0m %s invalid items were skipped in collection '%s' (e.g. '%s').", len(invalid), collection_name, invalid[0])
+        written = len(items) - len(existing) - len(invalid)
+        if written:
+            self._backup_db()
+            self._save_db()
+        return written
+
+    @synchronized
     def edit_subcollection(self, collection_name: str, item_id: str, value: Any) -> None:
         """
         Edits an item in a specific subcollection.
@@ -327,8 +487,11 @@ class DataManipulation:
             item_id (str): The item ID.
             value (Any): The new value.
         """
-        if not self.validate_data(value):
-            self.logger.error(f"\033[91m#bugs\033[0m Invalid data format. Your data should look like this: {{'name': 'Aliou', 'age': 30}}.")
+        if self.read_only:
+            return self._refuse_write("edit_subcollection")
+        self._expire_due()
+        if not self._validate_write((collection_name, item_id), value, partial=True):
+            self.logger.error("\033[91m#bugs\033[0m Invalid data format. Your data should look like this: {'name': 'Aliou', 'age': 30}.")
             return
 
         if collection_name in self.db and item_id in self.db[collection_name]:
@@ -336,11 +499,15 @@ class DataManipulation:
             if isinstance(current_data, dict):
                 value = self._merge_dicts(current_data, value)
             self.db[collection_name][item_id] = value
+            self._notify_change("edit_subcollection", (collection_name, item_id), value)
+            if self._lru:
+                self._track_touch((collection_name, item_id), resized=True)
             self._backup_db()
             self._save_db()
         else:
-            self.logger.error(f"\033[91m#bugs\033[0m ID '{item_id}' not found in collection '{collection_name}', cannot edit. Use 'set_subcollection' to create a new item.")
+            self.logger.error("\033[91m#bugs\033[0m ID '%s' not found in collection '%s', cannot edit. Use 'set_subcollection' to create a new item.", item_id, collection_name)
 
+    @synchronized
     def remove_subcollection(self, collection_name: str, item_id: Optional[str] = None) -> None:
         """
         Removes a subcollection or an item within it.
@@ -349,19 +516,26 @@ class DataManipulation:
             collection_name (str): The subcollection name.
             item_id (Optional[str], optional): The item ID. Defaults to None.
         """
+        if self.read_only:
+            return self._refuse_write("remove_subcollection")
+        self._expire_due()
         if item_id is None:
             if collection_name in self.db:
                 del self.db[collection_name]
+                self._notify_change("remove_subcollection", (collection_name,), None)
+                self._track_remove((collection_name,))
                 self._backup_db()
                 self._save_db()
             else:
-                self.logger.error(f"\033[91m#bugs\033[0m Collection '{collection_name}' not found, cannot remove. Make sure the collection name is correct.")
+                self.logger.error("\033[91m#bugs\033[0m Collection '%s' not found, cannot remove. Make sure the collection name is correct.", collection_name)
                 return
         else:
             if collection_name in self.db and item_id in self.db[collection_name]:
                 del self.db[collection_name][item_id]
+                self._notify_change("remove_subcollection", (collection_name, item_id), None)
+                self._track_remove((collection_name, item_id))
                 self._backup_db()
                 self._save_db()
             else:
-                self.logger.error(f"\033[91m#bugs\033[0m ID '{item_id}' not found in collection '{collection_name}', cannot remove. Check the ID and collection name; use get_subcollection('{collection_name}') to see all items.")
+                self.logger.error("\033[91m#bugs\033[0m ID '%s' not found in collection '%s', cannot remove. Check the ID and collection name; use get_subcollection('%s') to see all items.", item_id, collection_name, collection_name)
                 return
\ No newline at end of file
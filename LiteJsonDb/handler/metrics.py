@@ -0,0 +1,461 @@
+import bisect
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from .profiling import SampledProfiler, slow_op_entry
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# Histogram bucket upper bounds, in seconds (Prometheus "le" labels).
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Public operations timed when metrics are enabled.
+OPERATIONS = (
+    'get_data', 'set_data', 'edit_data', 'remove_data', 'key_exists', 'search_data', 'get_db',
+    'get_subcollection', 'set_subcollection', 'edit_subcollection', 'remove_subcollection', 'bulk_set_subcollection',
+    'export_to_csv', 'backup_to_telegram', 'set_ttl', 'get_ttl', 'purge_expired', 'changes', 'aggregate',
+    'column_select', 'column_aggregate', 'memory_report', 'incr', 'incr_many',
+    'get_subcollection_page', 'patch',
+)
+
+# Internal phases: phase name -> method name.
+PHASES = {
+    'load': '_load_db',
+    'validate': '_validate_write',
+    'merge_dicts': '_merge_dicts',
+    'encrypt': '_encrypt',
+    'decrypt': '_decrypt',
+    'serialize': '_serialize_db',
+    'write': '_write_db_file',
+    'fsync': '_fsync',
+    'backup': '_backup_db',
+}
+
+class Histogram:
+    """
+    A fixed-bucket latency histogram (cumulative on export, like Prometheus).
+    """
+    __slots__ = ('counts', 'count', 'sum', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a quantile as the upper bound of the bucket that contains it.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum_s": self.sum,
+            "mean_s": self.sum / self.count if self.count else 0.0,
+            "p50_s": self.quantile(0.50),
+            "p99_s": self.quantile(0.99),
+            "max_s": self.max,
+        }
+
+def deep_sizeof(obj: Any) -> int:
+    """
+    Approximates the memory used by a JSON-like structure (dicts, lists and scalars), iteratively.
+    """
+    seen = set()
+    size = 0
+    stack = [obj]
+    getsizeof = sys.getsizeof
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return size
+
+class MetricsRegistry:
+    """
+    Counters and latency histograms for one JsonDB instance.
+    """
+    def __init__(self, size_interval: float = 10.0):
+        """
+        Args:
+            size_interval (float, optional): Minimum seconds between two measurements of the
+                in-memory database size (it walks the whole database). Defaults to 10.0.
+        """
+        self.operations: Dict[str, Histogram] = {}
+        self.errors: Dict[str, int] = {}
+        self.phases: Dict[str, Histogram] = {}
+        self.saves = 0
+        self.save_bytes_total = 0
+        self.last_save_bytes = 0
+        self.size_interval = size_interval
+        self._size: Tuple[float, int] = (0.0, 0)
+        self._lock = threading.Lock()
+
+    def observe_operation(self, name: str, seconds: float, failed: bool = False) -> None:
+        with self._lock:
+            histogram = self.operations.get(name)
+            if histogram is None:
+                histogram = self.operations[name] = Histogram()
+            histogram.observe(seconds)
+            if failed:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def observe_phase(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.phases.get(name)
+            if histogram is None:
+                histogram = self.phases[name] = Histogram()
+            histogram.observe(seconds)
+
+    def record_save(self, written: int) -> None:
+        with self._lock:
+            self.saves += 1
+            self.save_bytes_total += written
+            self.last_save_bytes = written
+
+    def db_size(self, db: Dict[str, Any]) -> int:
+        measured_at, size = self._size
+        now = time.monotonic()
+        if not measured_at or now - measured_at >= self.size_interval:
+            size = deep_sizeof(db)
+            self._size = (now, size)
+        return size
+
+    def snapshot(self, db: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "operations": {name: dict(h.summary(), errors=self.errors.get(name, 0))
+                               for name, h in self.operations.items()},
+                "phases": {name: h.summary() for name, h in self.phases.items()},
+                "saves": {"count": self.saves, "bytes_total": self.save_bytes_total, "last_bytes": self.last_save_bytes},
+                "db": {"top_level_keys": len(db), "size_bytes": self.db_size(db)},
+            }
+
+    def to_prometheus(self, db: Dict[str, Any], labels: Dict[str, str]) -> str:
+        """
+        Renders every metric in the Prometheus text exposition format.
+        """
+        base = ",".join(f'{k}="{v}"' for k, v in labels.items())
+        def fmt(extra: str = "") -> str:
+            inner = ",".join(filter(None, (base, extra)))
+            return "{" + inner + "}" if inner else ""
+
+        lines: List[str] = []
+        def histogram_lines(metric: str, label: str, histograms: Dict[str, Histogram]) -> None:
+            lines.append(f"# TYPE {metric} histogram")
+            for name, h in sorted(histograms.items()):
+                series = f'{label}="{name}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, h.counts):
+                    cumulative += count
+                    bucket = f'{series},le="{bound}"'
+                    lines.append(f"{metric}_bucket{fmt(bucket)} {cumulative}")
+                bucket = f'{series},le="+Inf"'
+                lines.append(f"{metric}_bucket{fmt(bucket)} {h.count}")
+                lines.append(f"{metric}_sum{fmt(series)} {h.sum}")
+                lines.append(f"{metric}_count{fmt(series)} {h.count}")
+
+        with self._lock:
+            histogram_lines("litejsondb_operation_seconds", "op", self.operations)
+            lines.append("# TYPE litejsondb_operation_errors_total counter")
+            for name in sorted(self.operations):
+                series = f'op="{name}"'
+                lines.append(f"litejsondb_operation_errors_total{fmt(series)} {self.errors.get(name, 0)}")
+            histogram_lines("litejsondb_phase_seconds", "phase", self.phases)
+            lines.append("# TYPE litejsondb_saves_total counter")
+            lines.append(f"litejsondb_saves_total{fmt()} {self.saves}")
+            lines.append("# TYPE litejsondb_save_bytes_total counter")
+            lines.append(f"litejsondb_save_bytes_total{fmt()} {self.save_bytes_total}")
+            lines.append("# TYPE litejsondb_last_save_bytes gauge")
+            lines.append(f"litejsondb_last_save_bytes{fmt()} {self.last_save_bytes}")
+        lines.append("# TYPE litejsondb_db_top_level_keys gauge")
+        lines.append(f"litejsondb_db_top_level_keys{fmt()} {len(db)}")
+        lines.append("# TYPE litejsondb_db_size_bytes gauge")
+        lines.append(f"litejsondb_db_size_bytes{fmt()} {self.db_size(db)}")
+        return "\n".join(lines) + "\n"
+
+class Instrumentation:
+    """
+    Optional metrics, slow-operation log and sampled profiling for the public operations
+    and the internal phases of a save/load.
+
+    When all of them are disabled nothing is wrapped, so the data path pays nothing. When
+    one is enabled, the instrumented methods are replaced on the instance by timing wrappers.
+    Phase timings of the operation in progress are collected in a thread-local trace, which
+    gives the per-phase breakdown of slow operations.
+    """
+    def __init__(self, metrics: bool = False, slow_op_threshold: Optional[float] = None,
+                 slow_op_log: Optional[str] = None, slow_op_buffer: int = 100):
+        """
+        Initializes instrumentation.
+
+        Args:
+            metrics (bool, optional): Enables metrics collection. Defaults to False.
+            slow_op_threshold (Optional[float], optional): Operations taking at least this many seconds
+                are recorded by the slow-op log. Defaults to None (disabled).
+            slow_op_log (Optional[str], optional): File slow operations are appended to, one JSON
+                object per line. Defaults to None (ring buffer only).
+            slow_op_buffer (int, optional): Number of slow operations kept in memory. Defaults to 100.
+        """
+        self._metrics: Optional[MetricsRegistry] = None
+        self._metrics_server = None
+        self.slow_op_threshold = slow_op_threshold
+        self.slow_op_log = slow_op_log
+        self._slow_ops = deque(maxlen=slow_op_buffer)
+        self._slow_ops_lock = threading.Lock()
+        self._profilers: Dict[str, SampledProfiler] = {}
+        self._trace = threading.local()
+        self._instrumented = False
+        if metrics:
+            self._metrics = MetricsRegistry()
+        if metrics or slow_op_threshold is not None:
+            self._instrument()
+
+    def _instrument(self) -> None:
+        if self._instrumented:
+            return
+        self._instrumented = True
+        for name in OPERATIONS:
+            setattr(self, name, self._wrap_operation(name, getattr(self, name)))
+        for phase, method in PHASES.items():
+            setattr(self, method, self._wrap_phase(phase, getattr(self, method)))
+
+    def _wrap_operation(self, name: str, func: Callable) -> Callable:
+        registry = self._metrics
+        profilers = self._profilers
+        trace = self._trace
+        clock = time.perf_counter
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            # Only the outermost operation of a thread owns the phase trace.
+            outer = getattr(trace, 'phases', None) is None
+            if outer:
+                trace.phases = {}
+            profiler = profilers.get(name)
+            result = None
+            start = clock()
+            failed = True
+            try:
+                if profiler is not None and profiler.should_sample():
+                    result = profiler.run(func, args, kwargs)
+                else:
+                    result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                elapsed = clock() - start
+                if registry is not None:
+                    registry.observe_operation(name, elapsed, failed)
+                if outer:
+                    phases, trace.phases = trace.phases, None
+                    threshold = self.slow_op_threshold
+                    if threshold is not None and elapsed >= threshold:
+                        self._record_slow_op(slow_op_entry(name, func, args, kwargs, result, elapsed, phases, failed))
+        return timed
+
+    def _wrap_phase(self, name: str, func: Callable) -> Callable:
+        registry = self._metrics
+        trace = self._trace
+        clock = time.perf_counter
+        local = threading.local()
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            # Recursive phases (_merge_dicts) are only timed at the outermost call.
+            if getattr(local, 'active', False):
+                return func(*args, **kwargs)
+            local.active = True
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                local.active = False
+                elapsed = clock() - start
+                if registry is not None:
+                    registry.observe_phase(name, elapsed)
+                phases = getattr(trace, 'phases', None)
+                if phases is not None:
+                    phases[name] = phases.get(name, 0.0) + elapsed
+        return timed
+
+    # --------------------------------------------------
+    #                 SLOW OPERATIONS
+    # --------------------------------------------------
+
+    def _record_slow_op(self, entry: Dict[str, Any]) -> None:
+        with self._slow_ops_lock:
+            self._slow_ops.append(entry)
+            if self.slow_op_log:
+                try:
+                    with open(self.slow_op_log, 'a') as file:
+                        file.write(json.dumps(entry, default=str) + "\n")
+                except OSError as e:
+                    self.logger.error("\033[91m#bugs\033[0m Could not write the slow-op log: %s", e)
+
+    def slow_ops(self) -> List[Dict[str, Any]]:
+        """
+        Returns the most recent slow operations, oldest first.
+
+        Returns:
+            List[Dict[str, Any]]: One record per slow operation: "ts", "op", "duration_s", "key" (the key
+                path, if any), "payload_bytes" and "result_bytes" (JSON size of the dict/list arguments
+                and result), "phases" (seconds spent in each internal phase) and "failed".
+        """
+        with self._slow_ops_lock:
+            return list(self._slow_ops)
+
+    # --------------------------------------------------
+    #                 SAMPLED PROFILING
+    # --------------------------------------------------
+
+    def profile_operation(self, name: str, every: int = 100, output: Optional[str] = None) -> SampledProfiler:
+        """
+        Runs cProfile on every Nth call of an operation and aggregates the results.
+
+        Example:
+            db.profile_operation("search_data", every=50, output="search.prof")
+            ...
+            pstats.Stats("search.prof").sort_stats("cumulative").print_stats(20)
+
+        Args:
+            name (str): The operation to profile (e.g. "search_data").
+            every (int, optional): Profile one call out of `every`. Defaults to 100.
+            output (Optional[str], optional): File the aggregated pstats data is written to after each
+                sample. Defaults to None (keep the stats in memory, see SampledProfiler.stats).
+
+        Returns:
+            SampledProfiler: The profiler, with the call and sample counts and the aggregated stats.
+
+        Raises:
+            ValueError: If the operation is unknown.
+        """
+        if name not in OPERATIONS:
+            raise ValueError(f"\033[91m#bugs\033[0m Unknown operation '{name}'. Available: {list(OPERATIONS)}")
+        profiler = SampledProfiler(name, every, output)
+        self._profilers[name] = profiler
+        self._instrument()
+        return profiler
+
+    def stop_profiling(self, name: str) -> Optional[SampledProfiler]:
+        """
+        Stops profiling an operation and writes its final stats.
+
+        Args:
+            name (str): The profiled operation.
+
+        Returns:
+            Optional[SampledProfiler]: The profiler, or None if the operation was not profiled.
+        """
+        profiler = self._profilers.pop(name, None)
+        if profiler is not None:
+            profiler.dump()
+        return profiler
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Returns the collected metrics.
+
+        Returns:
+            Dict[str, Any]: "operations" and "phases" (count, sum/mean/p50/p99/max seconds, and
+                errors for operations), "saves" (count, bytes) and "db" (top level keys,
+                approximate in-memory size in bytes). Empty if metrics are disabled.
+        """
+        if self._metrics is None:
+            self.logger.error("\033[91m#bugs\033[0m Metrics are disabled. Create the database with metrics=True.")
+            return {}
+        return self._metrics.snapshot(self.db)
+
+    def metrics_text(self) -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        if self._metrics is None:
+            self.logger.error("\033[91m#bugs\033[0m Metrics are disabled. Create the database with metrics=True.")
+            return ""
+        return self._metrics.to_prometheus(self.db, {"db": os.path.basename(self.filename)})
+
+    def export_metrics(self, path: str) -> None:
+        """
+        Writes the Prometheus text format to a file (e.g. for node_exporter's textfile collector).
+
+        The file is replaced atomically so scrapers never read half of it.
+
+        Args:
+            path (str): The destination file.
+        """
+        text = self.metrics_text()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as file:
+            file.write(text)
+        os.replace(tmp_path, path)
+
+    def serve_metrics(self, port: int = 9108, host: str = '127.0.0.1') -> 'ThreadingHTTPServer':
+        """
+        Serves the Prometheus text format over HTTP (any path) on a background thread.
+
+        Args:
+            port (int, optional): The port to listen on (0 picks a free one). Defaults to 9108.
+            host (str, optional): The interface to bind. Defaults to '127.0.0.1'.
+
+        Returns:
+            ThreadingHTTPServer: The running server. It is stopped by close().
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        db = self
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = db.metrics_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='LiteJsonDb-metrics', daemon=True).start()
+        self._metrics_server = server
+        return server
+
+    def _close_metrics(self) -> None:
+        for profiler in self._profilers.values():
+            profiler.dump()
+        if self._metrics_server is not None:
+            self._metrics_server.shutdown()
+            self._metrics_server.server_close()
+            self._metrics_server = None
@@ -0,0 +1,329 @@
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Any, Callable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import asyncio
+
+OBSERVER_MODES = ('sync', 'thread', 'asyncio')
+
+class _Node:
+    __slots__ = ('children', 'callbacks')
+
+    def __init__(self):
+        self.children = {}
+        self.callbacks = []
+
+class ObserverRegistry:
+    """
+    Stores observers in a trie keyed by path segments.
+
+    An observer registered on "users" is notified for "users", "users/1" and
+    "users/1/name", but not for "users_archive" or "users1". Matching a write costs
+    O(path depth), no matter how many observers are registered. An observer
+    registered on "" is notified for every write.
+    """
+    def __init__(self):
+        self._root = _Node()
+        self._count = 0
+
+    @staticmethod
+    def _parts(key: str) -> Tuple[str, ...]:
+        return tuple(key.split('/')) if key else ()
+
+    def add(self, key: str, observer_func: Callable) -> List[Callable]:
+        """
+        Registers an observer on a key.
+
+        Args:
+            key (str): The key to observe (path separated by "/").
+            observer_func (Callable): The observer function.
+
+        Returns:
+            List[Callable]: The observers of the key, matched as is: observers appended to it are notified too.
+        """
+        node = self._root
+        for part in self._parts(key):
+            node = node.children.setdefault(part, _Node())
+        node.callbacks.append(observer_func)
+        self._count += 1
+        return node.callbacks
+
+    def remove(self, key: str, observer_func: Callable) -> bool:
+        """
+        Unregisters an observer and prunes empty trie branches.
+
+        Args:
+            key (str): The observed key (path separated by "/").
+            observer_func (Callable): The observer function to remove.
+
+        Returns:
+            bool: True if the observer was registered, False otherwise.
+        """
+        trail = []
+        node = self._root
+        for part in self._parts(key):
+            child = node.children.get(part)
+            if child is None:
+                return False
+            trail.append((node, part))
+            node = child
+        if observer_func not in node.callbacks:
+            return False
+        node.callbacks.remove(observer_func)
+        self._count -= 1
+        while trail and not node.callbacks and not node.children:
+            parent, part = trail.pop()
+            del parent.children[part]
+            node = parent
+        return True
+
+    def match(self, parts: Tuple[str, ...]) -> List[Callable]:
+        """
+        Collects the observers of a path and of all its ancestors.
+
+        Args:
+            parts (Tuple[str, ...]): The changed path, split into segments.
+
+        Returns:
+            List[Callable]: The observers to notify, from the root down.
+        """
+        node = self._root
+        matched = list(node.callbacks)
+        for part in parts:
+            node = node.children.get(part)
+            if node is None:
+                break
+            matched.extend(node.callbacks)
+        return matched
+
+    def items(self) -> Iterator[Tuple[str, List[Callable]]]:
+        """
+        Iterates over (key, observers) pairs for every observed key.
+        """
+        stack = [((), self._root)]
+        while stack:
+            path, node = stack.pop()
+            if node.callbacks:
+                yield '/'.join(path), list(node.callbacks)
+            for part, child in node.children.items():
+                stack.append((path + (part,), child))
+
+    def __contains__(self, key: str) -> bool:
+        node = self._root
+        for part in self._parts(key):
+            node = node.children.get(part)
+            if node is None:
+                return False
+        return bool(node.callbacks)
+
+    def __len__(self) -> int:
+        return self._count
+
+class ObserverDispatcher:
+    """
+    Delivers observer notifications synchronously, on a worker thread, or on an asyncio loop.
+
+    In 'thread' and 'asyncio' modes writers only enqueue notifications, so a slow
+    observer never stalls set_data and friends. When coalescing is enabled, a change
+    to a key that is still waiting for delivery replaces the pending notification
+    instead of queueing a second one.
+    """
+    def __init__(self, mode: str = 'sync', coalesce: Optional[float] = None,
+                 loop: Optional['asyncio.AbstractEventLoop'] = None, logger: Optional[logging.Logger] = None):
+        """
+        Initializes the dispatcher.
+
+        Args:
+            mode (str, optional): 'sync', 'thread' or 'asyncio'. Defaults to 'sync'.
+            coalesce (Optional[float], optional): Enables coalescing of pending notifications per key.
+                The value is how long (in seconds) the worker waits for more changes before
+                delivering a batch; 0 coalesces only what piles up while observers run.
+                Not supported in 'sync' mode. Defaults to None (disabled).
+            loop (Optional[asyncio.AbstractEventLoop], optional): The loop used in 'asyncio' mode.
+                Defaults to the running loop.
+            logger (Optional[logging.Logger], optional): Logger for observer errors.
+
+        Raises:
+            ValueError: If the mode is unknown, coalescing is requested in 'sync' mode,
+                or no loop is available in 'asyncio' mode.
+        """
+        if mode not in OBSERVER_MODES:
+            raise ValueError(f"\033[91m#bugs\033[0m Unknown observer mode: '{mode}'!")
+        if mode == 'sync' and coalesce is not None:
+            raise ValueError("\033[91m#bugs\033[0m Observer coalescing needs observer_mode='thread' or 'asyncio'.")
+        self.mode = mode
+        self.coalesce = coalesce
+        self.logger = logger or logging.getLogger('LiteJsonDb')
+        self._pending = OrderedDict() if coalesce is not None else deque()
+        self._cond = threading.Condition()
+        self._unfinished = 0
+        self._closed = False
+        # Set by close(): the worker stops waiting for more changes to coalesce.
+        self._stopping = threading.Event()
+        self._worker = None
+        self._loop = None
+        self._wakeup = None
+
+        if mode == 'thread':
+            self._worker = threading.Thread(target=self._run_thread, name='LiteJsonDb-observers', daemon=True)
+            self._worker.start()
+        elif mode == 'asyncio':
+            # asyncio is slow to import: only the asyncio mode loads it.
+            import asyncio
+            if loop is None:
+                try:
+                    loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    raise ValueError("\033[91m#bugs\033[0m observer_mode='asyncio' needs an event loop. Pass observer_loop or create the database inside a running loop.")
+            self._loop = loop
+            self._wakeup = asyncio.Event() if self._in_loop_thread() else None
+            if self._wakeup is not None:
+                self._worker = loop.create_task(self._run_async())
+            else:
+                self._worker = asyncio.run_coroutine_threadsafe(self._start_async(), loop)
+
+    def dispatch(self, observers: List[Callable], action: str, key: str, value: Any) -> None:
+        """
+        Delivers (or schedules delivery of) one change to the given observers.
+
+        Args:
+            observers (List[Callable]): The observers to call.
+            action (str): The type of action ("set_data", "edit_data", etc.).
+            key (str): The key that was changed (path separated by "/").
+            value (Any): The new value.
+        """
+        if self.mode == 'sync':
+            for observer in observers:
+                observer(action, key, value)
+            return
+        with self._cond:
+            if self._closed:
+                return
+            event = (observers, action, key, value)
+            if self.coalesce is not None:
+                if key not in self._pending:
+                    self._unfinished += 1
+                self._pending[key] = event
+            else:
+                self._pending.append(event)
+                self._unfinished += 1
+            self._cond.notify()
+        if self.mode == 'asyncio':
+            self._loop.call_soon_threadsafe(self._set_wakeup)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until every queued notification has been delivered.
+
+        Must not be called from the event loop thread in 'asyncio' mode.
+
+        Args:
+            timeout (Optional[float], optional): Maximum time to wait in seconds. Defaults to None.
+
+        Returns:
+            bool: True if the queue was drained, False on timeout.
+        """
+        if self.mode == 'sync':
+            return True
+        with self._cond:
+            return self._cond.wait_for(lambda: self._unfinished == 0, timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """
+        Delivers what is still queued, then stops the worker.
+
+        Args:
+            timeout (Optional[float], optional): Maximum time to wait for the worker. Defaults to 5.0.
+        """
+        if self.mode == 'sync' or self._closed:
+            return
+        self._stopping.set()
+        if self.mode == 'thread' or not self._in_loop_thread():
+            self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self.mode == 'thread':
+            self._worker.join(timeout)
+        elif self._loop.is_running() and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._set_wakeup)
+
+    def _in_loop_thread(self) -> bool:
+        import asyncio
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _take_batch(self) -> List[Tuple]:
+        # Caller holds self._cond.
+        if self.coalesce is not None:
+            batch = list(self._pending.values())
+        else:
+            batch = list(self._pending)
+        self._pending.clear()
+        return batch
+
+    def _done(self, count: int) -> None:
+        with self._cond:
+            self._unfinished -= count
+            if self._unfinished == 0:
+                self._cond.notify_all()
+
+    def _deliver(self, event: Tuple) -> Any:
+        observers, action, key, value = event
+        results = []
+        for observer in observers:
+            try:
+                results.append(observer(action, key, value))
+            except Exception as e:
+                self.logger.error("\033[91m#bugs\033[0m Observer %r failed for key '%s': %s", observer, key, e)
+        return results
+
+    def _run_thread(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending and self._closed:
+                    return
+            if self.coalesce:
+                self._stopping.wait(self.coalesce)
+            with self._cond:
+                batch = self._take_batch()
+            for event in batch:
+                self._deliver(event)
+            self._done(len(batch))
+
+    def _set_wakeup(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _start_async(self) -> None:
+        import asyncio
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        await self._run_async()
+
+    async def _run_async(self) -> None:
+        import asyncio
+        import inspect
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self.coalesce:
+                await asyncio.sleep(self.coalesce)
+            with self._cond:
+                batch = self._take_batch()
+                closed = self._closed
+            for event in batch:
+                for result in self._deliver(event):
+                    if inspect.isawaitable(result):
+                        try:
+                            await result
+                        except Exception as e:
+                            self.logger.error("\033[91m#bugs\033[0m Async observer failed for key '%s': %s", event[2], e)
+            self._done(len(batch))
+            if closed:
+                return
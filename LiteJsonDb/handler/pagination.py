@@ -0,0 +1,201 @@
+import base64
+import binascii
+import bisect
+import json
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .keypath import MISSING, compile_key, resolve
+
+def id_order(item_id: str) -> Tuple:
+    """
+    The sort key of item ids: numeric ids in numeric order ("2" before "10"), then the others.
+
+    Only ASCII digits count as numeric: "²" or "٣" are sorted with the other ids.
+    """
+    if item_id.isascii() and item_id.isdecimal():
+        return (0, int(item_id), item_id)
+    return (1, 0, item_id)
+
+class IdIndex:
+    """
+    The ids of a collection, sorted, so a page is found by bisection in O(log n).
+    """
+    def __init__(self, items: Dict[str, Any]):
+        self.keys: List[Tuple] = sorted(id_order(item_id) for item_id in items)
+        self.ids = set(items)
+
+    def add(self, item_id: str) -> None:
+        if item_id not in self.ids:
+            self.ids.add(item_id)
+            bisect.insort(self.keys, id_order(item_id))
+
+    def discard(self, item_id: str) -> None:
+        if item_id in self.ids:
+            self.ids.discard(item_id)
+            key = id_order(item_id)
+            del self.keys[bisect.bisect_left(self.keys, key)]
+
+    def after(self, item_id: Optional[str], count: int) -> List[str]:
+        """
+        Returns up to `count` ids following `item_id` (from the first one if None).
+        """
+        start = 0 if item_id is None else bisect.bisect_right(self.keys, id_order(item_id))
+        return [key[2] for key in self.keys[start:start + count]]
+
+def encode_cursor(collection: str, item_id: str) -> str:
+    payload = json.dumps([collection, item_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        collection, item_id = json.loads(payload)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError(f"Malformed cursor: {e}")
+    if not isinstance(collection, str) or not isinstance(item_id, str):
+        raise ValueError("Malformed cursor.")
+    return collection, item_id
+
+def project(item: Any, fields: Optional[Sequence[Tuple[str, Tuple[str, ...]]]]) -> Any:
+    """
+    Keeps only the requested fields of an item: {field path: value}, without copying the rest.
+    """
+    if fields is None or not isinstance(item, dict):
+        return item
+    projected = {}
+    for field, parts in fields:
+        value = resolve(item, parts)
+        if value is not MISSING:
+            projected[field] = value
+    return projected
+
+class Pagination:
+    """
+    Cursor-based pages and streaming iteration over large subcollections.
+
+    Items are served in id order from a sorted id index, built on first use and kept
+    up to date by the change notifications. A cursor only records the last id served,
+    so pages stay consistent while items are added or removed.
+    """
+    def __init__(self):
+        """
+        Initializes the id indexes.
+        """
+        self._id_indexes: Dict[str, IdIndex] = {}
+
+    def _id_index(self, collection_name: str) -> Optional[IdIndex]:
+        items = self.db.get(collection_name)
+        if not isinstance(items, dict):
+            return None
+        index = self._id_indexes.get(collection_name)
+        # An index that no longer matches the collection (self.db modified directly) is rebuilt.
+        if index is None or len(index.ids) != len(items):
+            index = self._id_indexes[collection_name] = IdIndex(items)
+        return index
+
+    def _page(self, collection_name: str, start_after: Optional[str], limit: int,
+              fields: Optional[Sequence[Tuple[str, Tuple[str, ...]]]]) -> List[Tuple[str, Any]]:
+        index = self._id_index(collection_name)
+        if index is None:
+            return []
+        items = self.db[collection_name]
+        ids = index.after(start_after, limit)
+        if any(item_id not in items for item_id in ids):
+            index = self._id_indexes[collection_name] = IdIndex(items)
+            ids = index.after(start_after, limit)
+        return [(item_id, project(items[item_id], fields)) for item_id in ids]
+
+    def get_subcollection_page(self, collection_name: str, limit: int = 50, cursor: Optional[str] = None,
+                               fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns one page of a subcollection, in id order.
+
+        Example:
+            page = db.get_subcollection_page("users", limit=50, fields=["name", "address/city"])
+            while page["next_cursor"]:
+                page = db.get_subcollection_page("users", limit=50, cursor=page["next_cursor"])
+
+        Args:
+            collection_name (str): The subcollection name.
+            limit (int, optional): The maximum number of items. Defaults to 50.
+            cursor (Optional[str], optional): The "next_cursor" of the previous page. Defaults to None (first page).
+            fields (Optional[Sequence[str]], optional): Only return these fields of each item (paths separated
+                by "/"), as {path: value}. Defaults to None (whole items, not copied).
+
+        Returns:
+            Optional[Dict[str, Any]]: {"items": {item_id: value}, "next_cursor": str, or None on the last page}.
+            None if the cursor is invalid.
+
+        Raises:
+            ValueError: If limit is less than 1.
+        """
+        if limit < 1:
+            raise ValueError(f"\033[91m#bugs\033[0m The page limit must be at least 1, got {limit}.")
+        self._expire_due()
+        start_after = None
+        if cursor:
+            try:
+                cursor_collection, start_after = decode_cursor(cursor)
+            except ValueError as e:
+                self.logger.error("\033[91m#bugs\033[0m Invalid cursor for '%s': %s", collection_name, e)
+                return None
+            if cursor_collection != collection_name:
+                self.logger.error("\033[91m#bugs\033[0m This cursor belongs to collection '%s', not '%s'.", cursor_collection, collection_name)
+                return None
+        compiled = [(field, compile_key(field)) for field in fields] if fields is not None else None
+        # One extra item tells whether there is a next page.
+        page = self._page(collection_name, start_after, limit + 1, compiled)
+        next_cursor = encode_cursor(collection_name, page[limit - 1][0]) if len(page) > limit else None
+        return {"items": dict(page[:limit]), "next_cursor": next_cursor}
+
+    def iter_subcollection(self, collection_name: str, start_after: Optional[str] = None, batch_size: int = 500,
+                           fields: Optional[Sequence[str]] = None) -> Iterator[Tuple[str, Any]]:
+        """
+        Iterates over the items of a subcollection in id order, one batch at a time.
+
+        Items may be added or removed while iterating: each batch continues after the last id served.
+
+        Args:
+            collection_name (str): The subcollection name.
+            start_after (Optional[str], optional): Start after this item id. Defaults to None (from the first).
+            batch_size (int, optional): Items fetched per batch. Defaults to 500.
+            fields (Optional[Sequence[str]], optional): Only yield these fields of each item. Defaults to None.
+
+        Yields:
+            Tuple[str, Any]: (item_id, value) pairs.
+
+        Raises:
+            ValueError: If batch_size is less than 1.
+        """
+        if batch_size < 1:
+            raise ValueError(f"\033[91m#bugs\033[0m The batch size must be at least 1, got {batch_size}.")
+        compiled = [(field, compile_key(field)) for field in fields] if fields is not None else None
+        while True:
+            self._expire_due()
+            batch = self._page(collection_name, start_after, batch_size, compiled)
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            start_after = batch[-1][0]
+
+    def _update_id_indexes(self, parts: Tuple[str, ...]) -> None:
+        """
+        Applies a change to the id indexes. Called by _notify_change.
+        """
+        if not parts:
+            self._id_indexes = {}
+            return
+        index = self._id_indexes.get(parts[0])
+        if index is None:
+            return
+        items = self.db.get(parts[0])
+        if len(parts) == 1 or not isinstance(items, dict):
+            del self._id_indexes[parts[0]]
+        elif parts[1] in items:
+            index.add(parts[1])
+        else:
+            index.discard(parts[1])
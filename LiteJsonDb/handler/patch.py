@@ -0,0 +1,277 @@
+import copy
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from .keypath import MISSING, compile_key, resolve
+from .locking import synchronized
+from .method import JSON_TYPES
+
+PATCH_OPERATIONS = frozenset(("add", "remove", "replace", "move", "copy", "test", "append"))
+
+class PatchError(Exception):
+    """
+    Raised while applying a patch operation; the operations already applied are rolled back.
+    """
+
+def parse_pointer(pointer: str) -> Tuple[str, ...]:
+    """
+    Splits a JSON Pointer (RFC 6901), e.g. "/tags/0" or "/a~1b" (key "a/b").
+
+    Raises:
+        PatchError: If the pointer doesn't start with "/" (or is not "", the whole value).
+    """
+    if pointer == "":
+        return ()
+    if not isinstance(pointer, str) or not pointer.startswith("/"):
+        raise PatchError(f"invalid path {pointer!r}: a JSON Pointer starts with '/'")
+    return tuple(part.replace("~1", "/").replace("~0", "~") for part in pointer[1:].split("/"))
+
+def json_equal(a: Any, b: Any) -> bool:
+    """
+    JSON equality, as used by "test": like ==, but booleans never equal numbers.
+    """
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(json_equal(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(json_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+def _index(container: List[Any], part: str, size: int) -> int:
+    if part == "-" or not part.isdigit() or (len(part) > 1 and part[0] == "0"):
+        raise PatchError(f"invalid list index {part!r}")
+    index = int(part)
+    if index >= size:
+        raise PatchError(f"list index {index} out of range")
+    return index
+
+def _restore_key(parent: Dict[str, Any], key: str, value: Any, position: int) -> None:
+    # Puts a removed key back at its position, so a rolled back patch leaves the key order as it was.
+    if position == len(parent):
+        parent[key] = value
+        return
+    items = list(parent.items())
+    items.insert(position, (key, value))
+    parent.clear()
+    parent.update(items)
+
+class Patching:
+    """
+    Partial updates with JSON Patch (RFC 6902) operations, plus "append".
+
+    A patch is applied in place and atomically: every change is recorded in an undo
+    log, and if an operation fails (including a "test"), the ones already applied are
+    undone. Only the paths a patch touched are reported to observers and the change feed.
+    """
+    @synchronized
+    def patch(self, key: str, ops: Sequence[Dict[str, Any]]) -> bool:
+        """
+        Applies JSON Patch operations to the value of a key.
+
+        Paths are JSON Pointers relative to the key ("" is the value itself). Supported
+        operations: add, remove, replace, move, copy, test (RFC 6902) and append, which adds
+        "value" at the end of the list at "path". Use "test" as an optimistic concurrency guard:
+
+            db.patch("users/1", [
+                {"op": "test", "path": "/version", "value": 3},
+                {"op": "replace", "path": "/version", "value": 4},
+                {"op": "remove", "path": "/address/zip"},
+                {"op": "append", "path": "/tags", "value": "admin"},
+            ])
+
+        Args:
+            key (str): The patched key (path separated by "/"). It must exist.
+            ops (Sequence[Dict[str, Any]]): The operations, applied in order.
+
+        Returns:
+            bool: True if every operation was applied. False if the key doesn't exist or an operation
+            failed; the value is then left unchanged.
+        """
+        if self.read_only:
+            self._refuse_write("patch")
+            return False
+        self._expire_due()
+        parts = compile_key(key)
+        if resolve(self.db, parts) is MISSING:
+            self.logger.error("\033[91m#bugs\033[0m Key '%s' doesn't exist, cannot patch. Use 'set_data' to add new data.", key)
+            return False
+
+        undo: List[Callable[[], None]] = []
+        touched: List[Tuple[str, ...]] = []
+        try:
+            for number, op in enumerate(ops):
+                try:
+                    self._apply_patch_op(parts, op, undo, touched)
+                except PatchError as e:
+                    raise PatchError(f"operation {number} ({op.get('op') if isinstance(op, dict) else op!r}): {e}")
+            self._validate_patched(parts)
+        except PatchError as e:
+            for step in reversed(undo):
+                step()
+            self.logger.error("\033[91m#bugs\033[0m Patch of '%s' failed, nothing was changed: %s", key, e)
+            return False
+
+        if touched:
+            self._notify_patched(touched)
+            if resolve(self.db, parts) is MISSING:
+                self._track_remove(parts)
+            elif self._lru:
+                self._track_touch(parts, resized=True)
+            self._backup_db()
+            self._save_db()
+        return True
+
+    def _apply_patch_op(self, root: Tuple[str, ...], op: Dict[str, Any], undo: List[Callable[[], None]],
+                        touched: List[Tuple[str, ...]]) -> None:
+        if not isinstance(op, dict) or op.get("op") not in PATCH_OPERATIONS:
+            raise PatchError(f"unknown operation, expected one of {', '.join(sorted(PATCH_OPERATIONS))}")
+        name = op["op"]
+        if "path" not in op:
+            raise PatchError("missing 'path'")
+        path = root + parse_pointer(op["path"])
+        if name in ("add", "replace", "test", "append"):
+            if "value" not in op:
+                raise PatchError("missing 'value'")
+            value = op["value"]
+            if name != "test" and not isinstance(value, JSON_TYPES):
+                raise PatchError(f"value has type {type(value).__name__}, which can't be stored in JSON")
+
+        if name == "test":
+            current = self._patch_get(root, path)
+            if not json_equal(current, value):
+                raise PatchError(f"test failed: {op['path']!r} is {current!r}, not {value!r}")
+            return
+        if name in ("move", "copy"):
+            if "from" not in op:
+                raise PatchError("missing 'from'")
+            source = root + parse_pointer(op["from"])
+            if name == "move":
+                if source == path:
+                    return
+                if path[:len(source)] == source:
+                    raise PatchError("cannot move a value into itself")
+                value = self._patch_remove(root, source, undo)
+                touched.append(source)
+            else:
+                value = copy.deepcopy(self._patch_get(root, source))
+            self._patch_add(root, path, value, undo)
+        elif name == "add":
+            self._patch_add(root, path, value, undo)
+        elif name == "remove":
+            self._patch_remove(root, path, undo)
+        elif name == "replace":
+            self._patch_replace(root, path, value, undo)
+        else:
+            target = self._patch_get(root, path)
+            if not isinstance(target, list):
+                raise PatchError(f"{op['path']!r} is not a list, cannot append")
+            target.append(value)
+            undo.append(target.pop)
+        touched.append(path)
+
+    def _patch_parent(self, root: Tuple[str, ...], path: Tuple[str, ...]) -> Any:
+        """
+        Walks to the container of the last segment of `path`, stepping into lists by index.
+        """
+        node = self.db
+        for part in path[:-1]:
+            if isinstance(node, dict):
+                if part not in node:
+                    raise PatchError(f"path '/{'/'.join(path[len(root):])}' doesn't exist")
+                node = node[part]
+            elif isinstance(node, list):
+                node = node[_index(node, part, len(node))]
+            else:
+                raise PatchError(f"path '/{'/'.join(path[len(root):])}' goes through a {type(node).__name__}")
+        if not isinstance(node, (dict, list)):
+            raise PatchError(f"path '/{'/'.join(path[len(root):])}' goes through a {type(node).__name__}")
+        return node
+
+    def _patch_get(self, root: Tuple[str, ...], path: Tuple[str, ...]) -> Any:
+        parent = self._patch_parent(root, path)
+        leaf = path[-1]
+        if isinstance(parent, list):
+            return parent[_index(parent, leaf, len(parent))]
+        if leaf not in parent:
+            raise PatchError(f"path '/{'/'.join(path[len(root):])}' doesn't exist")
+        return parent[leaf]
+
+    def _patch_add(self, root: Tuple[str, ...], path: Tuple[str, ...], value: Any,
+                   undo: List[Callable[[], None]]) -> None:
+        parent = self._patch_parent(root, path)
+        leaf = path[-1]
+        if isinstance(parent, list):
+            index = len(parent) if leaf == "-" else _index(parent, leaf, len(parent) + 1)
+            parent.insert(index, value)
+            undo.append(lambda: parent.pop(index))
+        elif leaf in parent:
+            previous = parent[leaf]
+            parent[leaf] = value
+            undo.append(lambda: parent.__setitem__(leaf, previous))
+        else:
+            parent[leaf] = value
+            undo.append(lambda: parent.pop(leaf))
+
+    def _patch_replace(self, root: Tuple[str, ...], path: Tuple[str, ...], value: Any,
+                       undo: List[Callable[[], None]]) -> None:
+        # In place, so a replaced key keeps its position.
+        parent = self._patch_parent(root, path)
+        leaf = path[-1]
+        if isinstance(parent, list):
+            leaf = _index(parent, leaf, len(parent))
+        elif leaf not in parent:
+            raise PatchError(f"path '/{'/'.join(path[len(root):])}' doesn't exist")
+        previous = parent[leaf]
+        parent[leaf] = value
+        undo.append(lambda: parent.__setitem__(leaf, previous))
+
+    def _patch_remove(self, root: Tuple[str, ...], path: Tuple[str, ...], undo: List[Callable[[], None]]) -> Any:
+        parent = self._patch_parent(root, path)
+        leaf = path[-1]
+        if isinstance(parent, list):
+            index = _index(parent, leaf, len(parent))
+            value = parent.pop(index)
+            undo.append(lambda: parent.insert(index, value))
+            return value
+        if leaf not in parent:
+            raise PatchError(f"path '/{'/'.join(path[len(root):])}' doesn't exist")
+        position = list(parent).index(leaf)
+        value = parent.pop(leaf)
+        undo.append(lambda: _restore_key(parent, leaf, value, position))
+        return value
+
+    def _validate_patched(self, parts: Tuple[str, ...]) -> None:
+        """
+        Checks the patched value against the schema of its path, if there is one.
+        """
+        if not self._schemas or self._schema_for(parts) is None:
+            return
+        value = resolve(self.db, parts)
+        if value is not MISSING and not self._validate_write(parts, value):
+            raise PatchError("the result doesn't match the schema")
+
+    def _notify_patched(self, touched: List[Tuple[str, ...]]) -> None:
+        """
+        Reports each touched path once, with its final value. A path into a list is reported as the
+        whole list (change feed consumers address values by key), and a path below another
+        reported path is covered by it.
+        """
+        reported: Dict[Tuple[str, ...], Any] = {}
+        for path in touched:
+            node = self.db
+            for depth, part in enumerate(path):
+                if not isinstance(node, dict):
+                    path = path[:depth]
+                    break
+                node = node.get(part, MISSING)
+                if node is MISSING:
+                    path = path[:depth + 1]
+                    break
+            reported[path] = node
+        for path, value in reported.items():
+            if any(len(other) < len(path) and path[:len(other)] == other for other in reported):
+                continue
+            if value is MISSING:
+                self._notify_change("remove_data", path, None)
+            else:
+                self._notify_change("patch", path, value)
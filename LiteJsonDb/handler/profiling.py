@@ -0,0 +1,122 @@
+import inspect
+import json
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pstats
+
+_active = threading.local()
+
+# Arguments naming the key path of an operation, by order of preference. A collection_name is
+# followed by its item_id when there is one.
+KEY_ARGUMENTS = ('key', 'collection_name', 'collection', 'data_key')
+
+class SampledProfiler:
+    """
+    Profiles every Nth call of one operation with cProfile and aggregates the results.
+
+    The aggregated statistics are written to `output` after each sample, in the
+    format read by pstats (`pstats.Stats("search.prof").sort_stats("cumtime").print_stats(20)`).
+    """
+    def __init__(self, operation: str, every: int = 100, output: Optional[str] = None):
+        """
+        Args:
+            operation (str): The profiled operation name.
+            every (int, optional): Profile one call out of `every`. Defaults to 100.
+            output (Optional[str], optional): File the aggregated stats are dumped to. Defaults to None.
+        """
+        if every < 1:
+            raise ValueError("\033[91m#bugs\033[0m 'every' must be at least 1.")
+        self.operation = operation
+        self.every = every
+        self.output = output
+        self.calls = 0
+        self.samples = 0
+        self.stats: Optional['pstats.Stats'] = None
+        self._lock = threading.Lock()
+
+    def should_sample(self) -> bool:
+        with self._lock:
+            self.calls += 1
+            return self.calls % self.every == 0
+
+    def run(self, func: Callable, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        """
+        Calls func under cProfile and merges the profile into the aggregate.
+        """
+        # Only one profiler can be active per thread; nested sampled calls run unprofiled.
+        if getattr(_active, 'profiling', False):
+            return func(*args, **kwargs)
+        import cProfile
+        import pstats
+        _active.profiling = True
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(func, *args, **kwargs)
+        finally:
+            _active.profiling = False
+            with self._lock:
+                if self.stats is None:
+                    self.stats = pstats.Stats(profile)
+                else:
+                    self.stats.add(profile)
+                self.samples += 1
+                if self.output:
+                    self.stats.dump_stats(self.output)
+
+    def dump(self, path: Optional[str] = None) -> None:
+        """
+        Writes the aggregated stats to `path` (defaults to `output`).
+        """
+        path = path or self.output
+        with self._lock:
+            if self.stats is not None and path:
+                self.stats.dump_stats(path)
+
+def _json_size(value: Any) -> Optional[int]:
+    if not isinstance(value, (dict, list)):
+        return None
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError, RecursionError):
+        return None
+
+def call_key(func: Callable, args: Tuple, kwargs: Dict[str, Any]) -> Optional[str]:
+    """
+    Returns the key path an operation call works on, from its arguments bound by name, or None.
+    """
+    try:
+        bound = inspect.signature(func).bind_partial(*args, **kwargs).arguments
+    except (TypeError, ValueError):
+        return None
+    for name in KEY_ARGUMENTS:
+        key = bound.get(name)
+        if isinstance(key, str):
+            item_id = bound.get('item_id') if name == 'collection_name' else None
+            return f"{key}/{item_id}" if isinstance(item_id, str) else key
+    return None
+
+def describe_call(func: Callable, args: Tuple, kwargs: Dict[str, Any], result: Any) -> Dict[str, Any]:
+    """
+    Extracts the key path and payload sizes of an operation call for the slow-op log.
+    """
+    key = call_key(func, args, kwargs)
+    payload = [size for size in (_json_size(a) for a in list(args) + list(kwargs.values())) if size is not None]
+    return {
+        "key": key,
+        "payload_bytes": sum(payload) if payload else None,
+        "result_bytes": _json_size(result),
+    }
+
+def slow_op_entry(operation: str, func: Callable, args: Tuple, kwargs: Dict[str, Any], result: Any,
+                  elapsed: float, phases: Dict[str, float], failed: bool) -> Dict[str, Any]:
+    """
+    Builds one slow-op record: operation, key path, payload sizes and the per-phase breakdown.
+    """
+    entry = {"ts": time.time(), "op": operation, "duration_s": elapsed}
+    entry.update(describe_call(func, args, kwargs, result))
+    entry["phases"] = phases
+    entry["failed"] = failed
+    return entry
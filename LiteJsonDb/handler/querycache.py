@@ -0,0 +1,127 @@
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+class CachedResult:
+    __slots__ = ('result', 'generation', 'size')
+
+    def __init__(self, result: Any, generation: int, size: int):
+        self.result = result
+        self.generation = generation
+        self.size = size
+
+class QueryCache:
+    """
+    Caches query results (search_data) until the data they read changes.
+
+    Every top level key has a generation counter, bumped by each change below it (all
+    mutations go through _notify_change), and the database has one bumped by every change.
+    A result remembers the generation of what it read: the key it was scoped to, or the
+    whole database. It is served only while that generation is unchanged, so a write to
+    "orders" doesn't invalidate queries on "users".
+
+    The cache is bounded by a number of entries and, optionally, by the total JSON size of
+    the results; the least recently used results are evicted first.
+    """
+    def __init__(self, query_cache: int = 0, query_cache_bytes: Optional[int] = None):
+        """
+        Initializes the query cache.
+
+        Args:
+            query_cache (int, optional): Maximum number of cached results. Defaults to 0 (disabled).
+            query_cache_bytes (Optional[int], optional): Maximum total JSON size of the cached results.
+                Defaults to None (only bounded by the number of entries).
+        """
+        self.query_cache = query_cache
+        self.query_cache_bytes = query_cache_bytes
+        self._query_cache: Optional["OrderedDict[Hashable, CachedResult]"] = OrderedDict() if query_cache else None
+        self._query_cache_size = 0
+        self._generations: Dict[str, int] = {}
+        self._db_generation = 0
+        self._query_stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0}
+
+    def _cached_query(self, scope: Optional[str], query: Tuple, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the cached result of a query, or computes and caches it.
+
+        Args:
+            scope (Optional[str]): The top level key the query reads, None for the whole database.
+            query (Tuple): The query name and every parameter that changes its result.
+            compute (Callable[[], Any]): Runs the query.
+
+        Returns:
+            Any: The result. Dictionaries are returned as shallow copies, so callers may modify them.
+        """
+        cache = self._query_cache
+        if cache is None:
+            return compute()
+        try:
+            entry = cache.get(query)
+        except TypeError:
+            # Unhashable parameters (e.g. searching for a list): not cacheable.
+            return compute()
+        generation = self._db_generation if scope is None else self._generations.get(scope, 0)
+        if entry is not None:
+            if entry.generation == generation:
+                cache.move_to_end(query)
+                self._query_stats["hits"] += 1
+                return dict(entry.result) if isinstance(entry.result, dict) else entry.result
+            self._query_stats["stale"] += 1
+            self._drop_query(query)
+        self._query_stats["misses"] += 1
+        result = compute()
+        stored = dict(result) if isinstance(result, dict) else result
+        size = len(json.dumps(stored, default=str))
+        if self.query_cache_bytes is None or size <= self.query_cache_bytes:
+            cache[query] = CachedResult(stored, generation, size)
+            self._query_cache_size += size
+            self._evict_queries()
+        return result
+
+    def _drop_query(self, query: Hashable) -> None:
+        entry = self._query_cache.pop(query)
+        self._query_cache_size -= entry.size
+
+    def _evict_queries(self) -> None:
+        cache = self._query_cache
+        while len(cache) > self.query_cache or (
+                self.query_cache_bytes is not None and self._query_cache_size > self.query_cache_bytes):
+            _, entry = cache.popitem(last=False)
+            self._query_cache_size -= entry.size
+            self._query_stats["evictions"] += 1
+
+    def _bump_generation(self, parts: Tuple[str, ...]) -> None:
+        """
+        Invalidates the results that read a changed path. Called by _notify_change.
+        """
+        self._db_generation += 1
+        if parts:
+            self._generations[parts[0]] = self._generations.get(parts[0], 0) + 1
+        else:
+            self.clear_query_cache()
+
+    def clear_query_cache(self) -> None:
+        """
+        Drops every cached result.
+        """
+        if self._query_cache is not None:
+            self._query_cache.clear()
+            self._query_cache_size = 0
+
+    def query_cache_stats(self) -> Dict[str, Any]:
+        """
+        Returns the query cache statistics.
+
+        Returns:
+            Dict[str, Any]: {"enabled", "entries", "bytes", "hits", "misses", "stale" (misses caused by a
+            change to the data read), "evictions", "hit_rate"}.
+        """
+        stats = dict(self._query_stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({
+            "enabled": self._query_cache is not None,
+            "entries": len(self._query_cache) if self._query_cache is not None else 0,
+            "bytes": self._query_cache_size,
+            "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+        })
+        return stats
@@ -0,0 +1,227 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# A validator appends "path: problem" messages to `errors`; partial=True skips required fields (edits).
+Validator = Callable[[Any, str, List[str], bool], None]
+
+NoneType = type(None)
+
+_MISSING = object()
+
+TYPE_NAMES = {
+    'str': (str,), 'int': (int,), 'float': (int, float), 'number': (int, float),
+    'bool': (bool,), 'list': (list,), 'dict': (dict,), 'null': (NoneType,), 'any': None,
+}
+
+def _type_name(value: Any) -> str:
+    return 'null' if value is None else type(value).__name__
+
+def _scalar(spec: Any) -> Optional[Tuple[type, ...]]:
+    """
+    Returns the accepted types of a scalar spec (a type or a type name), None for "any".
+    """
+    if isinstance(spec, str):
+        if spec not in TYPE_NAMES:
+            raise ValueError(f"\033[91m#bugs\033[0m Unknown schema type '{spec}'. Use one of {list(TYPE_NAMES)} or a Python type.")
+        return TYPE_NAMES[spec]
+    if spec is None or spec is NoneType:
+        return (NoneType,)
+    if spec is float:
+        return (int, float)
+    if isinstance(spec, type):
+        return (spec,)
+    raise ValueError(f"\033[91m#bugs\033[0m Invalid schema spec {spec!r}.")
+
+def compile_schema(spec: Any) -> Validator:
+    """
+    Compiles a declarative schema into a validator function.
+
+    Specs:
+        - a type or type name: str, int, float (accepts ints), bool, list, dict, None,
+          or "str", "int", "float", "number", "bool", "list", "dict", "null", "any"
+        - a dict: a nested object; its keys are required unless they end with "?"
+        - a list with one spec: a list whose items all match it ([str], [{"id": int}])
+        - a tuple of specs: any of them matches ((int, None) is a nullable int)
+
+    Returns:
+        Validator: check(value, path, errors, partial).
+    """
+    if isinstance(spec, dict):
+        fields = []
+        for key, field_spec in spec.items():
+            optional = key.endswith('?')
+            check = compile_schema(field_spec)
+            # Plain type checks are inlined below; the nested validator only runs to report the error.
+            fields.append((key[:-1] if optional else key, check, getattr(check, 'accepted', None),
+                           getattr(check, 'accepts_bool', True)))
+        required = [key[:-1] if key.endswith('?') else key for key in spec if not key.endswith('?')]
+
+        def check_object(value, path, errors, partial):
+            if type(value) is not dict:
+                errors.append(f"{path or '<root>'}: expected dict, got {_type_name(value)}")
+                return
+            if not partial:
+                for name in required:
+                    if name not in value:
+                        errors.append(f"{path}/{name}: missing required field" if path else f"{name}: missing required field")
+            for name, check, accepted, accepts_bool in fields:
+                item = value.get(name, _MISSING)
+                if item is _MISSING:
+                    continue
+                if accepted is not None and isinstance(item, accepted) and (accepts_bool or type(item) is not bool):
+                    continue
+                check(item, f"{path}/{name}" if path else name, errors, partial)
+        check_object.fields = {name: check for name, check, _, _ in fields}
+        return check_object
+
+    if isinstance(spec, list):
+        if len(spec) != 1:
+            raise ValueError(f"\033[91m#bugs\033[0m A list schema has exactly one item spec, e.g. [str]; got {spec!r}.")
+        check_item = compile_schema(spec[0])
+        accepted = getattr(check_item, 'accepted', None)
+        accepts_bool = getattr(check_item, 'accepts_bool', True)
+
+        def check_list(value, path, errors, partial):
+            if type(value) is not list:
+                errors.append(f"{path or '<root>'}: expected list, got {_type_name(value)}")
+                return
+            for i, item in enumerate(value):
+                if accepted is not None and isinstance(item, accepted) and (accepts_bool or type(item) is not bool):
+                    continue
+                check_item(item, f"{path}/{i}", errors, False)
+        return check_list
+
+    if isinstance(spec, tuple):
+        if all(not isinstance(option, (dict, list, tuple)) for option in spec):
+            scalars = [_scalar(option) for option in spec]
+            if None in scalars:
+                return compile_schema('any')
+            # A union of plain types is a single isinstance check.
+            return _check_types(tuple(t for accepted in scalars for t in accepted))
+        options = [compile_schema(option) for option in spec]
+
+        def check_any(value, path, errors, partial):
+            failures = []
+            for option in options:
+                attempt = []
+                option(value, path, attempt, partial)
+                if not attempt:
+                    return
+                failures.extend(attempt)
+            errors.append(f"{path or '<root>'}: matches none of the allowed types ({'; '.join(failures)})")
+        return check_any
+
+    accepted = _scalar(spec)
+    if accepted is None:
+        def check_anything(value, path, errors, partial):
+            pass
+        check_anything.accepted = object
+        return check_anything
+    return _check_types(accepted)
+
+def _check_types(accepted: Tuple[type, ...]) -> Validator:
+    accepted = tuple(dict.fromkeys(accepted))
+    accepts_bool = bool in accepted
+    expected = '|'.join(t.__name__ for t in accepted).replace('NoneType', 'null')
+
+    def check_type(value, path, errors, partial):
+        # bool is a subclass of int, but True is not a valid int field.
+        if not isinstance(value, accepted) or (not accepts_bool and type(value) is bool):
+            errors.append(f"{path or '<root>'}: expected {expected}, got {_type_name(value)}")
+    check_type.accepted = accepted
+    check_type.accepts_bool = accepts_bool
+    return check_type
+
+class Schemas:
+    """
+    Optional per-collection schemas, compiled once into validator functions.
+
+    When a collection has a schema, writes to its items are checked against it (nested
+    values included) instead of the generic validate_data scan, and every problem is
+    reported at once.
+    """
+    def __init__(self):
+        """
+        Initializes the schema registry.
+        """
+        self._schemas: Dict[str, Validator] = {}
+
+    def set_schema(self, collection: str, schema: Dict[str, Any]) -> None:
+        """
+        Declares the schema of the items of a collection.
+
+        Example:
+            db.set_schema("users", {"name": str, "age": int, "email?": (str, None),
+                                    "tags": [str], "address": {"city": str, "zip?": str}})
+
+        Args:
+            collection (str): The collection name.
+            schema (Dict[str, Any]): The item schema (see compile_schema). Keys ending with "?" are optional.
+
+        Raises:
+            ValueError: If the schema is invalid.
+        """
+        if not isinstance(schema, dict):
+            raise ValueError("\033[91m#bugs\033[0m An item schema must be a dictionary of fields.")
+        self._schemas[collection] = compile_schema(schema)
+
+    def remove_schema(self, collection: str) -> None:
+        """
+        Removes the schema of a collection.
+
+        Args:
+            collection (str): The collection name.
+        """
+        self._schemas.pop(collection, None)
+
+    def validate(self, collection: str, value: Any, partial: bool = False) -> List[str]:
+        """
+        Checks a value against the schema of a collection's items.
+
+        Args:
+            collection (str): The collection name.
+            value (Any): The item to check.
+            partial (bool, optional): Skips the required fields check (as for edits). Defaults to False.
+
+        Returns:
+            List[str]: Every problem found ("path: problem"), empty if the value is valid or there is no schema.
+        """
+        check = self._schemas.get(collection)
+        errors: List[str] = []
+        if check is not None:
+            check(value, "", errors, partial)
+        return errors
+
+    def _schema_for(self, parts: Tuple[str, ...]) -> Optional[Validator]:
+        """
+        Finds the validator of a path: the item schema for "collection/id", a field's for deeper paths.
+        """
+        if len(parts) < 2:
+            return None
+        check = self._schemas.get(parts[0])
+        for part in parts[2:]:
+            if check is None:
+                return None
+            check = getattr(check, 'fields', {}).get(part)
+        return check
+
+    def _validate_write(self, parts: Tuple[str, ...], value: Any, partial: bool = False) -> bool:
+        """
+        Validates a write: with the schema of the path if there is one, with validate_data otherwise.
+
+        Args:
+            parts (Tuple[str, ...]): The written path.
+            value (Any): The written value.
+            partial (bool, optional): The value is merged into the current one (edits). Defaults to False.
+
+        Returns:
+            bool: True if the write may proceed. Schema violations are logged, all at once.
+        """
+        check = self._schema_for(parts) if self._schemas else None
+        if check is None:
+            return self.validate_data(value)
+        errors: List[str] = []
+        check(value, '/'.join(parts[1:]), errors, partial)
+        if errors:
+            self.logger.error("\033[91m#bugs\033[0m '%s' doesn't match the '%s' schema: %s", '/'.join(parts), parts[0], "; ".join(errors))
+            return False
+        return True
@@ -1,3 +1,19 @@
+import importlib
+
 from .csv import CSVExporter
 from .search import search_data
 from .tgbot import BackupToTelegram
+
+# The networking modules (and the socket stack) are imported on first access.
+_LAZY = {
+    'ChangeFeedServer': 'replication', 'ReplicaFollower': 'replication',
+    'JsonDBServer': 'server', 'JsonDBClient': 'server', 'ServerError': 'server',
+}
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
@@ -1,4 +1,3 @@
-import csv
 import os
 import logging
 from typing import Dict, Any, Union
@@ -31,6 +30,7 @@ class CSVExporter:
         Returns:
             str: The path to the created CSV file, or an empty string if the export failed.
         """
+        import csv
         filepath = os.path.join(self.database_dir, filename)
         try:
             with open(filepath, mode="w", newline='', encoding="utf-8") as csv_file:
@@ -43,5 +43,5 @@ class CSVExporter:
                     writer.writerows(data if isinstance(data, list) else [data])
             return filepath
         except Exception as e:
-            logging.getLogger('LiteJsonDb').error(f"\033[91m#bugs\033[0m CSV export error: {e}")
+            logging.getLogger('LiteJsonDb').error("\033[91m#bugs\033[0m CSV export error: %s", e)
             return ""
\ No newline at end of file
@@ -0,0 +1,307 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional, Union
+
+from ..handler.changefeed import REMOVE_ACTIONS
+from ..handler.keypath import MISSING, compile_key, resolve
+from .search import search_data
+
+HEARTBEAT_INTERVAL = 1.0
+
+def _send_line(sock: socket.socket, line: str) -> None:
+    sock.sendall(line.encode('utf-8') + b"\n")
+
+class ChangeFeedServer:
+    """
+    Streams a JsonDB change feed to followers over a local Unix-domain socket.
+
+    The protocol is newline-delimited JSON. A follower sends one hello line
+    {"since": <seq>, "epoch": <epoch or null>}; the server answers with a snapshot
+    when the follower can't be caught up from the retained changes (first
+    connection, buffer overrun, or a leader restart detected through the epoch),
+    then streams change lines and periodic heartbeats carrying the leader's
+    sequence number.
+    """
+    def __init__(self, db, address: str, heartbeat: float = HEARTBEAT_INTERVAL):
+        """
+        Initializes the server. Call start() to begin accepting followers.
+
+        Args:
+            db (JsonDB): The database whose change feed is published. Its change_feed option must be enabled.
+            address (str): The Unix socket path to listen on.
+            heartbeat (float, optional): Seconds between heartbeats on an idle connection. Defaults to 1.0.
+        """
+        if db._change_feed is None:
+            raise ValueError("\033[91m#bugs\033[0m Change feed is disabled. Create the database with change_feed=<buffer size>.")
+        self.db = db
+        self.feed = db._change_feed
+        self.address = address
+        self.heartbeat = heartbeat
+        self.logger = logging.getLogger('LiteJsonDb')
+        self._sock = None
+        self._closed = threading.Event()
+        self._threads = []
+
+    def start(self) -> "ChangeFeedServer":
+        """
+        Binds the socket and starts accepting followers on a background thread.
+
+        Returns:
+            ChangeFeedServer: The server itself.
+        """
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.address)
+        self._sock.listen()
+        thread = threading.Thread(target=self._accept_loop, name='LiteJsonDb-feed', daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return self
+
+    def close(self) -> None:
+        """
+        Stops the server and disconnects followers.
+        """
+        self._closed.set()
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def serve_connection(self, conn: socket.socket) -> None:
+        """
+        Serves one already-connected follower until it disconnects (used for socket pairs and pipes too).
+
+        Args:
+            conn (socket.socket): The connected socket.
+        """
+        try:
+            hello = json.loads(conn.makefile('r', encoding='utf-8').readline() or '{}')
+            seq = int(hello.get("since") or 0)
+            if hello.get("epoch") != self.db.change_epoch or seq > self.feed.seq:
+                seq = self._send_snapshot(conn)
+            last_beat = 0.0
+            while not self._closed.is_set():
+                lines, gap = self.feed.read_after(seq, timeout=self.heartbeat)
+                if gap:
+                    seq = self._send_snapshot(conn)
+                    continue
+                if lines:
+                    conn.sendall(("\n".join(lines) + "\n").encode('utf-8'))
+                    seq += len(lines)
+                now = time.time()
+                if now - last_beat >= self.heartbeat:
+                    _send_line(conn, json.dumps({"type": "heartbeat", "seq": self.feed.seq, "ts": now}))
+                    last_beat = now
+        except (OSError, ValueError) as e:
+            if not self._closed.is_set():
+                self.logger.info("Follower disconnected: %s", e)
+        finally:
+            conn.close()
+
+    def _send_snapshot(self, conn: socket.socket) -> int:
+        while True:
+            seq = self.feed.seq
+            try:
+                data = json.dumps(self.db.db)
+            except RuntimeError:
+                # The database changed while it was being encoded; try again.
+                continue
+            _send_line(conn, json.dumps({"type": "snapshot", "seq": seq, "epoch": self.db.change_epoch, "ts": time.time()})[:-1] + ', "data": ' + data + "}")
+            return seq
+
+    def _accept_loop(self) -> None:
+        while not self._closed.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            thread = threading.Thread(target=self.serve_connection, args=(conn,), name='LiteJsonDb-feed-conn', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+class ReplicaFollower:
+    """
+    Keeps an in-memory, read-only replica of a JsonDB in sync with its change feed.
+
+    Reads (get_data, key_exists, get_subcollection, search_data) are served from the
+    replica without touching the database file.
+    """
+    def __init__(self, source: Union[str, socket.socket], since: int = 0, epoch: Optional[str] = None,
+                 data: Optional[Dict[str, Any]] = None):
+        """
+        Connects to a leader and starts applying changes on a background thread.
+
+        Args:
+            source (Union[str, socket.socket]): The leader's Unix socket path, or an already-connected socket.
+            since (int, optional): Catch up from this sequence number. Defaults to 0 (full snapshot).
+            epoch (Optional[str], optional): The leader epoch `since` belongs to. A mismatch forces a snapshot.
+            data (Optional[Dict[str, Any]], optional): The replica state at `since`, e.g. the db of a previous
+                follower being resumed: ReplicaFollower(path, old.seq, old.epoch, old.db).
+        """
+        self.db: Dict[str, Any] = data if data is not None else {}
+        self.seq = since
+        self.epoch = epoch
+        self.leader_seq = since
+        self.last_change_ts: Optional[float] = None
+        self.last_contact_ts: Optional[float] = None
+        self.logger = logging.getLogger('LiteJsonDb')
+        self._lock = threading.RLock()
+        self._cond = threading.Condition(self._lock)
+        self._closed = False
+
+        if isinstance(source, str):
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.connect(source)
+        else:
+            self._sock = source
+        _send_line(self._sock, json.dumps({"since": since, "epoch": epoch}))
+        self._reader = self._sock.makefile('r', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name='LiteJsonDb-follower', daemon=True)
+        self._thread.start()
+
+    def _apply(self, message: Dict[str, Any]) -> None:
+        kind = message.get("type")
+        with self._cond:
+            self.last_contact_ts = time.time()
+            if kind == "snapshot":
+                self.db = message["data"]
+                self.seq = self.leader_seq = message["seq"]
+                self.epoch = message["epoch"]
+            elif kind == "change":
+                if message["seq"] <= self.seq:
+                    return
+                path = message["path"]
+                if not path:
+                    self.db = message["value"] if message["op"] not in REMOVE_ACTIONS else {}
+                elif message["op"] in REMOVE_ACTIONS:
+                    parent = resolve(self.db, tuple(path[:-1]))
+                    if isinstance(parent, dict):
+                        parent.pop(path[-1], None)
+                else:
+                    parent = self.db
+                    for k in path[:-1]:
+                        child = parent.get(k)
+                        if not isinstance(child, dict):
+                            child = parent[k] = {}
+                        parent = child
+                    parent[path[-1]] = message["value"]
+                self.seq = message["seq"]
+                self.leader_seq = max(self.leader_seq, self.seq)
+                self.last_change_ts = message["ts"]
+            elif kind == "heartbeat":
+                self.leader_seq = max(self.leader_seq, message["seq"])
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        try:
+            for line in self._reader:
+                self._apply(json.loads(line))
+        except (OSError, ValueError) as e:
+            if not self._closed:
+                self.logger.error("\033[91m#bugs\033[0m Replication stream broke: %s", e)
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+
+    @property
+    def connected(self) -> bool:
+        """True while the replication stream is open."""
+        return not self._closed
+
+    def lag(self) -> Dict[str, Any]:
+        """
+        Reports how far the replica is behind the leader.
+
+        Returns:
+            Dict[str, Any]: "seq" (applied), "leader_seq" (last known leader position),
+                "seq_lag" (changes not applied yet), "time_lag" (seconds between the last
+                applied change and now when behind, else 0.0) and "since_contact"
+                (seconds since the leader was last heard from).
+        """
+        with self._lock:
+            now = time.time()
+            seq_lag = max(self.leader_seq - self.seq, 0)
+            time_lag = now - self.last_change_ts if seq_lag and self.last_change_ts else 0.0
+            return {
+                "seq": self.seq,
+                "leader_seq": self.leader_seq,
+                "seq_lag": seq_lag,
+                "time_lag": time_lag,
+                "since_contact": now - self.last_contact_ts if self.last_contact_ts else None,
+            }
+
+    def wait_for(self, seq: int, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until the replica has applied a given sequence number.
+
+        Args:
+            seq (int): The sequence number to wait for.
+            timeout (Optional[float], optional): Maximum time to wait in seconds. Defaults to None.
+
+        Returns:
+            bool: True if the replica caught up, False on timeout or disconnect.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq >= seq or self._closed, timeout)
+            return self.seq >= seq
+
+    def get_data(self, key: str) -> Optional[Any]:
+        """
+        Gets data from the replica by key (path separated by "/"). Returns None if it doesn't exist.
+        """
+        with self._lock:
+            value = resolve(self.db, compile_key(key))
+        return None if value is MISSING else value
+
+    def key_exists(self, key: str) -> bool:
+        """
+        Checks if a key exists in the replica (path separated by "/").
+        """
+        with self._lock:
+            return resolve(self.db, compile_key(key)) is not MISSING
+
+    def get_subcollection(self, collection_name: str, item_id: Optional[str] = None) -> Optional[Any]:
+        """
+        Gets a subcollection, or one of its items, from the replica.
+        """
+        with self._lock:
+            collection = self.db.get(collection_name, {})
+            if item_id is not None:
+                return collection.get(item_id)
+            return collection
+
+    def search_data(self, value: Any, key: Optional[str] = None, substring: bool = False, case_sensitive: bool = True) -> Dict[str, Any]:
+        """
+        Searches the replica, with the same arguments as JsonDB.search_data.
+        """
+        with self._lock:
+            return search_data(self.db, value, key, substring=substring, case_sensitive=case_sensitive)
+
+    def close(self) -> None:
+        """
+        Stops replication and closes the connection.
+        """
+        self._closed = True
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        self._thread.join(1.0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
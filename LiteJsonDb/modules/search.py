@@ -7,9 +7,199 @@
 ╚═════╝░╚══════╝╚═╝░░╚═╝╚═╝░░╚═╝░╚════╝░╚═╝░░╚═╝╚═╝╚═╝░░░░░░░░╚═╝░░░
 """
 import logging
-from typing import Any, Dict, Optional
+import os
+import threading
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-def search_data(data: Dict[str, Any], search_value: Any, key: Optional[str] = None, substring: bool = False, case_sensitive: bool = True) -> Dict[str, Any]:
+# (searched value, its string form, substring search, case-insensitive), see make_query.
+Query = Tuple[Any, str, bool, bool]
+
+# A slice of the search: (container, keys of the container to scan, path prefix of its entries).
+Task = Tuple[Dict[str, Any], List[str], str]
+
+# Below this many entries per task, splitting costs more than it saves.
+MIN_CHUNK = 256
+
+def make_query(value: Any, substring: bool = False, case_sensitive: bool = True) -> Query:
+    """
+    Prepares the searched value once, instead of converting it for every leaf.
+
+    Args:
+        value (Any): The value to search for.
+        substring (bool): If True, matches leaves containing the value. Defaults to False.
+        case_sensitive (bool): If False, compares lowercased strings. Defaults to True.
+
+    Returns:
+        Query: The prepared search.
+    """
+    needle = str(value)
+    return (value, needle if case_sensitive else needle.lower(), substring, not case_sensitive)
+
+def scan(entries: Iterable[Tuple[Any, Any]], prefix: str, query: Query, results: Dict[str, Any],
+         limit: Optional[int] = None, stop: Any = None, in_list: bool = False) -> None:
+    """
+    Walks the entries with an explicit stack and adds the matching leaves to `results`.
+
+    Nested dictionaries are searched, as are lists directly inside a list (or at the root of a key search);
+    any other value, lists held by a dictionary included, is a leaf compared with the query. Paths are only
+    built for matches: each level keeps the "/"-terminated prefix of its entries.
+
+    Args:
+        entries (Iterable[Tuple[Any, Any]]): The (key, value) pairs to scan, e.g. data.items().
+        prefix (str): The path prefix of the entries ("" at the root).
+        query (Query): The prepared search (see make_query).
+        results (Dict[str, Any]): Receives path -> value for every match.
+        limit (Optional[int], optional): Stops after this many results. Defaults to None.
+        stop (Any, optional): An Event; the scan stops soon after it is set. Defaults to None.
+        in_list (bool, optional): The entries are (index, item) pairs of a list. Defaults to False.
+    """
+    value, needle, substring, fold = query
+    stack = [(iter(entries), prefix, in_list)]
+    descents = 0
+    while stack:
+        items, prefix, in_list = stack.pop()
+        for k, v in items:
+            if isinstance(v, dict):
+                child = (iter(v.items()), f"{prefix}{k}/", False)
+            elif in_list:
+                if not isinstance(v, list):
+                    continue
+                child = (iter(enumerate(v)), f"{prefix}{k}/", True)
+            else:
+                # The leaf test is inlined: a function call per leaf would double the scan time.
+                if substring:
+                    if needle not in (str(v).lower() if fold else str(v)):
+                        continue
+                elif not (value == v or needle == (str(v).lower() if fold else str(v))):
+                    continue
+                results[f"{prefix}{k}"] = v
+                if limit is not None and len(results) >= limit:
+                    return
+                continue
+            stack.append((items, prefix, in_list))
+            stack.append(child)
+            descents += 1
+            if stop is not None and not descents & 255 and stop.is_set():
+                return
+            break
+
+def plan_tasks(root: Dict[str, Any], prefix: str, chunk: int) -> List[Task]:
+    """
+    Splits a search over `root` into tasks of about `chunk` entries, in search order.
+
+    Small consecutive entries are grouped into one task and large dictionaries are split by keys,
+    so merging the task results in order gives the serial result.
+    """
+    tasks: List[Task] = []
+    group: List[str] = []
+    size = 0
+    for name, value in root.items():
+        n = len(value) if isinstance(value, dict) else 1
+        if n > chunk:
+            if group:
+                tasks.append((root, group, prefix))
+                group, size = [], 0
+            keys = list(value)
+            for start in range(0, n, chunk):
+                tasks.append((value, keys[start:start + chunk], f"{prefix}{name}/"))
+            continue
+        group.append(name)
+        size += n
+        if size >= chunk:
+            tasks.append((root, group, prefix))
+            group, size = [], 0
+    if group:
+        tasks.append((root, group, prefix))
+    return tasks
+
+# The state of the running parallel search: workers are forked after it is set and read it from
+# their copy of the memory, so the database is never pickled. Only the matches are sent back.
+_shared: Optional[Tuple[List[Task], Query, Optional[int], Any]] = None
+_shared_lock = threading.Lock()
+
+def _run_task(index: int) -> List[Tuple[str, Any]]:
+    tasks, query, limit, stop = _shared
+    container, keys, prefix = tasks[index]
+    results: Dict[str, Any] = {}
+    scan(((k, container[k]) for k in keys), prefix, query, results, limit, stop)
+    return list(results.items())
+
+def can_fork() -> bool:
+    import multiprocessing
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+def fork_is_safe() -> bool:
+    """
+    Whether the workers can be forked now: the platform supports it and no other thread is running.
+
+    A forked process only copies the calling thread. A lock held by another thread (the log
+    listener, the observer dispatcher, a server) would stay locked in the workers forever, and
+    Python 3.12+ warns about such forks. The search then runs in this process.
+    """
+    return can_fork() and threading.active_count() == 1
+
+def parallel_scan(root: Dict[str, Any], query: Query, workers: int, limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Scans a dictionary on a pool of forked worker processes.
+
+    Results are merged in search order. With a limit, workers stop as soon as enough matches
+    were found, so the result holds `limit` matches but not necessarily the first ones.
+
+    Args:
+        root (Dict[str, Any]): The dictionary to search (the database, or one collection).
+        query (Query): The prepared search (see make_query).
+        workers (int): The number of worker processes.
+        limit (Optional[int], optional): The maximum number of results. Defaults to None.
+
+    Returns:
+        Dict[str, Any]: Path -> value of the matches (paths relative to `root`).
+    """
+    total = sum(len(value) if isinstance(value, dict) else 1 for value in root.values())
+    tasks = plan_tasks(root, '', max(MIN_CHUNK, total // (workers * 8)))
+    results: Dict[str, Any] = {}
+    if workers < 2 or len(tasks) < 2 or not fork_is_safe():
+        scan(root.items(), '', query, results, limit)
+        return results
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    global _shared
+    context = multiprocessing.get_context('fork')
+    stop = context.Event()
+    parts: Dict[int, List[Tuple[str, Any]]] = {}
+    with _shared_lock:
+        _shared = (tasks, query, limit, stop)
+        try:
+            pool = ProcessPoolExecutor(min(workers, len(tasks)), mp_context=context)
+            futures: Dict[Any, int] = {}
+            try:
+                futures = {pool.submit(_run_task, index): index for index in range(len(tasks))}
+                found = 0
+                for future in as_completed(futures):
+                    parts[futures[future]] = future.result()
+                    found += len(parts[futures[future]])
+                    if limit is not None and found >= limit:
+                        stop.set()
+                        break
+            finally:
+                # Tasks not started yet are dropped (shutdown's cancel_futures needs Python 3.9).
+                for future in futures:
+                    future.cancel()
+                pool.shutdown(wait=True)
+        finally:
+            _shared = None
+    for index in sorted(parts):
+        for path, value in parts[index]:
+            results[path] = value
+            if limit is not None and len(results) >= limit:
+                return results
+    return results
+
+def search_data(data: Dict[str, Any], search_value: Any, key: Optional[str] = None, substring: bool = False,
+                case_sensitive: bool = True, limit: Optional[int] = None, workers: Optional[int] = 1,
+                logger: Optional[logging.Logger] = None) -> Dict[str, Any]:
     """
     Search for a value in a nested dictionary or within a specific key.
 
@@ -19,52 +209,36 @@ def search_data(data: Dict[str, Any], search_value: Any, key: Optional[str] = No
         key (Optional[str]): If provided, search within this specific key.
         substring (bool): If True, perform substring search. Defaults to False.
         case_sensitive (bool): If False, perform case-insensitive search. Defaults to True.
+        limit (Optional[int]): Stop after this many matches. Defaults to None (all matches).
+        workers (Optional[int]): Worker processes scanning parts of the data concurrently (where processes
+            can be forked, and while no other thread runs); None uses every core. Defaults to 1 (search in
+            this process).
+        logger (Optional[logging.Logger]): Where to report missing keys and empty results. Defaults to the
+            'LiteJsonDb' logger.
 
     Returns:
         Dict[str, Any]: A dictionary containing matching results.
     """
-    results = {}
-
-    def search_recursive(d: Any, value: Any, current_key: str = ''):
-        """
-        Recursively search through the dictionary.
-
-        Args:
-            d (Any): The dictionary to search through.
-            value (Any): The value to search for.
-            current_key (str): The current path of keys being traversed.
-        """
-        if isinstance(d, dict):
-            for k, v in d.items():
-                new_key = f"{current_key}/{k}" if current_key else k
-                if isinstance(v, dict):
-                    search_recursive(v, value, new_key)
-                else:
-                    str_v = str(v)
-                    search_str = str(value)
-                    if not case_sensitive:
-                        str_v = str_v.lower()
-                        search_str = search_str.lower()
-                    if substring:
-                        if search_str in str_v:
-                            results[new_key] = v
-                    else:
-                        if value == v or search_str == str_v:
-                            results[new_key] = v
-        elif isinstance(d, list):
-            for index, item in enumerate(d):
-                search_recursive(item, value, f"{current_key}/{index}")
-
-    logger = logging.getLogger('LiteJsonDb')
+    results: Dict[str, Any] = {}
+    logger = logger or logging.getLogger('LiteJsonDb')
+    query = make_query(search_value, substring, case_sensitive)
+    workers = workers if workers is not None else os.cpu_count() or 1
+    root = data
     if key:
         if key not in data:
-            logger.error(f"\033[91m#bugs\033[0m Key '{key}' not found for search.")
+            logger.error("\033[91m#bugs\033[0m Key '%s' not found for search.", key)
+            return results
+        root = data[key]
+    if isinstance(root, Mapping):
+        # Also a memory-mapped database (mmap mode), whose values are decoded as they are scanned.
+        if workers > 1:
+            results = parallel_scan(root, query, workers, limit)
         else:
-            search_recursive(data[key], search_value)
-    else:
-        search_recursive(data, search_value)
+            scan(root.items(), '', query, results, limit)
+    elif isinstance(root, list):
+        scan(enumerate(root), '/', query, results, limit, in_list=True)
 
     if not results:
-          logger.info(f"\033[90m#info\033[0m Value '{search_value}' not found.")
+          logger.info("\033[90m#info\033[0m Value '%s' not found.", search_value)
 
-    return results
\ No newline at end of file
+    return results
@@ -0,0 +1,352 @@
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Tuple
+
+# Frame layout: kind (1 byte), request id (4 bytes), payload length (4 bytes), then a compact JSON payload.
+HEADER = struct.Struct('!BII')
+KIND_CALL = 1      # payload: [method, args, kwargs]
+KIND_BATCH = 2     # payload: [[method, args, kwargs], ...], executed back to back
+KIND_RESULT = 3    # payload: the return value (a list of return values for a batch)
+KIND_ERROR = 4     # payload: the error message
+
+MAX_FRAME = 1 << 30
+
+# Methods a client may call. Anything else is rejected by the server.
+ALLOWED_METHODS = frozenset((
+    'get_data', 'set_data', 'edit_data', 'remove_data', 'key_exists', 'search_data',
+    'get_subcollection', 'set_subcollection', 'edit_subcollection', 'remove_subcollection',
+    'get_db', 'changes', 'set_ttl', 'get_ttl', 'purge_expired', 'metrics', 'slow_ops',
+    'aggregate', 'add_columns', 'column_select', 'column_aggregate',
+    'memory_report', 'bulk_set_subcollection', 'set_schema', 'remove_schema', 'validate',
+    'incr', 'incr_many', 'flush_counters', 'get_subcollection_page', 'patch',
+    'query_cache_stats', 'clear_query_cache',
+))
+
+_encode = json.JSONEncoder(separators=(',', ':')).encode
+
+class ServerError(Exception):
+    """
+    Raised on the client when the server rejects or fails a request.
+    """
+
+def _send_frame(sock: socket.socket, kind: int, request_id: int, payload: Any) -> None:
+    body = _encode(payload).encode('utf-8')
+    sock.sendall(HEADER.pack(kind, request_id, len(body)) + body)
+
+def _recv_exact(stream, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise ConnectionError("Connection closed by peer.")
+    return data
+
+def _recv_frame(stream) -> Tuple[int, int, Any]:
+    kind, request_id, length = HEADER.unpack(_recv_exact(stream, HEADER.size))
+    if length > MAX_FRAME:
+        raise ConnectionError(f"Frame too large: {length} bytes.")
+    return kind, request_id, json.loads(_recv_exact(stream, length)) if length else None
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        server = self.server
+        while True:
+            try:
+                kind, request_id, payload = _recv_frame(self.rfile)
+            except (ConnectionError, OSError, ValueError):
+                return
+            try:
+                if kind == KIND_CALL:
+                    result = server.execute([payload])[0]
+                elif kind == KIND_BATCH:
+                    result = server.execute(payload)
+                else:
+                    raise ServerError(f"Unknown frame kind: {kind}")
+                _send_frame(self.connection, KIND_RESULT, request_id, result)
+            except (ConnectionError, BrokenPipeError):
+                return
+            except Exception as e:
+                _send_frame(self.connection, KIND_ERROR, request_id, f"{type(e).__name__}: {e}")
+
+class JsonDBServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Hosts one JsonDB behind a Unix-domain socket so many processes share a single in-memory copy.
+
+    Every request is executed under one lock, so clients see the same consistency as
+    a single-threaded program using JsonDB directly. Clients may pipeline requests on
+    a connection; responses come back in order, tagged with the request id.
+    """
+    daemon_threads = True
+
+    def __init__(self, db, address: str):
+        """
+        Binds the socket. Call serve_forever() (or start()) to begin serving.
+
+        Args:
+            db (JsonDB): The database to host.
+            address (str): The Unix socket path to listen on.
+        """
+        if os.path.exists(address):
+            os.unlink(address)
+        self.db = db
+        self.address = address
+        self.lock = threading.RLock()
+        self.logger = logging.getLogger('LiteJsonDb')
+        socketserver.UnixStreamServer.__init__(self, address, _RequestHandler)
+
+    def execute(self, calls: List[List[Any]]) -> List[Any]:
+        """
+        Runs a list of [method, args, kwargs] calls in order under the server lock: no other
+        request runs in between. Calls are not rolled back: if one fails, the ones before it
+        stay applied (and saved), and the error is raised to the client.
+
+        Args:
+            calls (List[List[Any]]): The calls to run.
+
+        Returns:
+            List[Any]: One return value per call.
+
+        Raises:
+            ServerError: If a method is not allowed.
+        """
+        for method, _, _ in calls:
+            if method not in ALLOWED_METHODS:
+                raise ServerError(f"Method '{method}' is not available remotely.")
+        with self.lock:
+            return [getattr(self.db, method)(*args, **kwargs) for method, args, kwargs in calls]
+
+    def start(self) -> "JsonDBServer":
+        """
+        Serves requests on a background thread.
+
+        Returns:
+            JsonDBServer: The server itself.
+        """
+        threading.Thread(target=self.serve_forever, name='LiteJsonDb-server', daemon=True).start()
+        return self
+
+    def server_close(self) -> None:
+        socketserver.UnixStreamServer.server_close(self)
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+
+class _Connection:
+    def __init__(self, address: str, timeout: Optional[float]):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(address)
+        self.reader = self.sock.makefile('rb')
+        self.next_id = 0
+
+    def send(self, kind: int, payload: Any) -> int:
+        self.next_id = (self.next_id + 1) & 0xFFFFFFFF
+        _send_frame(self.sock, kind, self.next_id, payload)
+        return self.next_id
+
+    def send_many(self, frames: List[Tuple[int, Any]]) -> List[int]:
+        ids, chunks = [], []
+        for kind, payload in frames:
+            self.next_id = (self.next_id + 1) & 0xFFFFFFFF
+            body = _encode(payload).encode('utf-8')
+            chunks.append(HEADER.pack(kind, self.next_id, len(body)))
+            chunks.append(body)
+            ids.append(self.next_id)
+        self.sock.sendall(b''.join(chunks))
+        return ids
+
+    def receive(self, request_id: int) -> Any:
+        kind, response_id, payload = _recv_frame(self.reader)
+        if response_id != request_id:
+            raise ConnectionError(f"Out of order response {response_id}, expected {request_id}.")
+        if kind == KIND_ERROR:
+            raise ServerError(payload)
+        return payload
+
+    def close(self) -> None:
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+class ConnectionPool:
+    """
+    A thread-safe pool of connections to a JsonDBServer.
+    """
+    def __init__(self, address: str, size: int = 4, timeout: Optional[float] = 30.0):
+        """
+        Args:
+            address (str): The server's Unix socket path.
+            size (int, optional): Maximum number of open connections. Defaults to 4.
+            timeout (Optional[float], optional): Socket timeout in seconds. Defaults to 30.0.
+        """
+        self.address = address
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._all = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[_Connection]:
+        """
+        Borrows a connection; broken connections are discarded instead of returned to the pool.
+        """
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = _Connection(self.address, self.timeout)
+                with self._lock:
+                    self._all.append(conn)
+            try:
+                yield conn
+            except ServerError:
+                # A complete error frame was read, the connection is still usable.
+                self._idle.put(conn)
+                raise
+            except BaseException:
+                conn.close()
+                with self._lock:
+                    self._all.remove(conn)
+                raise
+            self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """
+        Closes every pooled connection.
+        """
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all = []
+        self._idle = queue.LifoQueue()
+
+class Pipeline:
+    """
+    Collects calls and sends them in one round trip.
+
+    With batch=False (pipelining) each call is its own request and the server runs
+    them one by one; with batch=True (batching) they are sent as one batch frame and
+    run back to back under the server lock. A batch is serialized, not rolled back: a
+    failing call doesn't undo the calls before it.
+    """
+    def __init__(self, client: "JsonDBClient", batch: bool = False):
+        self._client = client
+        self._batch = batch
+        self._calls = []
+        self.results: List[Any] = []
+
+    def __getattr__(self, method: str):
+        if method not in ALLOWED_METHODS:
+            raise AttributeError(method)
+        def queue_call(*args, **kwargs) -> "Pipeline":
+            self._calls.append([method, list(args), kwargs])
+            return self
+        return queue_call
+
+    def execute(self) -> List[Any]:
+        """
+        Sends the queued calls and returns their results in order.
+
+        Raises:
+            ServerError: If a call failed. In pipelined mode the other calls still ran; in a
+                batch the calls before it stay applied and the ones after it don't run.
+        """
+        calls, self._calls = self._calls, []
+        if not calls:
+            return []
+        with self._client.pool.connection() as conn:
+            if self._batch:
+                self.results = conn.receive(conn.send(KIND_BATCH, calls))
+                return self.results
+            ids = conn.send_many([(KIND_CALL, call) for call in calls])
+            results, error = [], None
+            for request_id in ids:
+                try:
+                    results.append(conn.receive(request_id))
+                except ServerError as e:
+                    error = error or e
+                    results.append(None)
+            self.results = results
+            if error is not None:
+                raise error
+            return results
+
+    def __enter__(self) -> "Pipeline":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.execute()
+
+class JsonDBClient:
+    """
+    Talks to a JsonDBServer with the same data API as JsonDB.
+
+    Example:
+        client = JsonDBClient("/tmp/litejsondb.sock")
+        client.set_data("users/1", {"name": "Aliou"})
+        with client.pipeline() as p:
+            p.get_data("users/1").get_subcollection("groups")
+        user, groups = p.results
+    """
+    def __init__(self, address: str, pool_size: int = 4, timeout: Optional[float] = 30.0):
+        """
+        Args:
+            address (str): The server's Unix socket path.
+            pool_size (int, optional): Maximum number of pooled connections. Defaults to 4.
+            timeout (Optional[float], optional): Socket timeout in seconds. Defaults to 30.0.
+        """
+        self.pool = ConnectionPool(address, pool_size, timeout)
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        """
+        Calls one database method on the server.
+
+        Raises:
+            ServerError: If the server rejects or fails the call.
+        """
+        with self.pool.connection() as conn:
+            return conn.receive(conn.send(KIND_CALL, [method, list(args), kwargs]))
+
+    def __getattr__(self, method: str):
+        if method not in ALLOWED_METHODS:
+            raise AttributeError(method)
+        def remote_call(*args, **kwargs):
+            return self.call(method, *args, **kwargs)
+        remote_call.__name__ = method
+        return remote_call
+
+    def pipeline(self) -> Pipeline:
+        """
+        Returns a pipeline: queued calls are sent together, and each one runs on its own on the server.
+        """
+        return Pipeline(self)
+
+    def batch(self) -> Pipeline:
+        """
+        Returns a batch: queued calls are sent together and run back to back on the server, with
+        no other request in between. Calls before a failing one are not rolled back.
+        """
+        return Pipeline(self, batch=True)
+
+    def close(self) -> None:
+        """
+        Closes the pooled connections.
+        """
+        self.pool.close()
+
+    def __enter__(self) -> "JsonDBClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,7 +1,5 @@
-import requests
 import os
 from datetime import datetime
-import platform
 
 class BackupToTelegram:
     """
@@ -43,6 +41,8 @@ class BackupToTelegram:
         Returns:
             bool: True if the file was successfully sent, False otherwise.
         """
+        # requests is slow to import: it is only loaded when a backup is sent.
+        import requests
         try:
             response = requests.post(self.api_url, data={'chat_id': self.chat_id, 'caption': caption, 'parse_mode': 'HTML'}, files=files)
             response_data = response.json()
@@ -89,6 +89,7 @@ class BackupToTelegram:
                 date_str = datetime.now().strftime("%-d/%-m/%Y at %H:%M")
                 
                 try:
+                    import platform
                     os_info = platform.system() + " " + platform.release()
                 except Exception:
                     os_info = "Unknown"
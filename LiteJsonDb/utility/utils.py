@@ -11,7 +11,6 @@ No need to thank me, but you can send cookies. 🍪 by submitting a PR( Pull Req
 """
 
 import json
-import hashlib
 import datetime
 import itertools
 from functools import wraps
@@ -57,6 +56,7 @@ def sort_data(data: List[Dict[str, Any]], key: Callable[[Dict[str, Any]], Any],
 
 def hash_password(password: str) -> str:
     """Turn your plain password into a cryptographic masterpiece using SHA-256. Hackers, beware!"""
+    import hashlib
     return hashlib.sha256(password.encode()).hexdigest()
 
 def check_password(stored_hash: str, password: str) -> bool:
@@ -0,0 +1,31 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from LiteJsonDb import JsonDB
+
+class DatabaseTestCase(unittest.TestCase):
+    """
+    Opens databases in a temporary directory, removed after each test. Databases opened with
+    open() are closed first.
+    """
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, True)
+
+    def open(self, filename: str = "db.json", **kwargs) -> JsonDB:
+        db = JsonDB(filename, base_dir=self.dir, **kwargs)
+        self.addCleanup(db.close)
+        return db
+
+    def path(self, filename: str = "db.json") -> str:
+        return os.path.join(self.dir, filename)
+
+    def saved(self, filename: str = "db.json"):
+        """
+        Returns the parsed contents of a database file.
+        """
+        with open(self.path(filename)) as file:
+            return json.load(file)
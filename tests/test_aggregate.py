@@ -0,0 +1,40 @@
+import unittest
+
+from tests import DatabaseTestCase
+
+METRICS = {"orders": "count", "revenue": ("sum", "total"), "average": ("avg", "total"),
+           "smallest": ("min", "total"), "biggest": ("max", "total")}
+
+class AggregateTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open()
+        orders = {"1": ("paid", 10), "2": ("paid", 30), "3": ("new", 5), "4": ("refunded", "n/a")}
+        for order_id, (status, total) in orders.items():
+            self.db.set_subcollection("orders", order_id, {"status": status, "total": total})
+
+    def test_group_by(self):
+        result = self.db.aggregate("orders", group_by="status", metrics=METRICS)
+        self.assertEqual(result["paid"], {"orders": 2, "revenue": 40, "average": 20, "smallest": 10, "biggest": 30})
+        self.assertEqual(result["refunded"]["orders"], 1)
+        self.assertIsNone(result["refunded"]["average"])
+        self.assertEqual(self.db.aggregate("orders"), {"count": 4})
+
+    def test_cached_aggregates_follow_changes(self):
+        self.db.aggregate("orders", group_by="status", metrics=METRICS, cache=True)
+        self.db.edit_subcollection("orders", "3", {"status": "paid", "total": 60})
+        self.db.remove_subcollection("orders", "1")
+        self.db.set_subcollection("orders", "5", {"status": "new", "total": 1})
+        self.db.edit_data("orders/5", {"increment": {"total": 2}})
+        cached = self.db.aggregate("orders", group_by="status", metrics=METRICS, cache=True)
+        self.assertEqual(cached, self.db.aggregate("orders", group_by="status", metrics=METRICS))
+        self.assertEqual(cached["paid"]["biggest"], 60)
+        self.db.remove_data("orders")
+        self.assertEqual(self.db.aggregate("orders", group_by="status", metrics=METRICS, cache=True), {})
+
+    def test_unknown_function(self):
+        with self.assertRaises(ValueError):
+            self.db.aggregate("orders", metrics={"middle": ("median", "total")})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+import threading
+import unittest
+
+from LiteJsonDb.handler import codec
+from tests import DatabaseTestCase
+
+DATA = {
+    "users": {str(i): {"name": f"user {i}", "tags": [i, "x\ny"], "nested": {"a": i}} for i in range(100)},
+    "small": {"v": 1},
+    "empty": {},
+    "numbers": {str(i): i for i in range(50)},
+}
+
+class ParallelCodecTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.min_chunk = codec.MIN_CHUNK
+        codec.MIN_CHUNK = 7
+        self.addCleanup(setattr, codec, "MIN_CHUNK", self.min_chunk)
+
+    def fill(self, db):
+        for key, value in DATA.items():
+            db.set_data(key, value)
+
+    def read(self, filename="db.json"):
+        with open(self.path(filename)) as file:
+            return file.read()
+
+    def test_parallel_save_matches_json_dumps(self):
+        db = self.open(serialize_workers=4)
+        self.fill(db)
+        self.assertEqual(self.read(), json.dumps(db.db, indent=4))
+
+    def test_encrypted_round_trip(self):
+        for method, key in (("base64", None), ("fernet", "k" * 32)):
+            options = {"crypted": True, "encryption_method": method}
+            if key:
+                options["encryption_key"] = key
+            for workers in (1, 4):
+                filename = f"{method}_{workers}.json"
+                db = self.open(filename, serialize_workers=workers, **options)
+                self.fill(db)
+                text = self.read(filename)
+                self.assertNotIn("user 1", text)
+                # Workers save one encrypted token per chunk, a single process one token.
+                self.assertIsInstance(json.loads(text), list if db._use_workers() else str)
+                for reader_workers in (1, 4):
+                    reader = self.open(filename, serialize_workers=reader_workers, **options)
+                    self.assertEqual(reader.db, db.db)
+                    self.assertEqual(list(reader.db["users"]), list(db.db["users"]))
+
+    def test_no_fork_while_threads_run(self):
+        stop = threading.Event()
+        thread = threading.Thread(target=stop.wait)
+        thread.start()
+        try:
+            db = self.open("crypted.json", serialize_workers=4, crypted=True)
+            self.assertFalse(db._use_workers())
+            self.fill(db)
+            self.assertIsInstance(json.loads(self.read("crypted.json")), str)
+            db = self.open(serialize_workers=4)
+            self.fill(db)
+            self.assertEqual(self.read(), json.dumps(db.db, indent=4))
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_workers_below_one_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.open(serialize_workers=0)
+
+if __name__ == "__main__":
+    unittest.main()
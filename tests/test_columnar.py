@@ -0,0 +1,32 @@
+import unittest
+
+from tests import DatabaseTestCase
+
+class ColumnarTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open()
+        for user_id, age, score in (("1", 17, 90), ("2", 25, 40), ("3", 29, 75), ("4", "old", 99)):
+            self.db.set_subcollection("users", user_id, {"age": age, "stats": {"score": score}})
+        self.db.add_columns("users", ["age", "stats/score"], use_numpy=False)
+
+    def test_select_and_aggregate(self):
+        self.assertEqual(sorted(self.db.column_select("users", {"age": (18, 30), "stats/score": (">", 50)})), ["3"])
+        self.assertEqual(self.db.column_aggregate("users", "age", "count"), 3)
+        self.assertEqual(self.db.column_aggregate("users", "age", "sum"), 71)
+        self.assertEqual(self.db.column_aggregate("users", "stats/score", "max", where={"age": ("<", 20)}), 90)
+
+    def test_columns_follow_changes(self):
+        self.db.edit_subcollection("users", "2", {"stats": {"score": 80}})
+        self.db.remove_subcollection("users", "3")
+        self.db.set_subcollection("users", "5", {"age": 20, "stats": {"score": 60}})
+        self.assertEqual(sorted(self.db.column_select("users", {"age": (18, 30), "stats/score": (">", 50)})), ["2", "5"])
+        self.db.remove_data("users")
+        self.assertEqual(self.db.column_select("users", {"age": (0, None)}), [])
+
+    def test_unknown_column(self):
+        with self.assertLogs(self.db.logger, "ERROR"):
+            self.assertEqual(self.db.column_select("users", {"height": 1}), [])
+
+if __name__ == "__main__":
+    unittest.main()
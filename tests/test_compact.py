@@ -0,0 +1,30 @@
+import json
+import unittest
+
+from tests import DatabaseTestCase
+
+class CompactTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.data = {"users": {str(i): {"name": f"user {i % 10}", "city": "Dakar", "age": i} for i in range(500)}}
+        with open(self.path(), "w") as file:
+            json.dump(self.data, file, indent=4)
+
+    def test_compact_records_are_plain_dicts(self):
+        db = self.open(compact=True)
+        self.assertEqual(db.db, self.data)
+        self.assertIs(type(db.get_data("users/1")), dict)
+        db.edit_subcollection("users", "1", {"extra": True})
+        self.assertTrue(db.get_data("users/1/extra"))
+        self.assertEqual(db.search_data("user 3", key="users", limit=1), {"3/name": "user 3"})
+        self.assertEqual(self.saved(), db.db)
+
+    def test_memory_report(self):
+        report = self.open(compact=True).memory_report()
+        self.assertEqual(report["collections"]["users"]["items"], 500)
+        self.assertTrue(report["compact"])
+        self.assertGreater(report["shapes"], 0)
+        self.assertLess(report["total_bytes"], self.open().memory_report()["total_bytes"])
+
+if __name__ == "__main__":
+    unittest.main()
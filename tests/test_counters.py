@@ -0,0 +1,87 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+from tests import DatabaseTestCase
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class CountersTest(DatabaseTestCase):
+    def test_increments_are_saved_by_the_next_operation_after_the_interval(self):
+        db = self.open(counter_flush_interval=0.05)
+        db.incr("pages/home", "views")
+        db.incr("pages/home", "views")
+        self.assertEqual(self.saved(), {})
+        time.sleep(0.06)
+        db.get_data("pages/home")
+        self.assertEqual(self.saved()["pages"]["home"]["views"], 2)
+
+    def test_close_saves_pending_increments(self):
+        db = self.open(counter_flush_interval=60)
+        db.incr_many({"a/b": {"x": 1, "y": 2}})
+        db.close()
+        self.assertEqual(self.open().get_data("a/b"), {"x": 1, "y": 2})
+
+    def test_exit_saves_pending_increments(self):
+        script = (
+            "from LiteJsonDb import JsonDB\n"
+            f"db = JsonDB('db.json', base_dir={self.dir!r}, counter_flush_interval=60)\n"
+            "db.set_data('x', {'a': 1})\n"
+            "for _ in range(5):\n"
+            "    db.incr('pages/home', 'views')\n"
+        )
+        subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True)
+        self.assertEqual(self.saved(), {"x": {"a": 1}, "pages": {"home": {"views": 5}}})
+
+    def test_concurrent_incr_and_writes(self):
+        # Large enough that a save takes several thread switches: an unlocked write during it
+        # raised "dictionary changed size during iteration".
+        with open(self.path(), "w") as file:
+            json.dump({"items": {str(i): {"value": i, "name": f"item {i}"} for i in range(3000)}}, file)
+        db = self.open(counter_flush_interval=0)
+        errors = []
+
+        def increment():
+            try:
+                for _ in range(40):
+                    db.incr("stats/hits", "n")
+            except Exception as e:
+                errors.append(e)
+
+        def write():
+            try:
+                for i in range(40):
+                    db.set_data(f"new/{i}", {"value": i})
+                    db.edit_data(f"items/{i}", {"value": -i})
+                    db.remove_subcollection("items", str(i + 1000))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=increment) for _ in range(3)] + [threading.Thread(target=write)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        saved = self.saved()
+        self.assertEqual(saved["stats"]["hits"]["n"], 120)
+        self.assertEqual(len(saved["new"]), 40)
+        self.assertEqual(len(saved["items"]), 2960)
+
+    def test_failed_save_keeps_increments_pending(self):
+        db = self.open(counter_flush_interval=60)
+        db.incr("pages/home", "views")
+        with mock.patch.object(db, "_write_db_file", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                db.flush_counters()
+        self.assertTrue(db._counters_dirty)
+        db.flush_counters()
+        self.assertEqual(self.saved()["pages"]["home"]["views"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import time
+import unittest
+
+from tests import DatabaseTestCase
+
+class ExpiryTest(DatabaseTestCase):
+    def test_ttl_survives_reopen(self):
+        db = self.open()
+        db.set_data("session", {"user": 1}, ttl=100)
+        ttl = self.open().get_ttl("session")
+        self.assertIsNotNone(ttl)
+        self.assertGreater(ttl, 99)
+
+    def test_expired_key_is_not_resurrected_by_set_ttl(self):
+        db = self.open(expiry_flush_interval=60)
+        db.set_data("a", {"v": 1}, ttl=0.05)
+        db.set_data("b", {"v": 2})
+        time.sleep(0.06)
+        db.set_ttl("b", 100)
+        reopened = self.open()
+        self.assertFalse(reopened.key_exists("a"))
+        self.assertIsNotNone(reopened.get_ttl("b"))
+
+    def test_expired_key_is_removed_after_reopen(self):
+        db = self.open()
+        db.set_data("a", {"v": 1}, ttl=0.05)
+        time.sleep(0.06)
+        self.assertFalse(self.open().key_exists("a"))
+
+    def test_purge_expired_persists_removals(self):
+        db = self.open(expiry_flush_interval=60)
+        db.set_data("a", {"v": 1}, ttl=0.05)
+        time.sleep(0.06)
+        db.purge_expired()
+        self.assertNotIn("a", self.open().db)
+
+    def test_cache_mode_evicts_least_recently_used(self):
+        db = self.open(max_items=2)
+        db.set_data("c/1", {"v": 1})
+        db.set_data("c/2", {"v": 2})
+        db.get_data("c/1")
+        db.set_data("c/3", {"v": 3})
+        self.assertTrue(db.key_exists("c/1"))
+        self.assertFalse(db.key_exists("c/2"))
+
+if __name__ == "__main__":
+    unittest.main()
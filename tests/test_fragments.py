@@ -0,0 +1,40 @@
+import json
+import unittest
+
+from tests import DatabaseTestCase
+
+class FragmentsTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open(fragment_cache=True)
+
+    def assertSavedLikeDumps(self):
+        self.db._save_db()
+        with open(self.path()) as file:
+            self.assertEqual(file.read(), json.dumps(self.db.db, indent=4))
+
+    def test_file_matches_json_dumps(self):
+        self.assertSavedLikeDumps()
+        self.db.set_data("odd", {"a\nb": "x\ny", "é": [1, 2.5, None, True, {}, []], "empty": {}, "l": [[], {"k": []}]})
+        self.db.bulk_set_subcollection("users", {str(i): {"name": f"user {i}", "tags": [i]} for i in range(50)})
+        self.assertSavedLikeDumps()
+        self.db.edit_data("users/3", {"name": "renamed"})
+        self.db.set_subcollection("users", "new", {"n": 1})
+        self.db.remove_subcollection("users", "4")
+        self.db.incr("users/5", "score")
+        self.assertSavedLikeDumps()
+        self.db.remove_data("odd")
+        self.assertSavedLikeDumps()
+        self.db.remove_data("users")
+        self.assertSavedLikeDumps()
+
+    def test_unchanged_collections_are_reused(self):
+        self.db.set_data("users", {"1": {"name": "Awa"}})
+        self.db.set_data("orders", {"1": {"total": 3}})
+        encoded = self.db._fragment_stats["encoded"]
+        self.db.edit_data("orders/1", {"total": 4})
+        self.assertEqual(self.db._fragment_stats["encoded"], encoded + 1)
+        self.assertSavedLikeDumps()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from LiteJsonDb.bench.startup import LAZY_MODULES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class LazyImportTest(unittest.TestCase):
+    def loaded_after(self, code):
+        check = f"import sys; {code}; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+        output = subprocess.run([sys.executable, "-c", check], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        return [module for module in output.strip().split(',') if module]
+
+    def test_import_loads_no_optional_module(self):
+        self.assertEqual(self.loaded_after("import LiteJsonDb"), [])
+
+    def test_lazy_names_resolve(self):
+        self.assertIn("socketserver", self.loaded_after("import LiteJsonDb; LiteJsonDb.JsonDBServer"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+from LiteJsonDb.handler.keypath import MISSING, compile_key, resolve, resolve_parent
+from tests import DatabaseTestCase
+
+class KeyPathTest(unittest.TestCase):
+    def test_resolvers(self):
+        data = {"users": {"1": {"name": "Awa", "email": None}}}
+        self.assertEqual(compile_key("users/1/name"), ("users", "1", "name"))
+        self.assertEqual(resolve(data, compile_key("users/1/name")), "Awa")
+        self.assertIsNone(resolve(data, compile_key("users/1/email")))
+        self.assertIs(resolve(data, compile_key("users/2/name")), MISSING)
+        self.assertIsNone(resolve_parent(data, compile_key("users/2/name")))
+        parent, leaf = resolve_parent(data, compile_key("users/2/name"), create=True)
+        self.assertEqual((parent, leaf), ({}, "name"))
+        self.assertIn("2", data["users"])
+
+class DataAccessTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open()
+
+    def test_nested_keys(self):
+        self.db.set_data("users/1", {"name": "Awa", "stats": {"visits": 1}})
+        self.assertEqual(self.db.get_data("users/1/name"), "Awa")
+        self.assertTrue(self.db.key_exists("users/1/stats/visits"))
+        self.assertFalse(self.db.key_exists("users/1/stats/missing"))
+        self.db.edit_data("users/1", {"stats": {"likes": 2}})
+        self.assertEqual(self.db.get_data("users/1/stats"), {"visits": 1, "likes": 2})
+        self.db.remove_data("users/1/stats")
+        self.assertEqual(self.db.get_data("users/1"), {"name": "Awa"})
+
+if __name__ == "__main__":
+    unittest.main()
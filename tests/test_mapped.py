@@ -0,0 +1,98 @@
+import json
+import unittest
+
+from LiteJsonDb.handler.mapped import MIN_INDEXED_ITEMS, MappedDatabase, encode_indexed
+from tests import DatabaseTestCase
+
+USERS = {str(i): {"name": f"user{i}", "age": 20 + i % 7, "city": "Dakar" if i % 2 else "Thiès", "tags": ["a\nb", i]}
+         for i in range(MIN_INDEXED_ITEMS * 2)}
+
+class MappedTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.writer = self.open(offset_index=True)
+        self.writer.bulk_set_subcollection("users", USERS)
+        self.writer.set_data("config", {"mode": "fast", "limits": [1, 2]})
+        self.reader = self.open(read_only=True, mmap=True, remap_interval=0)
+
+    def test_layout_is_json_dumps(self):
+        with open(self.path()) as file:
+            self.assertEqual(file.read(), json.dumps(self.writer.db, indent=4))
+        self.assertEqual(encode_indexed({})[0], json.dumps({}, indent=4))
+
+    def test_point_reads_decode_single_items(self):
+        self.assertIsInstance(self.reader.db, MappedDatabase)
+        self.assertEqual(self.reader.get_data("users/5/name"), "user5")
+        self.assertEqual(self.reader.get_subcollection("users", "7"), USERS["7"])
+        self.assertIsNone(self.reader.get_subcollection("users", "missing"))
+        self.assertNotIn("users", self.reader.db._values)
+        self.assertTrue(self.reader.key_exists("config/mode"))
+        self.assertFalse(self.reader.key_exists("users/missing"))
+        self.assertEqual(self.reader.get_data("config/limits"), [1, 2])
+
+    def test_whole_database_reads(self):
+        self.assertEqual(self.reader.get_db(), self.writer.db)
+        self.assertIsInstance(self.reader.get_db(raw=True), MappedDatabase)
+        self.assertEqual(self.reader.get_subcollection("users"), USERS)
+
+    def test_search(self):
+        self.assertEqual(self.reader.search_data("user3"), {"users/3/name": "user3"})
+        self.assertEqual(self.reader.search_data("user3", key="users"), {"3/name": "user3"})
+        self.assertEqual(self.reader.search_data("fast"), {"config/mode": "fast"})
+        self.assertEqual(len(self.reader.search_data("user1", substring=True, limit=5)), 5)
+        self.assertEqual(self.reader.search_data("user3", workers=2), {"users/3/name": "user3"})
+
+    def test_collection_reads(self):
+        page = self.reader.get_subcollection_page("users", limit=3)
+        self.assertEqual(len(page["items"]), 3)
+        self.assertEqual(len(list(self.reader.iter_subcollection("users", batch_size=10))), len(USERS))
+        self.assertEqual(self.reader.aggregate("users", metrics={"n": "count"}), {"n": len(USERS)})
+        self.reader.add_columns("users", ["age"])
+        self.assertEqual(self.reader.column_aggregate("users", "age", "max"), 26)
+        self.assertEqual(len(self.reader.column_select("users", {"age": (">=", 26)})),
+                         sum(1 for user in USERS.values() if user["age"] >= 26))
+        self.assertIn("users", self.reader.memory_report()["collections"])
+
+    def test_writes_are_refused(self):
+        with self.assertLogs(self.reader.logger, "ERROR"):
+            self.assertIsNone(self.reader.set_data("new", {"v": 1}))
+        with self.assertLogs(self.reader.logger, "ERROR"):
+            self.assertFalse(self.reader.patch("config", [{"op": "remove", "path": "/mode"}]))
+        with self.assertLogs(self.reader.logger, "ERROR"):
+            self.reader._save_db()
+        self.assertFalse(self.reader.key_exists("new"))
+        self.assertTrue(self.reader.key_exists("config/mode"))
+
+    def test_reader_remaps_new_versions(self):
+        self.assertEqual(self.reader.get_data("config/mode"), "fast")
+        self.writer.edit_data("config", {"mode": "safe"})
+        self.writer.set_subcollection("users", "new", {"name": "N"})
+        self.assertEqual(self.reader.get_data("config/mode"), "safe")
+        self.assertEqual(self.reader.get_data("users/new/name"), "N")
+        self.assertEqual(self.reader.search_data("N"), {"users/new/name": "N"})
+        self.writer.remove_data("config")
+        self.assertFalse(self.reader.key_exists("config"))
+
+    def test_reload_clears_query_cache(self):
+        reader = self.open(read_only=True, mmap=True, remap_interval=0, query_cache=10)
+        self.assertEqual(reader.search_data("fast"), {"config/mode": "fast"})
+        self.writer.edit_data("config", {"mode": "slow"})
+        self.assertTrue(reader.refresh())
+        self.assertIsNone(reader.search_data("fast"))
+
+    def test_file_without_index_is_loaded(self):
+        self.open("plain.json").set_data("a", {"b": 1})
+        with self.assertLogs(level="ERROR"):
+            reader = self.open("plain.json", read_only=True, mmap=True)
+        self.assertEqual(reader.get_data("a/b"), 1)
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            self.open("other.json", mmap=True)
+        with self.assertRaises(ValueError):
+            self.open("other.json", offset_index=True, crypted=True)
+        with self.assertRaises(FileNotFoundError):
+            self.open("missing.json", read_only=True)
+
+if __name__ == "__main__":
+    unittest.main()
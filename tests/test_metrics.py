@@ -0,0 +1,33 @@
+import unittest
+
+from tests import DatabaseTestCase
+
+class SlowOpsTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open(metrics=True, slow_op_threshold=0.0)
+
+    def last_key(self):
+        return self.db.slow_ops()[-1]["key"]
+
+    def test_slow_ops_record_the_key_argument(self):
+        self.db.set_data("users/1", {"name": "alice"})
+        self.assertEqual(self.last_key(), "users/1")
+        self.db.search_data("alice", "users")
+        self.assertEqual(self.last_key(), "users")
+        self.db.search_data("alice")
+        self.assertIsNone(self.last_key())
+        self.db.get_subcollection("users", "1")
+        self.assertEqual(self.last_key(), "users/1")
+        self.db.get_subcollection_page("users", limit=10)
+        self.assertEqual(self.last_key(), "users")
+        self.db.incr(key="stats", field="views")
+        self.assertEqual(self.last_key(), "stats")
+
+    def test_operations_are_timed(self):
+        self.db.get_data("users/1")
+        self.db.get_data("users/2")
+        self.assertEqual(self.db.metrics()["operations"]["get_data"]["count"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
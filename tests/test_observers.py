@@ -0,0 +1,58 @@
+import time
+import unittest
+
+from tests import DatabaseTestCase
+
+class ObserversTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open()
+        self.events = []
+
+    def observer(self, action, key, value):
+        self.events.append((action, key))
+
+    def test_observers_match_path_segments(self):
+        self.db.add_observer("users", self.observer)
+        self.db.set_data("users/1", {"name": "Awa"})
+        self.db.edit_data("users/1", {"age": 30})
+        self.db.set_data("users10", {"name": "Binta"})
+        self.db.remove_data("users/1")
+        self.assertEqual(self.events, [("set_data", "users/1"), ("edit_data", "users/1"), ("remove_data", "users/1")])
+
+    def test_observers_stay_a_dict(self):
+        self.db.add_observer("users", self.observer)
+        self.assertEqual(self.db.observers, {"users": [self.observer]})
+        self.assertIn("users", self.db.observers)
+        other = []
+        self.db.observers["users"].append(lambda action, key, value: other.append(key))
+        self.db.set_data("users/1", {"name": "Awa"})
+        self.assertEqual(other, ["users/1"])
+        self.assertEqual(len(self.events), 1)
+
+    def test_remove_observer(self):
+        self.db.add_observer("users", self.observer)
+        self.db.remove_observer("users", self.observer)
+        self.assertEqual(self.db.observers, {})
+        self.db.set_data("users/1", {"name": "Awa"})
+        self.assertEqual(self.events, [])
+
+    def test_remove_unknown_observer(self):
+        self.db.remove_observer("users", self.observer)
+        self.db.add_observer("users", self.observer)
+        with self.assertRaises(ValueError):
+            self.db.remove_observer("users", print)
+        self.assertEqual(self.db.observers, {"users": [self.observer]})
+
+    def test_close_skips_the_coalescing_window(self):
+        db = self.open("coalesced.json", observer_mode="thread", observer_coalesce=30)
+        db.add_observer("users", self.observer)
+        db.set_data("users/1", {"name": "Awa"})
+        db.set_data("users/1", {"name": "Binta"})
+        started = time.monotonic()
+        db.close()
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(self.events, [("set_data", "users/1")])
+
+if __name__ == "__main__":
+    unittest.main()
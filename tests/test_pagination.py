@@ -0,0 +1,57 @@
+import unittest
+
+from tests import DatabaseTestCase
+
+class PaginationTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open()
+        for number in range(1, 12):
+            self.db.set_subcollection("users", str(number), {"name": f"user {number}", "age": number})
+
+    def test_pages_cover_every_item_in_id_order(self):
+        ids, cursor = [], None
+        while True:
+            page = self.db.get_subcollection_page("users", limit=4, cursor=cursor, fields=["age"])
+            ids.extend(page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(ids, [str(number) for number in range(1, 12)])
+        self.assertEqual(page["items"]["11"], {"age": 11})
+
+    def test_pages_follow_changes(self):
+        page = self.db.get_subcollection_page("users", limit=3)
+        self.db.remove_subcollection("users", "4")
+        self.db.set_subcollection("users", "3a", {"name": "late"})
+        page = self.db.get_subcollection_page("users", limit=3, cursor=page["next_cursor"])
+        self.assertEqual(list(page["items"]), ["5", "6", "7"])
+
+    def test_non_ascii_digits_are_not_numeric(self):
+        for item_id in ("²", "٣"):
+            self.db.set_subcollection("users", item_id, {"name": item_id})
+        ids = [item_id for item_id, _ in self.db.iter_subcollection("users", start_after="10")]
+        self.assertEqual(ids, ["11", "²", "٣"])
+
+    def test_direct_changes_rebuild_the_index(self):
+        self.db.get_subcollection_page("users", limit=3)
+        del self.db.db["users"]["2"]
+        page = self.db.get_subcollection_page("users", limit=3)
+        self.assertEqual(list(page["items"]), ["1", "3", "4"])
+        self.db.db["users"]["2"] = self.db.db["users"].pop("3")
+        page = self.db.get_subcollection_page("users", limit=3)
+        self.assertEqual(list(page["items"]), ["1", "2", "4"])
+
+    def test_limit_below_one_is_rejected(self):
+        for limit in (0, -1):
+            with self.assertRaises(ValueError):
+                self.db.get_subcollection_page("users", limit=limit)
+        with self.assertRaises(ValueError):
+            next(self.db.iter_subcollection("users", batch_size=0))
+
+    def test_iteration(self):
+        ids = [item_id for item_id, _ in self.db.iter_subcollection("users", start_after="8", batch_size=2)]
+        self.assertEqual(ids, ["9", "10", "11"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import json
+import unittest
+
+from tests import DatabaseTestCase
+
+USER = {"version": 3, "nickname": "al", "tags": ["a"], "address": {"zip": "1", "city": "Dakar"}}
+
+class PatchTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open(change_feed=100)
+        self.db.set_data("users/1", json.loads(json.dumps(USER)))
+        self.events = []
+        self.db.add_observer("users", lambda action, key, value: self.events.append(key))
+
+    def test_operations_are_applied_and_saved(self):
+        self.assertTrue(self.db.patch("users/1", [
+            {"op": "test", "path": "/version", "value": 3},
+            {"op": "replace", "path": "/version", "value": 4},
+            {"op": "remove", "path": "/address/zip"},
+            {"op": "append", "path": "/tags", "value": "admin"},
+            {"op": "add", "path": "/tags/0", "value": "first"},
+            {"op": "move", "from": "/nickname", "path": "/alias"},
+            {"op": "copy", "from": "/address", "path": "/home"},
+        ]))
+        expected = {"version": 4, "tags": ["first", "a", "admin"], "address": {"city": "Dakar"},
+                    "alias": "al", "home": {"city": "Dakar"}}
+        self.assertEqual(self.db.get_data("users/1"), expected)
+        self.assertEqual(self.saved()["users"]["1"], expected)
+
+    def test_failed_patch_is_rolled_back(self):
+        before = json.dumps(self.db.get_data("users/1"))
+        feed = len(self.db.changes())
+        for ops in (
+            [{"op": "remove", "path": "/tags"}, {"op": "remove", "path": "/version"},
+             {"op": "test", "path": "/nickname", "value": "zz"}],
+            [{"op": "replace", "path": "/version", "value": 5}, {"op": "add", "path": "/tags/9", "value": 1}],
+            [{"op": "move", "from": "/address", "path": "/address/x"}],
+            [{"op": "test", "path": "/version", "value": True}],
+            [{"op": "bogus", "path": "/version"}],
+        ):
+            self.assertFalse(self.db.patch("users/1", ops))
+            # Same values, same key order.
+            self.assertEqual(json.dumps(self.db.get_data("users/1")), before)
+        self.assertEqual(self.saved()["users"]["1"], USER)
+        self.assertEqual(self.events, [])
+        self.assertEqual(len(self.db.changes()), feed)
+
+    def test_missing_key(self):
+        self.assertFalse(self.db.patch("users/9", [{"op": "add", "path": "/a", "value": 1}]))
+        self.assertFalse(self.db.key_exists("users/9"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from tests import DatabaseTestCase
+
+class QueryCacheTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open(query_cache=3)
+        self.db.set_data("users", {"1": {"name": "Aliou"}, "2": {"name": "Awa"}})
+        self.db.set_data("orders", {"1": {"by": "Aliou", "n": 1}})
+
+    def stats(self):
+        return self.db.query_cache_stats()
+
+    def test_results_are_cached_and_copied(self):
+        result = self.db.search_data("Aliou", key="users")
+        result["junk"] = 1
+        self.assertEqual(self.db.search_data("Aliou", key="users"), {"1/name": "Aliou"})
+        self.assertEqual((self.stats()["hits"], self.stats()["misses"]), (1, 1))
+
+    def test_writes_only_invalidate_their_collection(self):
+        self.db.search_data("Aliou", key="users")
+        self.assertEqual(len(self.db.search_data("Aliou")), 2)
+        self.db.edit_data("orders/1", {"n": 2})
+        self.db.search_data("Aliou", key="users")
+        self.assertEqual(self.stats()["hits"], 1)
+        self.db.edit_data("users/2", {"name": "Aliou"})
+        self.assertEqual(self.db.search_data("Aliou", key="users"), {"1/name": "Aliou", "2/name": "Aliou"})
+        self.assertEqual(len(self.db.search_data("Aliou")), 3)
+        self.assertEqual(self.stats()["stale"], 2)
+        self.db.remove_data("users")
+        self.assertIsNone(self.db.search_data("Aliou", key="users"))
+
+    def test_size_limit(self):
+        for number in range(5):
+            self.db.search_data(f"query {number}")
+        self.assertEqual(self.stats()["entries"], 3)
+        self.assertGreaterEqual(self.stats()["evictions"], 2)
+        self.db.clear_query_cache()
+        self.assertEqual(self.stats()["entries"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
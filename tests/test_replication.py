@@ -0,0 +1,35 @@
+import unittest
+
+from LiteJsonDb import ReplicaFollower
+from tests import DatabaseTestCase
+
+class ChangeFeedTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open(change_feed=100)
+
+    def test_changes_are_recorded_in_order(self):
+        self.db.set_data("users/1", {"name": "Awa"})
+        self.db.edit_data("users/1", {"age": 30})
+        self.db.remove_data("users/1")
+        changes = self.db.changes()
+        self.assertEqual([change["op"] for change in changes], ["set_data", "edit_data", "remove_data"])
+        self.assertEqual(changes[1]["path"], ["users", "1"])
+        self.assertEqual(changes[1]["value"], {"name": "Awa", "age": 30})
+        self.assertEqual(self.db.changes(changes[1]["seq"]), changes[2:])
+
+    def test_follower_catches_up(self):
+        self.db.set_data("users/1", {"name": "Awa"})
+        self.db.serve_changes(self.path("feed.sock"))
+        follower = ReplicaFollower(self.path("feed.sock"))
+        try:
+            self.db.edit_data("users/1", {"age": 30})
+            self.db.set_subcollection("groups", "a", {"name": "admins"})
+            self.db.remove_data("users/1")
+            self.assertTrue(follower.wait_for(self.db.change_seq, 5))
+            self.assertEqual(follower.db, self.db.db)
+        finally:
+            follower.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+
+from tests import DatabaseTestCase
+
+class SchemaTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open()
+        self.db.set_schema("users", {"name": str, "age": int, "email?": (str, None)})
+
+    def test_valid_items_are_written(self):
+        self.db.set_subcollection("users", "1", {"name": "Awa", "age": 30})
+        self.db.edit_subcollection("users", "1", {"email": None})
+        self.assertEqual(self.db.get_subcollection("users", "1"), {"name": "Awa", "age": 30, "email": None})
+
+    def test_violations_are_logged_lazily_and_rejected(self):
+        with self.assertLogs(self.db.logger, "ERROR") as logs:
+            self.db.set_subcollection("users", "2", {"name": 5})
+        record = logs.records[0]
+        self.assertEqual(record.args[:2], ("users/2", "users"))
+        self.assertIn("doesn't match the 'users' schema", record.getMessage())
+        self.assertFalse(self.db.key_exists("users/2"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from LiteJsonDb.modules import search
+from LiteJsonDb.modules.search import search_data
+
+def make_data():
+    return {
+        f"c{c}": {str(i): {"name": f"n{i % 50}", "city": "Dakar" if i % 3 else "Saint-Louis", "tags": [i, "x"]}
+                  for i in range(600)}
+        for c in range(4)
+    }
+
+class SearchTest(unittest.TestCase):
+    def setUp(self):
+        self.data = make_data()
+        self.min_chunk = search.MIN_CHUNK
+        search.MIN_CHUNK = 50
+
+    def tearDown(self):
+        search.MIN_CHUNK = self.min_chunk
+
+    def test_parallel_matches_serial(self):
+        for value, options in (("n7", {}), ("saint", {"substring": True, "case_sensitive": False})):
+            serial = search_data(self.data, value, **options)
+            parallel = search_data(self.data, value, workers=4, **options)
+            self.assertEqual(list(parallel.items()), list(serial.items()))
+
+    def test_limit(self):
+        self.assertEqual(len(search_data(self.data, "Dakar", limit=10)), 10)
+        self.assertEqual(len(search_data(self.data, "Dakar", limit=10, workers=4)), 10)
+
+    def test_key_search_paths_are_relative(self):
+        self.assertEqual(search_data(self.data, "n3", key="c0", limit=1), {"3/name": "n3"})
+        self.assertEqual(search_data(self.data, "missing", key="nope"), {})
+
+if __name__ == "__main__":
+    unittest.main()
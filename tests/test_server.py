@@ -0,0 +1,33 @@
+import unittest
+
+from LiteJsonDb import JsonDBClient, JsonDBServer, ServerError
+from tests import DatabaseTestCase
+
+class ServerTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.open()
+        self.server = JsonDBServer(self.db, self.path("db.sock")).start()
+        self.client = JsonDBClient(self.server.address)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_calls_and_pipeline(self):
+        self.client.set_data("users/1", {"name": "Awa"})
+        with self.client.pipeline() as p:
+            p.get_data("users/1/name").key_exists("users/2")
+        self.assertEqual(p.results, ["Awa", False])
+
+    def test_batch_is_not_rolled_back(self):
+        batch = self.client.batch().set_data("users/1", {"name": "Awa"}).get_data("users/1", "bad argument")
+        batch.set_data("users/2", {"name": "Binta"})
+        with self.assertRaises(ServerError):
+            batch.execute()
+        self.assertEqual(self.db.get_data("users/1"), {"name": "Awa"})
+        self.assertFalse(self.db.key_exists("users/2"))
+
+if __name__ == "__main__":
+    unittest.main()